@@ -1,4 +1,6 @@
 import os
+import json
+import hashlib
 import shutil
 import subprocess
 import tarfile
@@ -6,10 +8,22 @@ import zipfile
 from pathlib import Path
 import sys
 import argparse
-import multiprocessing
+import functools
+import contextlib
 import time
 
-from main import analyze_halting
+from main import analyze_halting, derive_facts
+from components.worker_pool import SupervisedPool
+from components.results_journal import ResultsJournal
+from components.profiling import StackSampler, ProfileCollector
+from components.phase_scheduler import PhaseModel, PhaseScheduler, file_features
+from components.phase_router import PhaseRouter, RoutedScheduler, feature_row, feature_matrix_of_rows
+from components.artifact_store import ArtifactStore, SOURCE_PHASES, content_key
+from components.spans import tracer, JsonlExporter
+from components.near_duplicates import fingerprint, SimHashIndex, HAMMING_THRESHOLD
+from benchmark_report import save_run_summary, print_phase_report, latest_runs, load_run_summary, file_seconds
+from corpus_builder import harvest_local_sources
+from synthetic_corpus import generate_corpus
 
 # --- Configuration ---
 BENCHMARK_DIR = Path("benchmark_suite")
@@ -19,6 +33,9 @@ COMPLEX_DIR = BENCHMARK_DIR / "complex"
 
 STDLIB_DEST = HALTING_DIR / "stdlib"
 PYPI_DEST = HALTING_DIR / "pypi_sources"
+INSTALLED_DEST = HALTING_DIR / "installed"
+JOURNAL_PATH = Path("benchmark_results.jsonl")
+SHARD_FORMAT = "halting-benchmark-shard/1"
 SYNTHETIC_DEST = NON_HALTING_DIR / "synthetic"
 PARADOXES_DEST = NON_HALTING_DIR / "paradoxes"
 
@@ -35,6 +52,15 @@ NON_HALTING_PATTERNS = [
     ("mutual_recursion", "def f():\n    g()\ndef g():\n    f()\nf()"),
 ]
 PROJECT_SCRIPTS_DIR = Path("scripts")
+CHUNKS_PER_WORKER = 4  # Target number of chunks handed to each pool worker
+MAX_CHUNKSIZE = 32
+FILE_TIMEOUT = 60           # Seconds before a stuck worker is killed and the file marked "timeout"
+MAX_TASKS_PER_WORKER = 500  # Files analyzed before a worker is replaced
+MAX_WORKER_RSS_MB = 1024    # Resident memory above which a worker is replaced
+TASK_ORDERS = ("longest", "shortest", "interleaved")
+COST_HISTORY_RUNS = 5       # Stored runs whose per-file times estimate the next run's costs
+ARTIFACTS_DIR = Path("benchmark_artifacts")
+REUSABLE_PHASES = ("paradox", "summary", "static")  # Cheap phases whose verdict a near-duplicate may reuse
 
 # --- Helper Functions for Corpus Creation ---
 
@@ -92,6 +118,13 @@ def download_and_unpack_pypi():
     shutil.rmtree(unpacked_dir)
     print(f"Collected {file_count} PyPI .py files.")
 
+def collect_installed_sources():
+    """Offline alternative to collect_stdlib + download_and_unpack_pypi; incremental on re-runs."""
+    print("Harvesting .py files from the local stdlib and site-packages...")
+    counts = harvest_local_sources(INSTALLED_DEST)
+    print(f"Scanned {counts['scanned']} files: {counts['added']} added, {counts['removed']} removed, "
+          f"{counts['duplicates']} duplicates skipped, {counts['files']} in the corpus.")
+
 def generate_synthetic_non_halting():
     create_directory(SYNTHETIC_DEST)
     for i in range(NUM_SYNTHETIC):
@@ -115,154 +148,639 @@ def setup_complex():
     create_directory(COMPLEX_DIR)
     print("Note: Add curated complex cases to 'benchmark_suite/complex/'")
 
+_profiling = False  # Set in each worker by init_worker
+_scheduler = None
+_artifacts = None
+
+def init_worker(profile=False, model_path=None, artifacts_dir=None, routes=None, trace=None):
+    """
+    Pool initializer: silences stderr once per worker, since dynamic tracing runs the
+    corpus programs in-process. With `profile`, every file's analysis is stack-sampled. With
+    `model_path`, phases are scheduled from that phase model (read-only: the parent
+    process learns from the results). With `artifacts_dir`, source-only phase results
+    are read from and added to the artifact store there. With `routes` (see
+    route_tasks), files skip the phases routed away for them. With `trace` (a JSONL
+    path and the run span's context), every file's spans are appended to that path
+    as children of the run span.
+    """
+    global _profiling, _scheduler, _artifacts
+    sys.stderr = open(os.devnull, 'w')
+    if trace:
+        tracer.configure([JsonlExporter(trace[0])], parent=trace[1])
+    else:
+        tracer.configure()  # A forked worker would otherwise inherit the parent's exporters
+    _profiling = profile
+    _scheduler = PhaseScheduler(PhaseModel.load(model_path)) if model_path else None
+    if routes:
+        _scheduler = RoutedScheduler(routes)
+    _artifacts = ArtifactStore(artifacts_dir) if artifacts_dir else None
+
+def file_key(file_path: Path) -> str:
+    """Stable journal key for a corpus file: its path relative to the suite."""
+    return file_path.relative_to(BENCHMARK_DIR).as_posix()
+
+def file_content_key(file_path: Path) -> str:
+    """Content hash of a corpus file as the analyzer reads it, to tell a journaled verdict is still current."""
+    return content_key(file_path.read_text(encoding='utf-8', errors='ignore'))
+
 def analyze_file(args):
     file_path, name, expected_result = args
-    original_stderr = sys.stderr
-    sys.stderr = open(os.devnull, 'w')
+    with tracer.span("file", file=file_key(file_path), category=name) as span:
+        try:
+            program_code = file_path.read_text(encoding='utf-8', errors='ignore')
+            phase_times = {}
+            sampler = StackSampler() if _profiling else None
+            with sampler or contextlib.nullcontext():
+                analyzer_result, _ = analyze_halting(program_code, phase_times=phase_times, scheduler=_scheduler,
+                                                     artifacts=_artifacts)
+            stacks = dict(sampler.stacks) if sampler else None
+            is_correct = score_verdict(name, analyzer_result)
+            span.set(correct=is_correct)
+            return (is_correct, file_key(file_path), analyzer_result, name, phase_times, stacks)
+        except Exception as e:
+            span.set(error=str(e))
+            return (False, file_key(file_path), "error", name, {}, None)
+
+def score_verdict(name, analyzer_result) -> bool:
+    """Whether a verdict counts as correct for a file of category `name`."""
+    if name == "halting":
+        return analyzer_result == "halts"
+    if name == "non-halting":
+        return analyzer_result in ["does not halt", "impossible to determine"]
+    if name == "complex":
+        return analyzer_result in ["impossible to determine", "does not halt"]
+    return False
+
+def interleave_tasks(task_lists):
+    """Round-robin merge of per-category task lists into a single queue."""
+    queue = []
+    for index in range(max((len(tasks) for tasks in task_lists), default=0)):
+        for tasks in task_lists:
+            if index < len(tasks):
+                queue.append(tasks[index])
+    return queue
+
+def estimate_costs(tasks, history=None, file_timeout=FILE_TIMEOUT) -> dict:
+    """
+    Estimated analysis seconds for each task's file key. Files in `history` (a stored
+    run's files) cost what they took then, or `file_timeout` if they timed out. The rest
+    are estimated from size x (loops + 1), which tracks analysis time more closely than
+    size alone, scaled by the median seconds per unit of the files with a history.
+    """
+    history = history or {}
+    work = {}
+    for file_path, _, _ in tasks:
+        features = file_features(file_path.read_text(encoding='utf-8', errors='ignore'))
+        work[file_key(file_path)] = features['size'] * (features['loops'] + 1)
+    known = {}
+    for key in work:
+        record = history.get(key)
+        if record is not None:
+            known[key] = file_timeout if record['verdict'] == "timeout" else file_seconds(record)
+    rates = sorted(known[key] / work[key] for key in known if work[key] and known[key])
+    rate = rates[len(rates) // 2] if rates else 1.0
+    return {key: known.get(key, units * rate) for key, units in work.items()}
+
+def order_tasks(task_lists, costs, order="longest"):
+    """
+    One queue from the per-category task lists. 'longest' starts the most expensive
+    files first (longest-processing-time-first), which minimizes the tail of a
+    whole-corpus run; 'shortest' gives the most verdicts soonest; 'interleaved'
+    alternates categories in discovery order.
+    """
+    tasks = interleave_tasks(task_lists)
+    if order == "interleaved":
+        return tasks
+    return sorted(tasks, key=lambda task: costs[file_key(task[0])], reverse=order == "longest")
+
+def adaptive_chunksize(task_count, processes):
+    """Large enough to amortize IPC, small enough that every worker gets several chunks."""
+    return max(1, min(MAX_CHUNKSIZE, task_count // (processes * CHUNKS_PER_WORKER)))
+
+def failed_task_result(task, reason):
+    """Result for a file whose worker timed out or died: `reason` becomes its verdict."""
+    file_path, name, _ = task
+    return (False, file_key(file_path), reason, name, {}, None)
+
+# --- Sharding ---
+
+def parse_shard(text):
+    """Parses `i/N` (0 <= i < N) for --shard."""
     try:
-        program_code = file_path.read_text(encoding='utf-8', errors='ignore')
-        analyzer_result, _ = analyze_halting(program_code)
-        
-        is_correct = False
-        if name == "halting":
-            if analyzer_result == "halts": is_correct = True
-        elif name == "non-halting":
-            if analyzer_result in ["does not halt", "impossible to determine"]: is_correct = True
-        elif name == "complex":
-            if analyzer_result in ["impossible to determine", "does not halt"]: is_correct = True
-        
-        return (is_correct, file_path.name, analyzer_result)
-    except Exception:
-        return (False, file_path.name, "error")
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got '{text}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must satisfy 0 <= i < N, got '{text}'")
+    return index, count
+
+def content_hash(file_path: Path) -> str:
+    return hashlib.blake2b(file_path.read_bytes(), digest_size=8).hexdigest()
+
+def select_shard(task_lists, index, count):
+    """
+    Keeps the tasks whose file content hash falls into shard `index` of `count`.
+    Every machine computes the same partition from the same corpus, and hashing
+    spreads large and small files evenly across shards.
+    Returns (task lists, corpus fingerprint).
+    """
+    corpus = []
+    selected = []
+    for tasks in task_lists:
+        kept = []
+        for task in tasks:
+            digest = content_hash(task[0])
+            corpus.append((file_key(task[0]), digest))
+            if int(digest, 16) % count == index:
+                kept.append(task)
+        selected.append(kept)
+    fingerprint = hashlib.blake2b(json.dumps(sorted(corpus)).encode('utf-8'), digest_size=8).hexdigest()
+    return selected, fingerprint
+
+def shard_output_path(index, count) -> Path:
+    return Path(f"benchmark_shard_{index}_of_{count}.json")
+
+def write_shard_results(path, shard, corpus_fingerprint, corpus_size, stats, results, complete, elapsed, version,
+                        analyzed, processes):
+    """Writes a self-describing results file: enough to merge and to reject mismatched shards."""
+    index, count = shard
+    data = {
+        'format': SHARD_FORMAT,
+        'analyzer_version': version,
+        'shard': {'index': index, 'count': count},
+        'corpus': {'fingerprint': corpus_fingerprint, 'files': corpus_size},
+        'categories': {name: {'expected': category['expected'], 'total': category['total']}
+                       for name, category in stats.items()},
+        'complete': complete,
+        'elapsed': elapsed,
+        'analyzed': analyzed,
+        'processes': processes,
+        'results': results,
+    }
+    Path(path).write_text(json.dumps(data, indent=1))
+    print(f"--- Shard {index}/{count}: wrote {len(results)} results to {path} ---")
+
+def merge_shard_results(paths):
+    """Combines shard results files into the final score and mismatch report."""
+    shards = []
+    for path in paths:
+        data = json.loads(Path(path).read_text())
+        if data.get('format') != SHARD_FORMAT:
+            sys.exit(f"{path}: not a benchmark shard results file.")
+        shards.append((path, data))
+
+    first_path, first = shards[0]
+    for path, data in shards[1:]:
+        for field in ('analyzer_version', 'corpus'):
+            if data[field] != first[field]:
+                sys.exit(f"{path}: {field} differs from {first_path}; shards must come from the same analyzer and corpus.")
+        if data['shard']['count'] != first['shard']['count']:
+            sys.exit(f"{path}: shard count differs from {first_path}.")
+
+    count = first['shard']['count']
+    seen = {}
+    for path, data in shards:
+        index = data['shard']['index']
+        if index in seen:
+            sys.exit(f"{path}: shard {index}/{count} was already given as {seen[index]}.")
+        seen[index] = path
+
+    stats = {}
+    overall_processed = 0
+    overall_correct = 0
+    for _, data in sorted(shards, key=lambda shard: shard[1]['shard']['index']):
+        for name, category in data['categories'].items():
+            merged = stats.setdefault(name, {'expected': category['expected'], 'total': 0, 'processed': 0, 'mismatches': []})
+            merged['total'] += category['total']
+        for record in data['results']:
+            overall_processed += 1
+            overall_correct += record_result(stats, record['file'], record['category'], record['verdict'], record['correct'])
+
+    print(f"--- Merged {len(shards)} of {count} shards (analyzer version {first['analyzer_version']}) ---")
+    overall_total = sum(category['total'] for category in stats.values())
+    print_summary(stats, overall_correct, overall_processed)
+    missing = sorted(set(range(count)) - set(seen))
+    incomplete = sorted(data['shard']['index'] for _, data in shards if not data['complete'])
+    if missing or incomplete or overall_processed < overall_total:
+        print(f"--- Partial result: {overall_processed} of {first['corpus']['files']} corpus files scored"
+              f"{'; missing shards ' + ', '.join(map(str, missing)) if missing else ''}"
+              f"{'; incomplete shards ' + ', '.join(map(str, incomplete)) if incomplete else ''} ---")
+    # Shards run in parallel: the merged run took as long as its slowest shard.
+    report_run([record for _, data in shards for record in data['results']], first['analyzer_version'],
+               sum(data.get('analyzed', 0) for _, data in shards), max(data['elapsed'] for _, data in shards),
+               sum(data.get('processes', 1) for _, data in shards))
+
+# --- Artifact Store ---
+
+def precompute_file(task):
+    """Worker: stores every source-only fact of one file that the store does not hold yet."""
+    file_path = task[0]
+    program = file_path.read_text(encoding='utf-8', errors='ignore')
+    facts = _artifacts.load(program)
+    if all(phase in facts for phase in SOURCE_PHASES):
+        return (file_key(file_path), "present")
+    _artifacts.save(program, derive_facts(program, facts))
+    return (file_key(file_path), "stored")
+
+def precompute_artifacts(artifacts_dir=ARTIFACTS_DIR, file_timeout=FILE_TIMEOUT):
+    """
+    Fills the artifact store for the whole suite in parallel, most expensive files
+    first, so later runs with --artifacts skip parsing and the static phases.
+    Entries from other analyzer versions are deleted.
+    """
+    task_lists = corpus_task_lists()
+    costs = estimate_costs([task for tasks in task_lists for task in tasks], file_timeout=file_timeout)
+    tasks = order_tasks(task_lists, costs)
+    if not tasks:
+        print("\nNo files were found in the benchmark suite to precompute.")
+        return
+    store = ArtifactStore(artifacts_dir)
+    pruned = store.prune()
+    if pruned:
+        print(f"Deleted artifacts of {pruned} earlier analyzer versions.")
+    processes = os.cpu_count() or 1
+    counts = {}
+    start_time = time.time()
+    pool = SupervisedPool(precompute_file, processes, initializer=functools.partial(init_worker, artifacts_dir=artifacts_dir),
+                          task_timeout=file_timeout, failure_result=lambda task, reason: (file_key(task[0]), reason))
+    with pool:
+        for _, status in pool.imap_unordered(tasks, chunksize=adaptive_chunksize(len(tasks), processes),
+                                             cost=lambda task: costs[file_key(task[0])]):
+            counts[status] = counts.get(status, 0) + 1
+    elapsed = time.time() - start_time
+    print(f"--- Artifacts for analyzer version {store.version} in '{artifacts_dir}': "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+          + f" ({len(tasks)} files in {elapsed:.1f}s, {processes} workers) ---")
+
+# --- Near-Duplicate Reuse ---
+
+def feature_row_file(task):
+    """Worker: (content key, phase router feature row) of the file."""
+    program = task[0].read_text(encoding='utf-8', errors='ignore')
+    return (content_key(program), feature_row(program))
+
+def route_tasks(rows, router_path) -> dict:
+    """
+    Routes a batch with the PhaseRouter in `router_path`. `rows` maps each file's
+    content key to its feature row (None if it could not be computed: such files run
+    every phase); all rows are classified in a single array operation.
+    Returns {content key: phases to skip} for the files that skip any.
+    """
+    router = PhaseRouter.load(router_path)
+    keys = [key for key, row in rows.items() if row is not None]
+    started = time.perf_counter()
+    skips = router.route(feature_matrix_of_rows([rows[key] for key in keys]))
+    print(f"Routing: {sum(map(bool, skips))} of {len(rows)} files skip phases "
+          f"(classified in {(time.perf_counter() - started) * 1000:.1f} ms).")
+    return {key: skipped for key, skipped in zip(keys, skips) if skipped}
+
+def fingerprint_file(task):
+    """Worker: (file key, SimHash of the file or None)."""
+    file_path = task[0]
+    return (file_key(file_path), fingerprint(file_path.read_text(encoding='utf-8', errors='ignore')))
+
+def near_duplicate_members(tasks, fingerprints, threshold) -> dict:
+    """
+    {file key: (representative key, distance)} for every file within `threshold` bits
+    of an earlier file in `tasks`. The first file of each group is its representative;
+    members are only ever matched to representatives, so groups do not drift.
+    """
+    index = SimHashIndex(threshold)
+    members = {}
+    for task in tasks:
+        key = file_key(task[0])
+        value = fingerprints.get(key)
+        if value is None:
+            continue
+        nearest = index.nearest(value)
+        if nearest is None:
+            index.add(value, key)
+        else:
+            members[key] = (nearest[1], nearest[0])
+    return members
+
+def dispatch_with_reuse(pool, tasks, chunksize, cost, members, reuse_log):
+    """
+    Yields worker results for `tasks`. Files in `members` wait until every other file
+    is done. A member whose representative was decided by one of REUSABLE_PHASES
+    takes its verdict unanalyzed (with no phase times), and `reuse_log` maps its key
+    to (deciding phase, distance, verdict, correct). The other members are analyzed
+    as usual.
+    """
+    deciders = {}
+    first = [task for task in tasks if file_key(task[0]) not in members]
+    for result in pool.imap_unordered(first, chunksize=chunksize, cost=cost):
+        _, key, analyzer_result, _, phase_times, _ = result
+        deciders[key] = (analyzer_result, list(phase_times)[-1] if phase_times else None)
+        yield result
+    analyze = []
+    for task in tasks:
+        key = file_key(task[0])
+        if key not in members:
+            continue
+        representative, distance = members[key]
+        analyzer_result, phase = deciders.get(representative, (None, None))
+        if phase in REUSABLE_PHASES:
+            is_correct = score_verdict(task[1], analyzer_result)
+            reuse_log[key] = (phase, distance, analyzer_result, is_correct)
+            yield (is_correct, key, analyzer_result, task[1], {}, None)
+        else:
+            analyze.append(task)
+    yield from pool.imap_unordered(analyze, chunksize=chunksize, cost=cost)
+
+def print_reuse_report(reuse_log, members, threshold, overall_correct, overall_processed, history):
+    """
+    How the reused verdicts fared: correct against the category labels, and the same as
+    the file's own verdict in the stored `history` (where the file was analyzed before).
+    """
+    reused = len(reuse_log)
+    correct = sum(entry[3] for entry in reuse_log.values())
+    analyzed_rate = (overall_correct - correct) / max(overall_processed - reused, 1)
+    print(f"\n--- Near-duplicates (Hamming <= {threshold}): {reused} of {len(members)} reused a neighbour's verdict, "
+          f"{correct} correct ({correct / max(reused, 1):.1%}; {analyzed_rate:.1%} for analyzed files) ---")
+    groups = [(f"decided by {phase}", [key for key, entry in reuse_log.items() if entry[0] == phase])
+              for phase in REUSABLE_PHASES]
+    groups += [(f"{distance} bits apart", [key for key, entry in reuse_log.items() if entry[1] == distance])
+               for distance in range(threshold + 1)]
+    for label, keys in groups:
+        if not keys:
+            continue
+        known = [key for key in keys if key in history]
+        agreed = sum(history[key]['verdict'] == reuse_log[key][2] for key in known)
+        print(f"  {label:<20} {sum(reuse_log[key][3] for key in keys):>5} of {len(keys):>5} correct"
+              + (f", {agreed} of {len(known)} as in the file's last stored run" if known else ""))
 
 # --- Main Benchmark Execution Logic ---
 
-def run_benchmark(force_rebuild=False):
-    """Builds the corpus if needed, then runs the analyzer and calculates the score."""
+def record_result(stats, key, name, verdict, is_correct) -> int:
+    """Adds one scored file to the per-category stats; returns 1 if it passed."""
+    category = stats[name]
+    category['processed'] += 1
+    if is_correct:
+        return 1
+    category['mismatches'].append((Path(key).name, verdict))
+    return 0
+
+def print_summary(stats, overall_correct, overall_processed):
+    for name, category in stats.items():
+        print(f"Completed category '{name}' with {len(category['mismatches'])} mismatches.")
+        if category['mismatches']:
+            print("Mismatches:")
+            for filename, analyzer_result in category['mismatches']:
+                print(f"  MISMATCH: {filename} -> Expected '{category['expected']}', Got '{analyzer_result}'")
+        else:
+            print("No mismatches.")
+
+    if overall_processed == 0:
+        print("\nNo files were scored.")
+        return
+    percentage = (overall_correct / overall_processed) * 100
+    print(f"\n--- Practical Success Rate: {percentage:.2f}% ({overall_correct} of {overall_processed} files passed) ---")
+
+def corpus_task_lists():
+    """One list of (file, category, expected result) tasks per non-empty category of the suite."""
+    category_map = {
+        "halting": (HALTING_DIR, "halts"),
+        "non-halting": (NON_HALTING_DIR, "does not halt"),
+        "complex": (COMPLEX_DIR, "impossible to determine")
+    }
+    task_lists = []
+    for name, (category_dir, expected_result) in category_map.items():
+        if not category_dir.exists(): continue
+        files_in_category = list(category_dir.rglob("*.py"))
+        if not files_in_category: continue
+        task_lists.append([(file_path, name, expected_result) for file_path in files_in_category])
+    return task_lists
+
+def run_benchmark(force_rebuild=False, file_timeout=FILE_TIMEOUT,
+                  max_tasks_per_worker=MAX_TASKS_PER_WORKER, max_worker_rss=MAX_WORKER_RSS_MB,
+                  resume=False, journal_path=JOURNAL_PATH, shard=None, shard_output=None,
+                  offline=False, refresh=False, generate=0, profile_dir=None, profile_top=None,
+                  adaptive_model=None, order="longest", artifacts_dir=None, near_duplicates=None, router_path=None,
+                  trace_path=None):
+    """
+    Builds the corpus if needed, then runs the analyzer and calculates the score.
+    With `profile_dir`, per-file stack samples from every worker are collected there
+    (only the `profile_top` slowest files, if given).
+    With `adaptive_model`, workers skip phases that model found never decisive, and the
+    model is updated with this run's phase times and saved back afterwards.
+    Files are dispatched in `order` (see order_tasks), by costs estimated from the
+    latest stored runs. With `artifacts_dir`, workers reuse and extend the artifact
+    store there (see precompute_artifacts).
+    With `near_duplicates` (a Hamming threshold), files that are near-duplicates of
+    another file reuse its verdict when a cheap phase decided it (see
+    dispatch_with_reuse), and the run reports how often that was correct.
+    With `router_path`, every file's phases are routed up front (see route_tasks).
+    With `trace_path`, a 'benchmark' span for the run and the spans of every file
+    analyzed in the workers are appended to that JSONL file.
+    """
     if force_rebuild and BENCHMARK_DIR.exists():
         print("--- Force-rebuilding corpus: Deleting existing suite... ---")
         shutil.rmtree(BENCHMARK_DIR)
+        # Journaled verdicts are keyed by path and would not describe the rebuilt files.
+        Path(journal_path).unlink(missing_ok=True)
 
     if not BENCHMARK_DIR.exists():
         print("--- Phase 1: Building Benchmark Corpus ---")
         create_directory(BENCHMARK_DIR)
-        collect_stdlib()
-        download_and_unpack_pypi()
+        if offline:
+            collect_installed_sources()
+        else:
+            collect_stdlib()
+            download_and_unpack_pypi()
         generate_synthetic_non_halting()
         copy_paradoxes_and_classify()
         setup_complex()
     else:
         print("--- Phase 1: Found existing benchmark suite. Skipping build. ---")
         print("(Use --rebuild flag to force a fresh build)")
+        if refresh:
+            collect_installed_sources()
+    if generate:
+        labels = generate_corpus(BENCHMARK_DIR, generate)
+        print(f"Generated {len(labels)} labelled synthetic programs into '{BENCHMARK_DIR}/*/generated'.")
     
     print("\n--- Phase 2: Running Analyzer & Calculating Score ---")
-    overall_total = 0
-    overall_processed = 0
-    overall_mismatches = 0
-    overall_correct = 0
+    task_lists = corpus_task_lists()
+    corpus_size = sum(len(tasks) for tasks in task_lists)
+    if shard is not None:
+        task_lists, corpus_fingerprint = select_shard(task_lists, *shard)
+        print(f"Shard {shard[0]}/{shard[1]}: {sum(len(tasks) for tasks in task_lists)} of {corpus_size} files (corpus {corpus_fingerprint}).")
+    stats = {}
+    for tasks in task_lists:
+        if tasks:
+            _, name, expected_result = tasks[0]
+            stats[name] = {'expected': expected_result, 'total': len(tasks), 'processed': 0, 'mismatches': []}
+    history = {}
+    for run in latest_runs(COST_HISTORY_RUNS):  # Oldest first, so the latest time of each file wins
+        history.update((key, record) for key, record in load_run_summary(run)['files'].items()
+                       if not record.get('reused'))  # A reused verdict says nothing of the file's own cost
+    costs = estimate_costs([task for tasks in task_lists for task in tasks], history, file_timeout)
+    tasks = order_tasks(task_lists, costs, order)
+    overall_total = len(tasks)
 
-    category_map = {
-        "halting": (HALTING_DIR, "halts"),
-        "non-halting": (NON_HALTING_DIR, "does not halt"),
-        "complex": (COMPLEX_DIR, "impossible to determine")
-    }
+    if overall_total == 0:
+        print("\nNo files were found in the benchmark suite to analyze.")
+        return
 
-    # Precompute overall total
-    for name, (category_dir, expected_result) in category_map.items():
-        if category_dir.exists():
-            files_in_category = list(category_dir.rglob("*.py"))
-            overall_total += len(files_in_category)
+    overall_processed = 0
+    overall_correct = 0
+    results = []  # Every scored file, for the shard results file
+    journal = ResultsJournal(journal_path)
+    if resume:
+        # Files already scored by this exact analyzer version count towards the score as they are,
+        # unless they were rewritten since.
+        scored = journal.load()
+        remaining = []
+        for task in tasks:
+            record = scored.get(file_key(task[0]))
+            if record is None or record['category'] != task[1] or record.get('content') != file_content_key(task[0]):
+                remaining.append(task)
+                continue
+            results.append({key: record.get(key, {}) for key in ('file', 'category', 'verdict', 'correct', 'phases')})
+            overall_processed += 1
+            overall_correct += record_result(stats, record['file'], record['category'], record['verdict'], record['correct'])
+        print(f"Resuming: {overall_processed} of {overall_total} files already scored by analyzer version {journal.version}.")
+        tasks = remaining
 
+    profiler = ProfileCollector(profile_dir, profile_top) if profile_dir else None
+    model = PhaseModel.load(adaptive_model) if adaptive_model else None
+    processes = os.cpu_count() or 1
+    chunksize = adaptive_chunksize(len(tasks), processes)
     start_time = time.time()
     update_interval = max(1, int(overall_total * 0.001))  # 0.1%
-    last_updated_processed = 0
+    last_updated_processed = overall_processed
+    resumed = overall_processed
+    interrupted = False
+    cost = lambda task: costs[file_key(task[0])]
+    members, reuse_log = {}, {}
+    routes = None
+    if router_path is not None:
+        with SupervisedPool(feature_row_file, processes, initializer=init_worker, task_timeout=file_timeout,
+                            failure_result=lambda task, reason: (None, None)) as feature_pool:
+            rows = dict(feature_pool.imap_unordered(tasks, chunksize=chunksize, cost=cost))
+        rows.pop(None, None)
+        routes = route_tasks(rows, router_path)
+    if near_duplicates is not None:
+        with SupervisedPool(fingerprint_file, processes, initializer=init_worker, task_timeout=file_timeout,
+                            failure_result=lambda task, reason: (file_key(task[0]), None)) as fingerprint_pool:
+            fingerprints = dict(fingerprint_pool.imap_unordered(tasks, chunksize=chunksize, cost=cost))
+        members = near_duplicate_members(tasks, fingerprints, near_duplicates)
+        print(f"Near-duplicates: {len(members)} of {len(tasks)} files are within {near_duplicates} bits of another file.")
 
-    for name, (category_dir, expected_result) in category_map.items():
-        if not category_dir.exists(): continue
-        print(f"\nStarting analysis for category: '{name}'...")
-        files_in_category = list(category_dir.rglob("*.py"))
-        cat_total = len(files_in_category)
-        
-        if cat_total == 0: continue
-        
-        args_list = [(file_path, name, expected_result) for file_path in files_in_category]
-        
-        category_processed = 0
-        category_mismatches = 0
-        mismatches = []
-
-        with multiprocessing.Pool() as pool:
-            results = pool.imap_unordered(analyze_file, args_list)
-            
-            for result in results:
-                is_correct, filename, analyzer_result = result
-                category_processed += 1
+    trace = None
+    if trace_path is not None:
+        tracer.configure([JsonlExporter(trace_path)])
+        run_span = tracer.start("benchmark", files=len(tasks), workers=processes, order=order)
+        trace = (trace_path, run_span.context)
+
+    # A single long-lived pool: workers import the analyzer and z3 once and are only
+    # replaced when they hang on a file, crash, or reach their task/memory limit.
+    pool = SupervisedPool(analyze_file, processes,
+                          initializer=functools.partial(init_worker, profiler is not None, adaptive_model, artifacts_dir,
+                                                        routes, trace),
+                          task_timeout=file_timeout, max_tasks_per_worker=max_tasks_per_worker,
+                          max_rss_mb=max_worker_rss, failure_result=failed_task_result)
+    try:
+        with pool, journal:
+            for result in dispatch_with_reuse(pool, tasks, chunksize, cost, members, reuse_log):
+                is_correct, key, analyzer_result, name, phase_times, stacks = result
+                if profiler:
+                    profiler.add(key, sum(phase_times.values()), stacks)
+                program = (BENCHMARK_DIR / key).read_text(encoding='utf-8', errors='ignore')
+                if model:
+                    model.observe(file_features(program), phase_times)
+                journal.record(key, name, analyzer_result, is_correct, phase_times, content_key(program))
+                results.append({'file': key, 'category': name, 'verdict': analyzer_result,
+                                'correct': is_correct, 'phases': phase_times})
+                if key in reuse_log:
+                    results[-1]['reused'] = True
                 overall_processed += 1
-                if is_correct:
-                    overall_correct += 1
-                else:
-                    category_mismatches += 1
-                    overall_mismatches += 1
-                    mismatches.append((filename, analyzer_result))
-                
+                overall_correct += record_result(stats, key, name, analyzer_result, is_correct)
+
                 # Check if we should update display
-                if (overall_processed - last_updated_processed >= update_interval or 
-                    overall_processed == overall_total or 
-                    category_processed == cat_total):
-                    display_progress(name, expected_result, overall_total, overall_processed, overall_mismatches, start_time,
-                                     cat_total, category_processed, category_mismatches, mismatches)
+                if (overall_processed - last_updated_processed >= update_interval or
+                    overall_processed == overall_total):
+                    display_progress(stats, overall_total, overall_processed, start_time, resumed)
                     last_updated_processed = overall_processed
-        
-        # Clear screen after category
-        sys.stdout.write('\033[2J\033[H')
-        sys.stdout.flush()
-        
-        print(f"Completed category '{name}' with {category_mismatches} mismatches.")
-        if mismatches:
-            print("Mismatches:")
-            for filename, analyzer_result in mismatches:
-                print(f"  MISMATCH: {filename} -> Expected '{expected_result}', Got '{analyzer_result}'")
-        else:
-            print("No mismatches.")
-    
-    if overall_total > 0:
-        percentage = (overall_correct / overall_total) * 100
-        print(f"\n--- Practical Success Rate: {percentage:.2f}% ({overall_correct} of {overall_total} files passed) ---")
-    else:
-        print("\nNo files were found in the benchmark suite to analyze.")
+    except KeyboardInterrupt:
+        # Everything scored so far is in the journal; report on it and let --resume finish the rest.
+        interrupted = True
 
-def display_progress(category, expected, overall_total, overall_proc, overall_mis, start_time,
-                      cat_total, cat_proc, cat_mis, mis_list):
+    elapsed = time.time() - start_time
+    if trace is not None:
+        run_span.set(processed=overall_processed, correct=overall_correct, interrupted=interrupted)
+        run_span.end()
+
+    # Clear screen before the summary
+    sys.stdout.write('\033[2J\033[H')
+    sys.stdout.flush()
+
+    print_summary(stats, overall_correct, overall_processed)
+    if near_duplicates is not None:
+        print_reuse_report(reuse_log, members, near_duplicates, overall_correct, overall_processed, history)
+    if shard is not None:
+        write_shard_results(shard_output or shard_output_path(*shard), shard, corpus_fingerprint, corpus_size,
+                            stats, results, overall_processed == overall_total, elapsed, journal.version,
+                            overall_processed - resumed, processes)
+    if overall_processed == 0:
+        return
+    if overall_processed < overall_total:
+        state = "interrupted" if interrupted else "incomplete"
+        print(f"--- Partial run ({state}): {overall_processed} of {overall_total} files scored; use --resume to continue ---")
+    analyzed = overall_processed - resumed
+    print(f"--- Throughput: {analyzed / max(elapsed, 1e-9):.1f} files/s ({analyzed} files in {elapsed:.1f}s, {processes} workers, order '{order}', chunks of up to {chunksize} files) ---")
+    print(f"--- Workers: {pool.timeouts} timeouts, {pool.crashes} crashes, {pool.recycled} recycled ---")
+    # Sampling slows the analyzer down, so a profiled run is not stored as a baseline for diffs.
+    report_run(results, journal.version, analyzed, elapsed, processes, shard, save=profiler is None)
+    if profiler:
+        print(f"--- Profile written to {profiler.write()} (files that timed out are not profiled) ---")
+    if model:
+        model.save(adaptive_model)
+        print(f"--- Phase model updated in {adaptive_model} (inspect it with: python benchmark_report.py model --from {adaptive_model}) ---")
+
+def report_run(results, version, analyzed, elapsed, processes, shard=None, save=True):
+    """Stores the run summary for later diffing and prints the per-phase report."""
+    files = {record['file']: {field: record[field] for field in ('category', 'verdict', 'correct', 'phases', 'reused')
+                              if field in record}
+             for record in results}
+    print("\n--- Phase Report ---")
+    print_phase_report(files)
+    if save:
+        path = save_run_summary(files, version, analyzed, elapsed, processes, shard)
+        print(f"\n--- Run summary saved to {path} (compare runs with: python benchmark_report.py diff) ---")
+
+def display_progress(stats, overall_total, overall_proc, start_time, resumed=0):
     sys.stdout.write('\033[2J\033[H')
     sys.stdout.flush()
     
     elapsed = time.time() - start_time
-    if overall_proc > 0:
-        time_per_file = elapsed / overall_proc
+    analyzed = overall_proc - resumed
+    if analyzed > 0:
+        time_per_file = elapsed / analyzed
         eta = time_per_file * (overall_total - overall_proc)
     else:
         eta = 0
+    overall_mis = sum(len(category['mismatches']) for category in stats.values())
     
     print("Benchmark Analysis Progress")
     print("----------------------------")
     print(f"Overall:")
     print(f"  Processed: {overall_proc}/{overall_total} ({overall_proc/overall_total*100:.1f}%)")
     print(f"  Mismatches: {overall_mis}")
-    print(f"  Elapsed: {elapsed:.1f}s | ETA: {eta:.1f}s")
+    print(f"  Elapsed: {elapsed:.1f}s | ETA: {eta:.1f}s | Throughput: {analyzed / max(elapsed, 1e-9):.1f} files/s")
     
-    print(f"\nCurrent Category: {category}")
-    print(f"  Processed: {cat_proc}/{cat_total} ({cat_proc/cat_total*100:.1f}%)")
-    print(f"  Mismatches: {cat_mis}")
-    
-    if mis_list:
-        print("\nRecent Mismatches (last 5):")
-        for filename, analyzer_result in mis_list[-5:]:
-            print(f"  {filename}: Expected '{expected}', Got '{analyzer_result}'")
-    if len(mis_list) > 5:
-        print(f"  ... and {len(mis_list)-5} more")
+    for name, category in stats.items():
+        print(f"\nCategory: {name}")
+        print(f"  Processed: {category['processed']}/{category['total']} ({category['processed']/category['total']*100:.1f}%)")
+        print(f"  Mismatches: {len(category['mismatches'])}")
+        mis_list = category['mismatches']
+        if mis_list:
+            print("  Recent Mismatches (last 5):")
+            for filename, analyzer_result in mis_list[-5:]:
+                print(f"    {filename}: Expected '{category['expected']}', Got '{analyzer_result}'")
+        if len(mis_list) > 5:
+            print(f"    ... and {len(mis_list)-5} more")
 
     sys.stdout.flush()
 
@@ -273,8 +791,144 @@ if __name__ == "__main__":
         action='store_true',
         help="Force a complete rebuild of the benchmark suite, deleting the old one."
     )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=FILE_TIMEOUT,
+        help=f"Seconds a single file may take before its worker is killed (default: {FILE_TIMEOUT})."
+    )
+    parser.add_argument(
+        '--max-tasks-per-worker',
+        type=int,
+        default=MAX_TASKS_PER_WORKER,
+        help=f"Replace a worker after this many files (default: {MAX_TASKS_PER_WORKER})."
+    )
+    parser.add_argument(
+        '--max-worker-rss',
+        type=int,
+        default=MAX_WORKER_RSS_MB,
+        help=f"Replace a worker once its resident memory exceeds this many MB (default: {MAX_WORKER_RSS_MB}). Needs /proc (Linux); elsewhere workers are only replaced by task count."
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Skip files already scored by the current analyzer version in the results journal."
+    )
+    parser.add_argument(
+        '--journal',
+        type=Path,
+        default=JOURNAL_PATH,
+        help=f"Append-only JSONL journal of per-file verdicts (default: {JOURNAL_PATH})."
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/N',
+        help="Analyze only shard i of N (0-based), partitioned by file content hash, and write a shard results file."
+    )
+    parser.add_argument(
+        '--shard-output',
+        type=Path,
+        help="Where to write the shard results file (default: benchmark_shard_<i>_of_<N>.json)."
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help="Build the corpus from the locally installed stdlib and site-packages instead of downloading from PyPI."
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help="Incrementally re-harvest local sources into an existing suite: only new or changed files are added."
+    )
+    parser.add_argument(
+        '--generate',
+        type=int,
+        default=0,
+        metavar='N',
+        help="Add N generated programs (half halting, half not) of varying size and obfuscation to the suite; use synthetic_corpus.py directly for full control over the generator."
+    )
+    parser.add_argument(
+        '--profile',
+        type=Path,
+        metavar='DIR',
+        help="Stack-sample every file's analysis in the workers and write collapsed stacks (per file and aggregated, rooted at the pipeline phase) plus a summary into DIR."
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        metavar='N',
+        help="With --profile, keep only the N slowest files."
+    )
+    parser.add_argument(
+        '--adaptive',
+        type=Path,
+        metavar='MODEL',
+        help="Skip the phases that the phase model in MODEL found never decisive for files like each one, then update MODEL with this run (fit one from a past run with: python benchmark_report.py model --output MODEL)."
+    )
+    parser.add_argument(
+        '--order',
+        choices=TASK_ORDERS,
+        default="longest",
+        help="Dispatch files by cost estimated from the latest stored runs (or file size and loop count): 'longest' first minimizes the total run time, 'shortest' first gives the most verdicts soonest, 'interleaved' alternates categories (default: longest)."
+    )
+    parser.add_argument(
+        '--artifacts',
+        type=Path,
+        nargs='?',
+        const=ARTIFACTS_DIR,
+        metavar='DIR',
+        help=f"Reuse the source-only phase results of unchanged files from the artifact store in DIR (default: {ARTIFACTS_DIR}) and add the ones this run computes."
+    )
+    parser.add_argument(
+        '--near-duplicates',
+        type=int,
+        nargs='?',
+        const=HAMMING_THRESHOLD,
+        metavar='BITS',
+        help=f"Let files whose AST SimHash is within BITS (default: {HAMMING_THRESHOLD}) of another file's reuse its verdict if a cheap phase ({', '.join(REUSABLE_PHASES)}) decided it, and report how often that was correct."
+    )
+    parser.add_argument(
+        '--route',
+        type=Path,
+        metavar='ROUTER',
+        help="Classify every file up front with the phase router in ROUTER (needs NumPy) and skip the phases it routes away from each one (fit one from a past run with: python benchmark_report.py route --output ROUTER)."
+    )
+    parser.add_argument(
+        '--trace',
+        type=Path,
+        metavar='FILE',
+        help="Append a JSON line per span to FILE: a span for the run, and for every file analyzed one 'file' span with the analysis and phase spans beneath it, recorded in the workers under the run's trace."
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    merge_parser = subparsers.add_parser('merge', help="Combine shard results files into the final score.")
+    merge_parser.add_argument('results', nargs='+', type=Path, help="Shard results files written by --shard runs.")
+    subparsers.add_parser('precompute', help="Fill the artifact store (--artifacts DIR) for the whole suite in parallel.")
     args = parser.parse_args()
+    if args.near_duplicates is not None:
+        try:
+            SimHashIndex(args.near_duplicates)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.route is not None:
+        if args.adaptive is not None:
+            parser.error("--route and --adaptive both choose the phases to skip; use one.")
+        try:
+            PhaseRouter.load(args.route)
+        except (ImportError, OSError, ValueError) as e:
+            parser.error(str(e))
     
-    run_benchmark(force_rebuild=args.rebuild)
+    if args.command == 'merge':
+        merge_shard_results(args.results)
+    elif args.command == 'precompute':
+        precompute_artifacts(args.artifacts or ARTIFACTS_DIR, args.timeout)
+    else:
+        run_benchmark(force_rebuild=args.rebuild, file_timeout=args.timeout,
+                      max_tasks_per_worker=args.max_tasks_per_worker, max_worker_rss=args.max_worker_rss,
+                      resume=args.resume, journal_path=args.journal, shard=args.shard,
+                      shard_output=args.shard_output, offline=args.offline, refresh=args.refresh,
+                      generate=args.generate, profile_dir=args.profile, profile_top=args.profile_top,
+                      adaptive_model=args.adaptive, order=args.order, artifacts_dir=args.artifacts,
+                      near_duplicates=args.near_duplicates, router_path=args.route, trace_path=args.trace)
     
     print("\n--- Benchmark Automation Complete ---")
\ No newline at end of file
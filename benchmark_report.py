@@ -0,0 +1,279 @@
+import json
+import time
+import argparse
+from pathlib import Path
+
+from main import PHASES
+from components.phase_scheduler import PhaseModel, file_features
+from components.phase_router import PhaseRouter, feature_matrix
+
+RUNS_DIR = Path("benchmark_runs")
+SUITE_DIR = Path("benchmark_suite")
+RUN_FORMAT = "halting-benchmark-run/1"
+PERCENTILES = (50, 95, 99)
+REGRESSION_THRESHOLD = 0.10  # Relative slowdown flagged as a regression
+MIN_FILE_SLOWDOWN = 0.05     # Seconds; per-file slowdowns below this are noise
+TOP_FILES = 5
+
+# --- Run Summaries ---
+
+def save_run_summary(files, analyzer_version, analyzed, elapsed, processes, shard=None, runs_dir=RUNS_DIR) -> Path:
+    """
+    Stores one benchmark run: per-file verdicts and phase times plus run-level throughput.
+    `files` maps a file key to {'category', 'verdict', 'correct', 'phases'}.
+    """
+    runs_dir = Path(runs_dir)
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    created = time.strftime("%Y%m%dT%H%M%S")
+    summary = {
+        'format': RUN_FORMAT,
+        'analyzer_version': analyzer_version,
+        'created': created,
+        'shard': list(shard) if shard else None,
+        'processes': processes,
+        'analyzed': analyzed,
+        'elapsed': elapsed,
+        'throughput': analyzed / elapsed if elapsed > 0 else 0.0,
+        'files': files,
+    }
+    path = runs_dir / f"{created}_{analyzer_version}.json"
+    suffix = 1
+    while path.exists():
+        path = runs_dir / f"{created}_{analyzer_version}_{suffix}.json"
+        suffix += 1
+    path.write_text(json.dumps(summary, indent=1))
+    return path
+
+def load_run_summary(path) -> dict:
+    summary = json.loads(Path(path).read_text())
+    if summary.get('format') != RUN_FORMAT:
+        raise ValueError(f"{path}: not a benchmark run summary.")
+    return summary
+
+def latest_runs(count, runs_dir=RUNS_DIR):
+    """Paths of the `count` most recent run summaries, oldest first."""
+    return sorted(Path(runs_dir).glob("*.json"), key=lambda path: path.stat().st_mtime)[-count:]
+
+# --- Phase Report ---
+
+def decided_by(record):
+    """The deciding phase is the last one that ran; None for timeouts and crashes."""
+    phases = record.get('phases') or {}
+    return list(phases)[-1] if phases else None
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+def phase_statistics(files: dict, top=TOP_FILES) -> dict:
+    """
+    Per phase: how many files it ran on and decided, its total time and percentiles,
+    and the files where it was the bottleneck (the phase that took most of the file's time).
+    """
+    statistics = {phase: {'runs': [], 'decided': 0, 'bottlenecks': []} for phase in PHASES}
+    for key, record in files.items():
+        phases = record.get('phases') or {}
+        for phase, seconds in phases.items():
+            statistics.setdefault(phase, {'runs': [], 'decided': 0, 'bottlenecks': []})['runs'].append(seconds)
+        decider = decided_by(record)
+        if decider is not None:
+            statistics[decider]['decided'] += 1
+        if phases:
+            slowest = max(phases, key=phases.get)
+            statistics[slowest]['bottlenecks'].append((phases[slowest], key))
+
+    for phase_stats in statistics.values():
+        runs = sorted(phase_stats['runs'])
+        phase_stats['count'] = len(runs)
+        phase_stats['total'] = sum(runs)
+        phase_stats['percentiles'] = {q: percentile(runs, q) for q in PERCENTILES}
+        phase_stats['bottlenecks'] = sorted(phase_stats['bottlenecks'], reverse=True)[:top]
+        del phase_stats['runs']
+    return statistics
+
+def print_phase_report(files: dict, top=TOP_FILES):
+    """Prints the per-phase table and bottleneck files for the `files` of a run summary."""
+    statistics = phase_statistics(files, top)
+    unfinished = sum(1 for record in files.values() if decided_by(record) is None)
+
+    print(f"{'Phase':<10} {'Ran':>6} {'Decided':>8} {'Total s':>9} " +
+          " ".join(f"{'p' + str(q) + ' ms':>9}" for q in PERCENTILES))
+    for phase, phase_stats in statistics.items():
+        if not phase_stats['count']:
+            continue
+        print(f"{phase:<10} {phase_stats['count']:>6} {phase_stats['decided']:>8} {phase_stats['total']:>9.2f} " +
+              " ".join(f"{phase_stats['percentiles'][q] * 1000:>9.1f}" for q in PERCENTILES))
+    if unfinished:
+        print(f"{'(none)':<10} {'':>6} {unfinished:>8}   timed out, crashed or errored")
+
+    for phase, phase_stats in statistics.items():
+        if phase_stats['bottlenecks']:
+            print(f"\nSlowest files bottlenecked on '{phase}':")
+            for seconds, key in phase_stats['bottlenecks']:
+                print(f"  {seconds:8.3f}s  {key} ({files[key]['verdict']})")
+
+# --- Run Diffing ---
+
+def file_seconds(record):
+    return sum((record.get('phases') or {}).values())
+
+def diff_runs(old: dict, new: dict, threshold=REGRESSION_THRESHOLD, top=TOP_FILES) -> bool:
+    """Prints throughput, per-phase and per-file differences. Returns True if a regression was flagged."""
+    regressed = False
+    print(f"Old: {old['created']} (analyzer {old['analyzer_version']}, {len(old['files'])} files)")
+    print(f"New: {new['created']} (analyzer {new['analyzer_version']}, {len(new['files'])} files)")
+
+    change = relative_change(old['throughput'], new['throughput'])
+    flag = ""
+    if change < -threshold:
+        flag = "  << REGRESSION"
+        regressed = True
+    print(f"\nThroughput: {old['throughput']:.2f} -> {new['throughput']:.2f} files/s ({change:+.1%}){flag}")
+
+    common = sorted(old['files'].keys() & new['files'].keys())
+    old_stats = phase_statistics({key: old['files'][key] for key in common})
+    new_stats = phase_statistics({key: new['files'][key] for key in common})
+    print(f"\nPhase time over the {len(common)} files in both runs:")
+    for phase in new_stats:
+        before, after = old_stats.get(phase, {'total': 0.0})['total'], new_stats[phase]['total']
+        if not before and not after:
+            continue
+        change = relative_change(before, after)
+        flag = ""
+        if after - before > MIN_FILE_SLOWDOWN and change > threshold:
+            flag = "  << REGRESSION"
+            regressed = True
+        print(f"  {phase:<10} {before:9.2f}s -> {after:9.2f}s ({change:+.1%}){flag}")
+
+    verdict_changes = [(key, old['files'][key], new['files'][key]) for key in common
+                       if old['files'][key]['verdict'] != new['files'][key]['verdict']]
+    print(f"\nVerdict changes: {len(verdict_changes)}")
+    for key, before, after in verdict_changes:
+        if before['correct'] == after['correct']:
+            marker = " "
+        else:
+            marker = "+" if after['correct'] else "-"
+        print(f"  {marker} {key}: {before['verdict']} -> {after['verdict']}")
+
+    slowdowns = []
+    for key in common:
+        before, after = file_seconds(old['files'][key]), file_seconds(new['files'][key])
+        if after - before > MIN_FILE_SLOWDOWN and relative_change(before, after) > threshold:
+            slowdowns.append((after - before, key, before, after))
+    if slowdowns:
+        print(f"\nSlower files: {len(slowdowns)} (top {min(top, len(slowdowns))})")
+        for _, key, before, after in sorted(slowdowns, reverse=True)[:top]:
+            print(f"  {key}: {before:.3f}s -> {after:.3f}s")
+
+    only_old = len(old['files'].keys() - new['files'].keys())
+    only_new = len(new['files'].keys() - old['files'].keys())
+    if only_old or only_new:
+        print(f"\nFiles only in the old run: {only_old}; only in the new run: {only_new}")
+    return regressed
+
+def relative_change(before, after):
+    if before == 0:
+        return 0.0 if after == 0 else float('inf')
+    return (after - before) / before
+
+# --- Phase Model ---
+
+def fit_phase_model(files: dict, suite_dir=SUITE_DIR, model=None) -> PhaseModel:
+    """
+    Adds every file of a run to a PhaseModel (a new one by default). Features are read
+    from the suite, so files deleted since the run are left out.
+    """
+    model = model or PhaseModel()
+    for key, record in files.items():
+        path = Path(suite_dir) / key
+        if record.get('phases') and path.exists():
+            model.observe(file_features(path.read_text(encoding='utf-8', errors='ignore')), record['phases'])
+    return model
+
+def fit_phase_router(files: dict, suite_dir=SUITE_DIR) -> tuple[PhaseRouter, float]:
+    """
+    Fits a PhaseRouter to the analyzed files of a run that are still in the suite.
+    Returns it with the share of those files whose deciding phase it predicts.
+    """
+    programs, phase_times = [], []
+    for key, record in files.items():
+        path = Path(suite_dir) / key
+        if record.get('phases') and path.exists():
+            programs.append(path.read_text(encoding='utf-8', errors='ignore'))
+            phase_times.append(record['phases'])
+    matrix = feature_matrix(programs)
+    router = PhaseRouter.fit(matrix, phase_times)
+    hits = sum(predicted == list(times)[-1] for predicted, times in zip(router.predict(matrix), phase_times))
+    return router, hits / max(len(programs), 1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report on stored benchmark runs.")
+    parser.add_argument('--runs-dir', type=Path, default=RUNS_DIR, help=f"Where run summaries are stored (default: {RUNS_DIR}).")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    show_parser = subparsers.add_parser('show', help="Per-phase cost and decisiveness of one run (default: the latest).")
+    show_parser.add_argument('run', nargs='?', type=Path)
+    show_parser.add_argument('--top', type=int, default=TOP_FILES, help="Bottleneck files listed per phase.")
+    diff_parser = subparsers.add_parser('diff', help="Compare two runs (default: the two latest).")
+    diff_parser.add_argument('old', nargs='?', type=Path)
+    diff_parser.add_argument('new', nargs='?', type=Path)
+    diff_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                             help=f"Relative slowdown flagged as a regression (default: {REGRESSION_THRESHOLD}).")
+    diff_parser.add_argument('--top', type=int, default=TOP_FILES, help="Slower files listed.")
+    model_parser = subparsers.add_parser('model', help="Fit a phase model for --adaptive from runs (default: the latest, unless --from is given) and describe it.")
+    model_parser.add_argument('runs', nargs='*', type=Path)
+    model_parser.add_argument('--from', dest='start', type=Path, metavar='FILE', help="Start from the phase model in FILE instead of an empty one.")
+    model_parser.add_argument('--suite', type=Path, default=SUITE_DIR, help=f"Corpus the runs analyzed (default: {SUITE_DIR}).")
+    model_parser.add_argument('--output', type=Path, metavar='FILE', help="Write the fitted model to FILE.")
+    route_parser = subparsers.add_parser('route', help="Fit a phase router for --route from runs (default: the latest) and describe it.")
+    route_parser.add_argument('runs', nargs='*', type=Path)
+    route_parser.add_argument('--suite', type=Path, default=SUITE_DIR, help=f"Corpus the runs analyzed (default: {SUITE_DIR}).")
+    route_parser.add_argument('--output', type=Path, metavar='FILE', help="Write the fitted router to FILE.")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        runs = [args.run] if args.run else latest_runs(1, args.runs_dir)
+        if not runs:
+            parser.error(f"no run summaries in {args.runs_dir}")
+        print(f"--- Run {runs[0]} ---")
+        print_phase_report(load_run_summary(runs[0])['files'], args.top)
+    elif args.command == 'model':
+        runs = args.runs or ([] if args.start else latest_runs(1, args.runs_dir))
+        if not runs and not args.start:
+            parser.error(f"no run summaries in {args.runs_dir}")
+        model = PhaseModel.load(args.start) if args.start else PhaseModel()
+        for run in runs:
+            fit_phase_model(load_run_summary(run)['files'], args.suite, model)
+        print("\n".join(model.describe(PHASES)))
+        if args.output:
+            model.save(args.output)
+            print(f"\n--- Phase model written to {args.output} (use it with --adaptive) ---")
+    elif args.command == 'route':
+        runs = args.runs or latest_runs(1, args.runs_dir)
+        if not runs:
+            parser.error(f"no run summaries in {args.runs_dir}")
+        files = {}
+        for run in runs:  # A file in several runs is trained on its latest phase times
+            files.update(load_run_summary(run)['files'])
+        try:
+            router, accuracy = fit_phase_router(files, args.suite)
+        except ImportError as e:
+            parser.error(str(e))
+        print("\n".join(router.model.describe(PHASES)))
+        print(f"\nPredicts the deciding phase of {accuracy:.1%} of the training files.")
+        if args.output:
+            router.save(args.output)
+            print(f"\n--- Phase router written to {args.output} (use it with benchmark.py --route) ---")
+    else:
+        if args.old and args.new:
+            runs = [args.old, args.new]
+        elif args.old:
+            runs = [args.old] + latest_runs(1, args.runs_dir)
+        else:
+            runs = latest_runs(2, args.runs_dir)
+        if len(runs) < 2:
+            parser.error("need two run summaries to diff")
+        if diff_runs(load_run_summary(runs[0]), load_run_summary(runs[1]), args.threshold, args.top):
+            raise SystemExit(1)
@@ -0,0 +1,172 @@
+import ast
+import os
+import sys
+import contextlib
+import json
+import math
+import time
+import argparse
+from pathlib import Path
+
+from main import analyze_halting
+from components.semantic_hashing import get_semantic_hash
+from components.paradox_detection import detect_paradox
+from components.function_summaries import summarize_program, SummaryCache
+from components.static_analysis import static_preparation
+from components.heuristic_classifier import classify_known_problems
+from components.symbolic_prover import prove_termination
+from components.dynamic_tracing import dynamic_tracing
+from synthetic_corpus import ProgramSpec, generate_program
+
+REPORT_DIR = Path("complexity_report")
+FIT_POINTS = 4            # The exponent is fitted on the largest sizes, where constant overhead no longer dominates
+MIN_MEASURABLE = 0.005    # Seconds; curves that never exceed this are too fast to fit meaningfully
+MAX_POINT_SECONDS = 15.0  # Stop growing an axis once one measurement takes longer than this
+GENERATOR_SEED = 7
+
+# --- Size Axes ---
+# Each axis maps a size parameter to (program, measured size).
+
+def ast_nodes_program(lines):
+    """A generated halting program of about `lines` lines, 25 lines per function."""
+    source, _ = generate_program(ProgramSpec(target_lines=lines, function_count=max(1, lines // 25),
+                                             recursion="none", seed=GENERATOR_SEED))
+    return source, sum(1 for _ in ast.walk(ast.parse(source)))
+
+def functions_program(count):
+    """A generated halting program with `count` small functions."""
+    source, _ = generate_program(ProgramSpec(target_lines=count * 10, function_count=count,
+                                             recursion="none", seed=GENERATOR_SEED))
+    return source, count
+
+def trace_length_program(iterations):
+    """A loop whose state never repeats, so tracing runs until the loop ends."""
+    source = f"total = 0\ni = 0\nwhile i < {iterations}:\n    total = total + i\n    i = i + 1\n"
+    return source, count_line_events(source)
+
+def count_line_events(source):
+    events = 0
+    def tracer(frame, event, arg):
+        nonlocal events
+        if event == 'line':
+            events += 1
+        return tracer
+    sys.settrace(tracer)
+    try:
+        exec(compile(source, "<string>", "exec"), {})
+    finally:
+        sys.settrace(None)
+    return events
+
+AXES = {
+    'ast_nodes': (ast_nodes_program, [250, 500, 1000, 2000, 4000]),
+    'functions': (functions_program, [25, 50, 100, 200, 400]),
+    'trace_length': (trace_length_program, [2000, 4000, 8000, 16000, 32000]),
+}
+
+def summarize_uncached(program):
+    """The summary phase with a cold cache, so every size is measured doing the full work."""
+    return summarize_program(program, SummaryCache())
+
+# --- Declared Bounds ---
+# (name, axis, function, maximum scaling exponent). 1.25 allows n log n plus timing noise.
+CHECKS = [
+    ("meta", 'ast_nodes', get_semantic_hash, 1.25),
+    ("paradox", 'ast_nodes', detect_paradox, 1.25),
+    ("summary", 'ast_nodes', summarize_uncached, 1.25),
+    ("summary", 'functions', summarize_uncached, 1.25),
+    ("static", 'ast_nodes', static_preparation, 1.25),
+    ("static", 'functions', static_preparation, 1.25),
+    ("heuristic", 'ast_nodes', classify_known_problems, 1.25),
+    ("prover", 'ast_nodes', prove_termination, 1.25),
+    ("prover", 'functions', prove_termination, 1.25),
+    ("dynamic", 'trace_length', dynamic_tracing, 1.25),
+    ("pipeline", 'ast_nodes', analyze_halting, 1.25),
+    ("pipeline", 'functions', analyze_halting, 1.25),
+]
+
+def fit_exponent(sizes, times):
+    """Least-squares slope of log(time) against log(size): time ~ size ** exponent."""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(seconds, 1e-9)) for seconds in times]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+def measure(func, program, repeats):
+    """Best-of-`repeats` wall-clock time of one call."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_check(name, axis, func, bound, scale=1.0, repeats=3, max_point_seconds=MAX_POINT_SECONDS):
+    build, parameters = AXES[axis]
+    points = []
+    for parameter in parameters:
+        program, size = build(max(1, int(parameter * scale)))
+        seconds = measure(func, program, repeats)
+        points.append((size, seconds))
+        if seconds > max_point_seconds:
+            break
+    fitted = points[-FIT_POINTS:]
+    exponent = fit_exponent([size for size, _ in fitted], [seconds for _, seconds in fitted])
+    if max(seconds for _, seconds in points) < MIN_MEASURABLE:
+        status = "too fast"
+    elif len(fitted) < 2:
+        status = "too few points"
+    else:
+        status = "ok" if exponent <= bound else "FAIL"
+    return {'phase': name, 'axis': axis, 'bound': bound, 'exponent': exponent,
+            'status': status, 'points': points}
+
+# --- Report ---
+
+def write_report(results, report_dir=REPORT_DIR):
+    """Writes report.json (raw curves) and report.md (one table per curve)."""
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    (report_dir / "report.json").write_text(json.dumps(results, indent=1))
+
+    lines = ["# Complexity Report", "",
+             "| Phase | Axis | Fitted exponent | Declared bound | Status |",
+             "|---|---|---|---|---|"]
+    for result in results:
+        lines.append(f"| {result['phase']} | {result['axis']} | {result['exponent']:.2f} | "
+                     f"{result['bound']:.2f} | {result['status']} |")
+    for result in results:
+        peak = max(seconds for _, seconds in result['points']) or 1.0
+        lines += ["", f"## {result['phase']} vs {result['axis']}", "",
+                  f"| {result['axis']} | seconds | |", "|---|---|---|"]
+        for size, seconds in result['points']:
+            lines.append(f"| {size} | {seconds:.4f} | {'#' * max(1, round(40 * seconds / peak))} |")
+    (report_dir / "report.md").write_text("\n".join(lines) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the scaling exponent of each analysis phase and check it against its declared bound.")
+    parser.add_argument('--phases', nargs='+', help="Only run checks for these phases (e.g. static dynamic pipeline).")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every size parameter (e.g. 0.25 for a quick run).")
+    parser.add_argument('--repeats', type=int, default=3, help="Best-of-N timing per point.")
+    parser.add_argument('--max-point-seconds', type=float, default=MAX_POINT_SECONDS,
+                        help=f"Stop growing an axis once a point takes longer than this (default: {MAX_POINT_SECONDS}).")
+    parser.add_argument('--report', type=Path, default=REPORT_DIR, help=f"Report directory (default: {REPORT_DIR}).")
+    args = parser.parse_args()
+
+    results = []
+    # The analyzer's debug output would drown the report.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+        for name, axis, func, bound in CHECKS:
+            if args.phases and name not in args.phases:
+                continue
+            result = run_check(name, axis, func, bound, args.scale, args.repeats, args.max_point_seconds)
+            results.append(result)
+            print(f"{name:<10} vs {axis:<13} exponent {result['exponent']:5.2f} (bound {bound:.2f}): {result['status']}")
+
+    write_report(results, args.report)
+    print(f"\nReport written to {args.report / 'report.md'}")
+    if any(result['status'] == "FAIL" for result in results):
+        sys.exit(1)
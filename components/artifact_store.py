@@ -0,0 +1,58 @@
+# File: components/artifact_store.py
+import os
+import shutil
+import marshal
+import hashlib
+from pathlib import Path
+
+from components.results_journal import analyzer_version
+
+# Facts that depend on the source text alone, so they can be derived once per
+# content hash: the semantic hash ("meta"), the paradox flag, and the (result, reason)
+# of every phase that only inspects the code. Dynamic tracing executes the program
+# and is never stored.
+SOURCE_PHASES = ("meta", "paradox", "summary", "static", "heuristic", "prover")
+MARSHAL_VERSION = 4
+
+def content_key(program: str) -> str:
+    return hashlib.blake2b(program.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+
+class ArtifactStore:
+    """
+    Derived facts per file, keyed by the raw content hash under a directory per
+    analyzer version: root/<version>/<key[:2]>/<key>. Each entry is a marshalled
+    {phase: fact} dict, typically a few hundred bytes, and may be partial: phases that
+    never ran on the file (because an earlier one decided) are filled in on demand.
+    """
+    def __init__(self, root, version=None):
+        self.root = Path(root)
+        self.version = version or analyzer_version()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key) -> Path:
+        return self.root / self.version / key[:2] / key
+
+    def load(self, program: str) -> dict:
+        """The stored facts for `program` ({} if none, or if the entry is unreadable)."""
+        try:
+            facts = marshal.loads(self._path(content_key(program)).read_bytes())
+        except (OSError, EOFError, ValueError, TypeError):
+            self.misses += 1
+            return {}
+        self.hits += 1
+        return facts
+
+    def save(self, program: str, facts: dict):
+        path = self._path(content_key(program))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # Workers may race on duplicate files
+        temporary.write_bytes(marshal.dumps(facts, MARSHAL_VERSION))
+        temporary.replace(path)
+
+    def prune(self) -> int:
+        """Deletes entries written by other analyzer versions; returns how many version directories went."""
+        stale = [path for path in self.root.iterdir() if path.is_dir() and path.name != self.version] if self.root.exists() else []
+        for path in stale:
+            shutil.rmtree(path)
+        return len(stale)
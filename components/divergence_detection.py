@@ -0,0 +1,228 @@
+# File: components/divergence_detection.py
+import ast
+
+# Number of consecutive loop iterations that must move strictly away from the
+# guard before a loop is declared divergent.
+DIVERGENCE_WINDOW = 500
+
+# Builtins that do not raise for a value whose type stays the same; any other call may exit the loop.
+SAFE_FUNCTIONS = {"print", "repr", "str", "bool", "id", "type", "isinstance", "abs", "len"}
+# Operators that can raise depending on their right operand (zero, negative or huge values).
+RAISING_OPERATORS = (ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.LShift, ast.RShift)
+
+class LoopGuard:
+    """
+    A `while` loop whose guard compares a numeric quantity against zero:
+    `left - right <op> 0`, where each side is a variable name or a numeric constant.
+    `direction` is +1 if increasing the quantity keeps the guard true forever,
+    -1 if decreasing it does, and 0 if moving away from zero in either sign does.
+    `may_exit` is set if the body can still leave the loop another way: a call,
+    or an operation that may raise once some variable (not only the guard's) changes.
+    """
+    def __init__(self, lineno, left, right, direction, variable, may_exit=False):
+        self.lineno = lineno
+        self.left = left
+        self.right = right
+        self.direction = direction
+        self.variable = variable
+        self.may_exit = may_exit
+
+    def quantity(self, f_locals):
+        """Returns `left - right` in the given scope, or None if it is not numeric."""
+        left = self._operand(self.left, f_locals)
+        right = self._operand(self.right, f_locals)
+        if left is None or right is None:
+            return None
+        return left - right
+
+    @staticmethod
+    def _operand(operand, f_locals):
+        if isinstance(operand, str):
+            value = f_locals.get(operand)
+        else:
+            value = operand
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value
+
+    def to_dict(self):
+        return {'lineno': self.lineno, 'left': self.left, 'right': self.right,
+                'direction': self.direction, 'variable': self.variable, 'may_exit': self.may_exit}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['lineno'], data['left'], data['right'], data['direction'], data['variable'],
+                   data.get('may_exit', False))
+
+class GuardVisitor(ast.NodeVisitor):
+    """Collects the loop guards that are candidates for divergence monitoring."""
+    def __init__(self):
+        self.guards = {}
+
+    def visit_While(self, node):
+        guard = self._parse_guard(node)
+        if guard is not None and not self._has_bound_in_body(node, guard):
+            guard.may_exit = self._may_exit(node, guard)
+            self.guards[node.lineno] = guard
+        self.generic_visit(node)
+
+    def _parse_guard(self, node):
+        test = node.test
+        # `while x:` is `while x != 0:`
+        if isinstance(test, ast.Name):
+            return LoopGuard(node.lineno, test.id, 0, 0, test.id)
+        if not (isinstance(test, ast.Compare) and len(test.ops) == 1):
+            return None
+        left = self._operand(test.left)
+        right = self._operand(test.comparators[0])
+        if left is None or right is None:
+            return None
+        names = [operand for operand in (left, right) if isinstance(operand, str)]
+        if not names:
+            return None
+        op = test.ops[0]
+        if isinstance(op, (ast.Gt, ast.GtE)):
+            direction = 1
+        elif isinstance(op, (ast.Lt, ast.LtE)):
+            direction = -1
+        elif isinstance(op, ast.NotEq):
+            direction = 0
+        else:
+            return None
+        return LoopGuard(node.lineno, left, right, direction, names[0])
+
+    @staticmethod
+    def _operand(node):
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node.value
+        if (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and
+                isinstance(node.operand, ast.Constant) and isinstance(node.operand.value, (int, float))):
+            return -node.operand.value
+        return None
+
+    def _has_bound_in_body(self, node, guard):
+        """
+        A loop has a bound in sight if its body can leave the loop other than
+        through the guard, or if it compares a guard variable against anything.
+        """
+        guard_names = {operand for operand in (guard.left, guard.right) if isinstance(operand, str)}
+        pending = list(node.body) + list(node.orelse)
+        while pending:
+            child = pending.pop()
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                continue
+            if isinstance(child, (ast.Return, ast.Raise, ast.Break)):
+                return True
+            if isinstance(child, ast.Compare):
+                for comp_node in ast.walk(child):
+                    if isinstance(comp_node, ast.Name) and comp_node.id in guard_names:
+                        return True
+            if isinstance(child, (ast.While, ast.For, ast.AsyncFor)):
+                # A `break` in a nested loop only leaves the nested loop.
+                pending.extend(stmt for stmt in ast.walk(child) if isinstance(stmt, (ast.Return, ast.Raise, ast.Compare)))
+                continue
+            pending.extend(ast.iter_child_nodes(child))
+        return False
+
+    def _may_exit(self, node, guard):
+        """
+        Whether the body may leave the loop without a visible bound, i.e. may raise or
+        stop: any call but a SAFE_FUNCTIONS builtin (exit calls, exhausted iterators,
+        helpers that raise after N calls), any indexing (IndexError, KeyError), division,
+        powers or shifts by a non-constant, assertions, and yields (the consumer may stop).
+        The early divergence verdict is left for bodies that can do none of these.
+        """
+        pending = list(node.body) + list(node.orelse)
+        while pending:
+            child = pending.pop()
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                continue
+            if isinstance(child, (ast.Assert, ast.Yield, ast.YieldFrom, ast.Await)):
+                return True
+            if isinstance(child, ast.Call) and not (isinstance(child.func, ast.Name) and child.func.id in SAFE_FUNCTIONS):
+                return True
+            if isinstance(child, ast.Subscript) and not isinstance(child.slice, ast.Slice):
+                return True
+            if isinstance(child, (ast.BinOp, ast.AugAssign)) and isinstance(child.op, RAISING_OPERATORS):
+                if not isinstance(child.right if isinstance(child, ast.BinOp) else child.value, ast.Constant):
+                    return True
+            pending.extend(ast.iter_child_nodes(child))
+        return False
+
+def find_loop_guards(tree) -> dict:
+    """Returns {header line number: LoopGuard} for every monitorable `while` loop."""
+    visitor = GuardVisitor()
+    visitor.visit(tree)
+    return visitor.guards
+
+class DivergenceMonitor:
+    """
+    Watches the guard quantity of each loop at its header line and reports a loop
+    whose quantity moves strictly away from the guard's bound for
+    `window` consecutive iterations. A guard that `may_exit` is never reported
+    early: `persisting` names it only if it still diverges when the trace budget runs out.
+    """
+    def __init__(self, guards: dict, window: int = DIVERGENCE_WINDOW):
+        self.guards = guards
+        self.window = window
+        # (frame key, header line) -> [last quantity, consecutive diverging steps]
+        self._progress = {}
+        self._last_key = None
+        self.diverged = None
+
+    def observe(self, frame_key, lineno, f_locals):
+        """
+        Records one pass through a loop header.
+        Returns the diverging LoopGuard once the window is reached, else None.
+        """
+        guard = self.guards.get(lineno)
+        if guard is None:
+            return None
+        return self.observe_quantity(frame_key, lineno, guard.quantity(f_locals))
+
+    def observe_quantity(self, frame_key, lineno, quantity):
+        """
+        Like `observe`, for a guard quantity that was already computed,
+        e.g. one read back from a recorded trace. None resets the loop.
+        """
+        guard = self.guards.get(lineno)
+        if guard is None:
+            return None
+        key = (frame_key, lineno)
+        self._last_key = key
+        if quantity is None:
+            self._progress.pop(key, None)
+            return None
+
+        progress = self._progress.get(key)
+        if progress is None:
+            self._progress[key] = [quantity, 0]
+            return None
+
+        last = progress[0]
+        if guard.direction > 0:
+            diverging = quantity > last
+        elif guard.direction < 0:
+            diverging = quantity < last
+        else:
+            diverging = abs(quantity) > abs(last)
+
+        progress[0] = quantity
+        progress[1] = progress[1] + 1 if diverging else 0
+        if progress[1] >= self.window and not guard.may_exit:
+            self.diverged = guard
+            return guard
+        return None
+
+    def persisting(self):
+        """
+        The guard of the most recently observed loop if it has been diverging for at
+        least `window` iterations up to now, else None. Call it once the budget is spent.
+        """
+        progress = self._progress.get(self._last_key)
+        if progress is None or progress[1] < self.window:
+            return None
+        self.diverged = self.guards[self._last_key[1]]
+        return self.diverged
@@ -2,12 +2,23 @@
 import sys
 import re
 import ast
-from collections import defaultdict
-import hashlib
+from .state_fingerprint import StateFingerprinter, GlobalReferences, INEXACT_BIT
+from .divergence_detection import find_loop_guards, DivergenceMonitor
 
-def dynamic_tracing(program: str) -> tuple[str, str]:
+# Trace budgets: a short first run, escalated geometrically while it stays inconclusive.
+INITIAL_TRACE_BUDGET = 2000
+INITIAL_CALL_DEPTH = 50
+BUDGET_GROWTH_FACTOR = 4
+MAX_TRACE_BUDGET = 100000  # Per-file cap on line events, summed over every run
+MAX_CALL_DEPTH = 400
+
+def dynamic_tracing(program: str, escalate: bool = True, max_trace_budget: int = MAX_TRACE_BUDGET, recorder=None) -> tuple[str, str]:
     """
     Phase 3: Dynamic tracing to detect non-halting behavior.
+    With `escalate`, the program is first traced under a small budget and re-run
+    with larger budgets only when a run exhausts its budget without a verdict;
+    `max_trace_budget` bounds the line events of all runs together.
+    An optional TraceRecorder captures every run for offline replay.
     Returns a tuple of (result, reason).
     """
     try:
@@ -21,50 +32,139 @@ def dynamic_tracing(program: str) -> tuple[str, str]:
         if has_analyzer_call:
             return "does not halt", "Dynamic tracing: Pre-execution check found a call to the analyzer."
 
-        trace_log = []
-        call_depth = defaultdict(int)
-        state_hashes = []
+        loop_guards = find_loop_guards(tree)
+        if recorder is None:
+            return _escalating_trace(program, escalate, max_trace_budget, loop_guards)
+
+        recorder.start(loop_guards)
+        result, reason = "impossible to determine", "Dynamic tracing: Trace recording was interrupted."
+        try:
+            result, reason = _escalating_trace(program, escalate, max_trace_budget, loop_guards, recorder)
+        finally:
+            recorder.finish(result, reason)
+        return result, reason
+    except Exception as e:
+        return "impossible to determine", f"Dynamic tracing: An internal error occurred: {str(e)}."
+
+def _escalating_trace(program: str, escalate: bool, max_trace_budget: int, loop_guards: dict, recorder=None) -> tuple[str, str]:
+    if not escalate:
+        return _trace_execution(program, max_trace_budget, MAX_CALL_DEPTH, True, loop_guards, recorder)
+
+    # Iterative deepening: re-run with geometrically larger budgets only while inconclusive.
+    # The runs share `max_trace_budget`; once the next step would not fit, the final run gets what is left.
+    remaining = max_trace_budget
+    trace_budget = min(INITIAL_TRACE_BUDGET, remaining)
+    depth_budget = INITIAL_CALL_DEPTH
+    while True:
+        final = trace_budget * (1 + BUDGET_GROWTH_FACTOR) > remaining
+        if final:
+            trace_budget, depth_budget = remaining, MAX_CALL_DEPTH
+        result, reason = _trace_execution(program, trace_budget, depth_budget, final, loop_guards, recorder)
+        if result != "continue":
+            return result, reason
+        remaining -= trace_budget
+        trace_budget *= BUDGET_GROWTH_FACTOR
+        depth_budget = min(depth_budget * BUDGET_GROWTH_FACTOR, MAX_CALL_DEPTH)
+
+def _trace_execution(program: str, trace_budget: int, depth_budget: int, final: bool, loop_guards=None, recorder=None) -> tuple[str, str]:
+    """
+    Executes the program once under a tracer limited to `trace_budget` line events
+    and `depth_budget` nested calls. Exhausting a budget is only a verdict on the
+    `final` run; otherwise it returns ("continue", reason) so the caller can escalate.
+    Loops in `loop_guards` are watched for monotonic divergence from their guard,
+    and every line event is passed to `recorder` if one is given.
+    """
+    trace_log = []
+    call_depth = [0]
+    # id(frame) -> activation number, reassigned on every 'call' so a reused id never aliases.
+    activations = {}
+    activation_counter = [0]
+    state_hashes = set()
+    fingerprinter = StateFingerprinter()
+    program_globals = {}
+    loop_guards = loop_guards or {}
+    divergence_monitor = DivergenceMonitor(loop_guards)
+    if recorder is not None:
+        recorder.begin_run(trace_budget, depth_budget)
 
-        def trace(frame, event, arg):
-            if event == "call":
-                call_depth[frame.f_code.co_name] += 1
-                if call_depth[frame.f_code.co_name] > 200:  # Increased limit
-                    raise RecursionError("Deep recursion detected")
-            if event == "line":
-                line_no = frame.f_lineno
-                local_vars_tuple = tuple(sorted(frame.f_locals.items()))
-                state = (line_no, local_vars_tuple)
-                state_hash = hashlib.sha256(str(state).encode()).hexdigest()
-                trace_log.append(state_hash)
+    def trace(frame, event, arg):
+        if event == "call":
+            call_depth[0] += 1
+            activation_counter[0] += 1
+            activations[id(frame)] = activation_counter[0]
+            if call_depth[0] > depth_budget:
+                raise RecursionError("Deep recursion detected")
+        elif event == "return":
+            call_depth[0] -= 1
+        elif event == "line":
+            f_locals = frame.f_locals
+            f_globals, global_names = None, None
+            if frame.f_globals is program_globals or f_locals is frame.f_globals:
+                # The program's frames depend on its globals; a module frame's locals are its globals.
+                f_globals, global_names = frame.f_globals, global_references.names(frame.f_code, frame.f_lasti)
+            state_hash = fingerprinter.fingerprint_frame(frame.f_lineno, f_locals, frame.f_code,
+                                                       activations.get(id(frame), 0), frame.f_lasti,
+                                                       f_globals, global_names)
+            trace_log.append(state_hash)
+            if recorder is not None:
+                recorder.record_line(frame.f_lineno, state_hash)
 
-            if len(trace_log) > 20000:  # Increased limit
+            if len(trace_log) > trace_budget:
                 raise RuntimeError("Trace log exceeded maximum size")
 
-            # Cycle detection with hashes
-            if state_hash in state_hashes:
-                raise RuntimeError("Cycle detected in execution trace")
-            state_hashes.append(state_hash)
+            # Cycle detection with fingerprints; a sampled (inexact) state proves nothing.
+            if not state_hash & INEXACT_BIT:
+                if state_hash in state_hashes:
+                    raise RuntimeError("Cycle detected in execution trace")
+                state_hashes.add(state_hash)
 
-            return trace
+            # Divergence detection at loop headers of the analyzed program
+            if frame.f_lineno in loop_guards and frame.f_code.co_filename == "<string>":
+                quantity = loop_guards[frame.f_lineno].quantity(f_locals)
+                if recorder is not None:
+                    recorder.record_guard(id(frame), frame.f_lineno, quantity)
+                guard = divergence_monitor.observe_quantity(id(frame), frame.f_lineno, quantity)
+                if guard is not None:
+                    raise RuntimeError(f"Divergence detected: variable '{guard.variable}' on line {guard.lineno}")
 
-        sys.settrace(trace)
-        try:
-            exec(program, {})
-        except RecursionError:
-            sys.settrace(None)
-            return "does not halt", "Dynamic tracing: Execution exceeded maximum recursion depth."
-        except RuntimeError as e:
-            sys.settrace(None)
-            if "Cycle detected" in str(e):
-                return "does not halt", "Dynamic tracing: Execution trace entered a deterministic loop."
-            elif "Trace log exceeded" in str(e):
-                return "does not halt", "Dynamic tracing: Execution exceeded maximum trace log size."
-            else:
-                return "halts", f"Dynamic tracing: Execution terminated with a runtime error: {str(e)}."
-        except Exception as e:
-            sys.settrace(None)
-            return "halts", f"Dynamic tracing: Execution terminated with an exception: {type(e).__name__}."
+        return trace
+
+    try:
+        code = compile(program, "<string>", "exec")
+    except Exception as e:
+        return "halts", f"Dynamic tracing: Execution terminated with an exception: {type(e).__name__}."
+    # Built before tracing starts: its own line events would count against the budget.
+    global_references = GlobalReferences(code)
+
+    sys.settrace(trace)
+    try:
+        exec(code, program_globals)
+    except RecursionError as e:
+        sys.settrace(None)
+        if not final and "Deep recursion detected" in str(e):
+            return "continue", f"Dynamic tracing: Call depth budget of {depth_budget} exhausted."
+        return "does not halt", "Dynamic tracing: Execution exceeded maximum recursion depth."
+    except RuntimeError as e:
         sys.settrace(None)
-        return "halts", "Dynamic tracing: Program executed to completion without issue."
+        if "Cycle detected" in str(e):
+            return "does not halt", "Dynamic tracing: Execution trace entered a deterministic loop."
+        elif "Divergence detected" in str(e):
+            guard = divergence_monitor.diverged
+            return "does not halt", f"Dynamic tracing: Variable '{guard.variable}' moved monotonically away from the loop guard on line {guard.lineno} with no bound in sight."
+        elif "Trace log exceeded" in str(e):
+            if not final:
+                return "continue", f"Dynamic tracing: Trace budget of {trace_budget} entries exhausted."
+            guard = divergence_monitor.persisting()
+            if guard is not None:
+                return "does not halt", f"Dynamic tracing: Variable '{guard.variable}' moved monotonically away from the loop guard on line {guard.lineno} for the rest of the trace budget."
+            return "does not halt", "Dynamic tracing: Execution exceeded maximum trace log size."
+        else:
+            return "halts", f"Dynamic tracing: Execution terminated with a runtime error: {str(e)}."
+    except SystemExit:
+        sys.settrace(None)
+        return "halts", "Dynamic tracing: Program exited."
     except Exception as e:
-        return "impossible to determine", f"Dynamic tracing: An internal error occurred: {str(e)}."
\ No newline at end of file
+        sys.settrace(None)
+        return "halts", f"Dynamic tracing: Execution terminated with an exception: {type(e).__name__}."
+    sys.settrace(None)
+    return "halts", "Dynamic tracing: Program executed to completion without issue."
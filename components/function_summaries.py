@@ -0,0 +1,597 @@
+# File: components/function_summaries.py
+import ast
+import json
+import hashlib
+import builtins
+from pathlib import Path
+
+from components.semantic_hashing import Canonicalizer
+
+MODULE_KEY = "<module>"
+SELF = "<self>"  # A function's reference to its own name, which the canonical hash renames away
+LOCAL = "<local>"  # Prefix: a function nested in the same top-level function, by its position there
+RESULT = "<result>"  # Prefix: a call of whatever the prefixed call returned (e.g. a decorator factory's decorator)
+VALUE = "<value>"  # Prefix: a function used as a value (passed, stored, returned): something may call it
+UNRESOLVED = "<unresolved>"  # A call target that cannot be pinned down: it may run anything
+INHERITED = "<inherited>"  # Prefix: a base of a class with its own __init__: only its implicit code counts
+MAX_CACHED_SUMMARIES = 100000  # Oldest summaries are dropped beyond this
+SUMMARY_FORMAT = "halting-function-summaries/3"
+EXIT_CALLS = {"exit", "_exit", "quit", "abort"}
+CODE_BUILTINS = {"exec", "eval"}  # Builtins that run code given as a string
+LOOKUP_BUILTINS = {"getattr"}  # Builtins whose result may be a function of this module
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_TYPES = (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+class SummaryCache:
+    """
+    Summaries of top-level functions and methods keyed by canonical subtree hash:
+    {hash: {'functions': [{'verdict': 'halts' | 'diverges' | 'unknown', 'callees': [...],
+    'unconditional': [...], 'decorators': [...]}, ...], 'globals': [...]}}, one entry per
+    function in nested_functions order. A summary depends only on its own subtree, so an
+    edit elsewhere in the module never invalidates it. Kept in memory; `load`/`save` persist it between runs.
+    """
+    def __init__(self, limit=MAX_CACHED_SUMMARIES):
+        self.limit = limit
+        self.summaries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        summary = self.summaries.get(key)
+        if summary is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return summary
+
+    def put(self, key, summary):
+        self.summaries[key] = summary
+        while len(self.summaries) > self.limit:
+            del self.summaries[next(iter(self.summaries))]
+
+    def load(self, path):
+        path = Path(path)
+        if path.exists():
+            data = json.loads(path.read_text())
+            if data.get('format') == SUMMARY_FORMAT:
+                self.summaries.update(data['summaries'])
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps({'format': SUMMARY_FORMAT, 'summaries': self.summaries}))
+        temporary.replace(path)
+
+# Shared by every analyze_halting call in this process.
+_default_cache = SummaryCache()
+
+def default_cache() -> SummaryCache:
+    return _default_cache
+
+
+# --- Local Summaries ---
+
+def unit_roots(tree) -> list:
+    """
+    (key, node, is_method) for every function not nested in another function: module
+    functions ('name'), conditional ones included, and methods ('Class.name'). Each is
+    summarized together with the functions nested in it.
+    """
+    roots = []
+    keys = set()
+    pending = [(node, "") for node in reversed(tree.body)]
+    while pending:
+        node, prefix = pending.pop()
+        if isinstance(node, FUNCTION_TYPES):
+            key = prefix + node.name
+            if key in keys:
+                key = f"{key}@{node.lineno}:{node.col_offset}"
+            keys.add(key)
+            roots.append((key, node, bool(prefix)))
+        elif isinstance(node, ast.ClassDef):
+            pending.extend((child, f"{prefix}{node.name}.") for child in reversed(node.body))
+        elif not isinstance(node, ast.expr):  # if / try / with / loop bodies may define functions too
+            pending.extend((child, prefix) for child in reversed(list(ast.iter_child_nodes(node))))
+    return roots
+
+def nested_functions(root) -> list:
+    """
+    (node, position of the enclosing function, is_method) for a top-level function and
+    every function nested in it at any depth, the root first. A method of a class nested
+    in a function has that function as its enclosing one: class bodies are not scopes
+    their methods can see.
+    """
+    functions = [(root, None, False)]
+    pending = [(child, 0, False) for child in reversed(root.body)]
+    while pending:
+        node, parent, in_class = pending.pop()
+        if isinstance(node, FUNCTION_TYPES):
+            functions.append((node, parent, in_class))
+            parent = len(functions) - 1
+        # Definitions are statements: expressions need not be searched.
+        pending.extend((child, parent, isinstance(node, ast.ClassDef)) for child in reversed(list(ast.iter_child_nodes(node)))
+                       if not isinstance(child, ast.expr))
+    return functions
+
+def argument_names(function) -> list:
+    arguments = function.args
+    names = [arg.arg for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs]
+    return names + [arg.arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None]
+
+def scope_bindings(nodes) -> tuple[dict, set]:
+    """
+    What the names bound directly in a module or function body are bound to,
+    {name: [binding, ...]}, where a binding is a nested FunctionDef/ClassDef node,
+    'import', ('alias', other name) for `name = other`, or 'other'; a star import binds
+    '*'. Also returns the names declared global. Names declared nonlocal are left out.
+    Class bodies, lambdas and comprehensions are scopes of their own and are not entered.
+    """
+    bindings = {}
+    declared = set()
+    nonlocals = set()
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, FUNCTION_TYPES + (ast.ClassDef,)):
+            bindings.setdefault(node.name, []).append(node)
+            # Evaluated where the definition stands.
+            pending.extend(node.decorator_list)
+            if isinstance(node, ast.ClassDef):
+                pending.extend(node.bases + [keyword.value for keyword in node.keywords])
+            else:
+                pending.extend(node.args.defaults + [default for default in node.args.kw_defaults if default])
+            continue
+        if isinstance(node, SCOPE_TYPES):
+            continue
+        if isinstance(node, ast.Global):
+            declared.update(node.names)
+        elif isinstance(node, ast.Nonlocal):
+            nonlocals.update(node.names)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                bindings.setdefault(alias.asname or alias.name.partition(".")[0], []).append("import")
+        elif (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+              and isinstance(node.value, ast.Name)):
+            bindings.setdefault(node.targets[0].id, []).append(("alias", node.value.id))
+            continue
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            bindings.setdefault(node.id, []).append("other")
+        elif isinstance(node, ast.ExceptHandler) or type(node).__name__ in ("MatchAs", "MatchStar"):
+            if node.name:
+                bindings.setdefault(node.name, []).append("other")
+        pending.extend(ast.iter_child_nodes(node))
+    for name in declared | nonlocals:
+        bindings.pop(name, None)
+    return bindings, declared
+
+def subtree_hash(node) -> str:
+    """Hash of the function's canonical form: its own name, arguments and locals are renamed away."""
+    canonicalizer = Canonicalizer()
+    canonicalizer._enter_scope()
+    canonical = canonicalizer.visit(node)
+    return hashlib.blake2b(ast.dump(canonical).encode('utf-8'), digest_size=16).hexdigest()
+
+def walk_code(nodes, skipped=()):
+    """
+    ast.walk over `nodes`, not descending into the `skipped` definitions: they are
+    yielded themselves, and their decorators and defaults, which run where the
+    definition stands, are walked.
+    """
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        yield node
+        if node in skipped:
+            pending.extend(node.decorator_list)
+            pending.extend(node.args.defaults + [default for default in node.args.kw_defaults if default])
+            continue
+        pending.extend(ast.iter_child_nodes(node))
+
+def call_reference(call):
+    """
+    'name' for f(...), '.attr' for x.attr(...), RESULT + the inner reference for
+    f(...)(...), None for a lambda called in place (its body is summarized where it
+    stands) and UNRESOLVED for anything else, e.g. a call through a subscript.
+    """
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    if isinstance(call.func, ast.Attribute):
+        return "." + call.func.attr
+    if isinstance(call.func, ast.Lambda):
+        return None
+    if isinstance(call.func, ast.Call):
+        inner = call_reference(call.func)
+        return RESULT + inner if inner else UNRESOLVED
+    return UNRESOLVED
+
+def decorator_reference(decorator):
+    """The call that applying `decorator` makes: like call_reference, for the decorator expression."""
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    if isinstance(decorator, ast.Attribute):
+        return "." + decorator.attr
+    if isinstance(decorator, ast.Call):
+        inner = call_reference(decorator)
+        return RESULT + inner if inner else UNRESOLVED
+    return UNRESOLVED
+
+def is_dunder(name) -> bool:
+    return name.startswith("__") and name.endswith("__")
+
+def class_references(node):
+    """
+    What calling the class `node` runs besides its own __init__: a call of each base
+    (their __init__, __new__ and so on), as references in the scope defining the class.
+    With an __init__ of its own, a base's __init__ only runs through super().__init__
+    (an ordinary call), so its bases are INHERITED references. A class with decorators
+    (e.g. a dataclass's __post_init__), keywords (a metaclass's __call__) or any other
+    dunder method (operators, __new__, __enter__, __str__, ...) may have code run
+    implicitly anywhere: [UNRESOLVED].
+    """
+    methods = [item.name for item in node.body if isinstance(item, FUNCTION_TYPES)]
+    if node.decorator_list or node.keywords or any(is_dunder(name) and name != "__init__" for name in methods):
+        return [UNRESOLVED]
+    prefix = INHERITED if "__init__" in methods else ""
+    return [prefix + decorator_reference(base) for base in node.bases]
+
+def definition_references(node):
+    """
+    What defining the class `node` may run: a metaclass, and the bases' __init_subclass__,
+    which is implicit code (INHERITED references). Not their __init__.
+    """
+    if node.keywords:
+        return [UNRESOLVED]
+    return [INHERITED + decorator_reference(base) for base in node.bases]
+
+def can_exit(statement, skipped=(), local_names=frozenset()) -> bool:
+    """Whether control may leave the enclosing block from inside `statement`."""
+    for node in walk_code([statement], skipped):
+        if isinstance(node, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+            return True
+        if isinstance(node, ast.Call):
+            reference = call_reference(node) or ""
+            if reference not in local_names and reference.lstrip(".") in EXIT_CALLS:
+                return True
+    return False
+
+def unconditional_calls(expression, skipped=()):
+    """Calls that run whenever `expression` is evaluated: not behind if/else, and/or, lambdas or comprehensions."""
+    calls = []
+    pending = [expression]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)) or node in skipped:
+            continue
+        if isinstance(node, ast.IfExp):
+            pending.append(node.test)
+            continue
+        if isinstance(node, ast.BoolOp):
+            pending.append(node.values[0])
+            continue
+        if isinstance(node, ast.Call):
+            reference = call_reference(node)
+            if reference and not reference.startswith("."):
+                calls.append(reference)
+        pending.extend(ast.iter_child_nodes(node))
+    return calls
+
+def is_constant_true(test) -> bool:
+    return isinstance(test, ast.Constant) and bool(test.value)
+
+def is_range_loop(loop, local_names=frozenset()) -> bool:
+    return (isinstance(loop.iter, ast.Call) and isinstance(loop.iter.func, ast.Name)
+            and loop.iter.func.id == "range" and "range" not in local_names)
+
+def local_summary(body, skipped=(), deferred=False, encode=None, local_names=frozenset()) -> dict:
+    """
+    Summary of one function body (or the module's top-level code), on its own:
+    'diverges' if it unconditionally enters a `while True` loop it cannot leave,
+    'unknown' if it has any other while loop or a for loop over anything but range(),
+    'halts' otherwise. Callees are the references of its calls, of the decorators it
+    applies and of the functions it uses as values, resolved later; `encode` maps each
+    to the references recorded (by default, itself).
+    The body of a generator or coroutine (`deferred`) does not run when it is called,
+    so it never unconditionally diverges.
+    """
+    encode = encode or (lambda reference: [reference])
+    verdict = "halts"
+    references = set()
+    called = set()  # Call and decorator expressions: not used as values
+    for node in walk_code(body, skipped):
+        if isinstance(node, (ast.Yield, ast.YieldFrom, ast.Await)):
+            deferred = True
+        elif isinstance(node, FUNCTION_TYPES + (ast.ClassDef,)):
+            called.update(node.decorator_list)
+            references.update(decorator_reference(decorator) for decorator in node.decorator_list)
+            if isinstance(node, ast.ClassDef):
+                references.update(definition_references(node))
+        elif isinstance(node, ast.Call):
+            called.add(node.func)
+            reference = call_reference(node)
+            if reference:
+                references.add(reference)
+        elif isinstance(node, (ast.Name, ast.Attribute)) and isinstance(node.ctx, ast.Load) and node not in called:
+            references.add(VALUE + (node.id if isinstance(node, ast.Name) else "." + node.attr))
+        elif isinstance(node, (ast.While, ast.AsyncFor)) or (isinstance(node, ast.For)
+                                                              and not is_range_loop(node, local_names)):
+            verdict = "unknown"
+
+    unconditional = []
+    for statement in ([] if deferred else body):
+        if isinstance(statement, ast.While):
+            if is_constant_true(statement.test) and not can_exit(statement, skipped, local_names):
+                verdict = "diverges"
+                break
+            unconditional += unconditional_calls(statement.test, skipped)
+        elif isinstance(statement, (ast.Expr, ast.Assign, ast.AugAssign, ast.AnnAssign, ast.Return)):
+            if statement.value is not None:
+                unconditional += unconditional_calls(statement.value, skipped)
+        elif isinstance(statement, ast.With):
+            for item in statement.items:
+                unconditional += unconditional_calls(item.context_expr, skipped)
+        elif isinstance(statement, FUNCTION_TYPES + (ast.ClassDef,)):
+            for decorator in statement.decorator_list:
+                unconditional += unconditional_calls(decorator, skipped) + [decorator_reference(decorator)]
+        if can_exit(statement, skipped, local_names):
+            break
+    return {'verdict': verdict,
+            'callees': sorted({target for reference in references for target in encode(reference)}),
+            'unconditional': [target for reference in unconditional for target in encode(reference)]}
+
+def unit_summaries(root) -> dict:
+    """
+    Local summaries of a top-level function or method and of the functions nested in
+    it (nested_functions order), and the names they declare global. References only
+    depend on the canonical form, which renames locals away: a nested function is
+    LOCAL + its position, any other local UNRESOLVED, the root's own name SELF; names
+    bound outside the root keep their spelling.
+    """
+    functions = nested_functions(root)
+    positions = {node: position for position, (node, _, _) in enumerate(functions)}
+    scopes = []
+    global_names = set()
+    for node, _, _ in functions:
+        bindings, declared = scope_bindings(node.body)
+        for name in argument_names(node):
+            bindings.setdefault(name, []).append("other")
+        scopes.append((bindings, declared))
+        global_names |= declared
+
+    def targets(binding, values, scope, seen):
+        if isinstance(binding, FUNCTION_TYPES):
+            return [LOCAL + str(positions[binding])]
+        if isinstance(binding, ast.ClassDef):
+            if values:
+                return []  # A class used as a value (a base, an isinstance argument) is not called
+            if binding.name in seen:
+                return [UNRESOLVED]
+            # Bases are evaluated in the scope defining the class.
+            bases = [target for reference in class_references(binding)
+                     for target in encoder(scope)(reference, seen=seen | {binding.name})]
+            return bases + [LOCAL + str(positions[item]) for item in binding.body
+                            if isinstance(item, FUNCTION_TYPES) and item.name == "__init__"]
+        return [] if binding == "import" else [UNRESOLVED]
+
+    def encoder(position):
+        def encode(reference, values=False, seen=frozenset()):
+            if reference.startswith(VALUE):
+                return [VALUE + target for target in encode(reference[len(VALUE):], True) if target != UNRESOLVED]
+            if reference.startswith(RESULT):
+                return [RESULT + target for target in encode(reference[len(RESULT):])]
+            if reference.startswith(INHERITED):
+                return [INHERITED + target for target in encode(reference[len(INHERITED):], seen=seen)]
+            if reference.startswith((".", "<")):
+                return [reference]
+            scope = position
+            while scope is not None:
+                bindings, declared = scopes[scope]
+                if reference in declared:
+                    break
+                if reference in bindings:
+                    return sorted({target for binding in bindings[reference]
+                                   for target in targets(binding, values, scope, seen)})
+                scope = functions[scope][1]
+            return [SELF if reference == root.name else reference]
+        return encode
+
+    summaries = []
+    for position, (node, parent, _) in enumerate(functions):
+        skipped = positions.keys() - {node}
+        summary = local_summary(node.body, skipped, isinstance(node, ast.AsyncFunctionDef),
+                                encoder(position), frozenset(scopes[position][0]))
+        # Decorators are evaluated in the enclosing scope (the module's, for the root).
+        decorate = encoder(parent)
+        summary['decorators'] = sorted({target for decorator in node.decorator_list
+                                        for target in decorate(decorator_reference(decorator))})
+        summaries.append(summary)
+    return {'functions': summaries, 'globals': sorted(global_names)}
+
+# --- Composition ---
+
+class ModuleScope:
+    """
+    Resolves the references in a module's summaries to summary keys. A reference that
+    cannot be pinned down (a name bound to anything but a function or class, an unknown
+    name, a call through a subscript or of a function's result, a function replaced by a
+    user decorator) resolves to UNRESOLVED, whose summary is 'unknown', so it never lets
+    a caller count as halting. Imports and builtins resolve to nothing: they are assumed
+    to halt, except the builtins that run code.
+    """
+    def __init__(self, tree, roots):
+        bindings, _ = scope_bindings(tree.body)
+        keys = {node: key for key, node, _ in roots}
+        self.star = "*" in bindings
+        self.globals = {name: [self._global(binding, keys) for binding in items] for name, items in bindings.items()}
+        self.units = {MODULE_KEY: [MODULE_KEY]}
+        self.names = {}
+        self.methods = {}
+        self.decorators = {}
+        self._wrapped = {}
+
+    @staticmethod
+    def _global(binding, keys):
+        if isinstance(binding, FUNCTION_TYPES):
+            return ("def", keys[binding])
+        if isinstance(binding, ast.ClassDef):
+            init = [keys[item] for item in binding.body if isinstance(item, FUNCTION_TYPES) and item.name == "__init__"]
+            return ("class", init, class_references(binding))
+        return binding
+
+    def add_unit(self, key, root, is_method, unit) -> dict:
+        """Registers a unit_summaries entry for `root`; returns its summaries by key."""
+        functions = nested_functions(root)
+        keys = [key] + [f"{key}.<locals>.{position}" for position in range(1, len(functions))]
+        for name in unit['globals']:
+            self.globals.setdefault(name, []).append("other")
+        for position, ((node, _, in_class), function_key, summary) in enumerate(zip(functions, keys, unit['functions'])):
+            self.units[function_key] = keys
+            self.decorators[function_key] = summary['decorators']
+            if in_class or (position == 0 and is_method):
+                self.methods.setdefault(node.name, []).append(function_key)
+        self.names[key] = root.name
+        return dict(zip(keys, unit['functions']))
+
+    def wrapped(self, key) -> bool:
+        """Whether a decorator of this module (or an unknown one) replaces the function."""
+        if key not in self._wrapped:
+            self._wrapped[key] = False  # A decorator referring to the function it decorates
+            self._wrapped[key] = any(self.resolve(reference, key) for reference in self.decorators.get(key, ()))
+        return self._wrapped[key]
+
+    def target(self, key) -> list:
+        return [UNRESOLVED] if self.wrapped(key) else [key]
+
+    def lookup(self, name, seen=frozenset(), values=False) -> list:
+        """Summary keys a call of the global `name` may reach (or, with `values`, of the function it names)."""
+        if name not in self.globals:
+            if name in CODE_BUILTINS or not (self.star or hasattr(builtins, name)):
+                return [UNRESOLVED]
+            return []
+        targets = set()
+        for binding in self.globals[name]:
+            if binding == "import":
+                continue
+            if binding == "other" or (binding[0] == "alias" and binding[1] in seen | {name}):
+                targets.add(UNRESOLVED)
+            elif binding[0] == "alias":
+                targets.update(self.lookup(binding[1], seen | {name}, values))
+            elif binding[0] == "def":
+                targets.update(self.target(binding[1]))
+            elif values:
+                continue
+            else:
+                for init in binding[1]:
+                    targets.update(self.target(init))
+                for reference in binding[2]:
+                    inherited = reference.startswith(INHERITED)
+                    reference = reference[len(INHERITED):] if inherited else reference
+                    if reference in seen | {name}:
+                        bases = [UNRESOLVED]  # A class deriving from itself, e.g. through an alias
+                    elif reference.startswith((".", "<")):
+                        bases = self.resolve(reference, MODULE_KEY)
+                    else:
+                        bases = self.lookup(reference, seen | {name})
+                    targets.update([UNRESOLVED] if inherited and UNRESOLVED in bases else [] if inherited else bases)
+        return sorted(targets)
+
+    def resolve(self, reference, caller) -> list:
+        """
+        Summary keys a reference recorded in `caller`'s summary may reach. SELF is the
+        caller's root name, looked up as a global (a bare call inside a method never
+        reaches the method itself); '.attr' reaches every method of that name.
+        """
+        if reference == UNRESOLVED:
+            return [UNRESOLVED]
+        if reference.startswith(VALUE):
+            inner = reference[len(VALUE):]
+            targets = self.lookup(inner, values=True) if not inner.startswith((".", "<")) else self.resolve(inner, caller)
+            return [target for target in targets if target != UNRESOLVED]
+        if reference.startswith(RESULT):
+            inner = reference[len(RESULT):]
+            return [UNRESOLVED] if inner in LOOKUP_BUILTINS or self.resolve(inner, caller) else []
+        if reference.startswith(INHERITED):
+            return [UNRESOLVED] if UNRESOLVED in self.resolve(reference[len(INHERITED):], caller) else []
+        if reference.startswith(LOCAL):
+            return self.target(self.units[caller][int(reference[len(LOCAL):])])
+        if reference.startswith("."):
+            return sorted({target for key in self.methods.get(reference[1:], ()) for target in self.target(key)})
+        if reference == SELF:
+            reference = self.names[self.units[caller][0]]
+        return self.lookup(reference)
+
+def compose(summaries, scope):
+    """
+    Composes local summaries over the call graph into {key: verdict}:
+    'diverges' if a function unconditionally reaches a divergent loop or an unconditional
+    call cycle; 'halts' if it and everything it may call halt without recursion.
+    """
+    calls = {key: sorted({target for reference in summary['callees'] for target in scope.resolve(reference, key)})
+             for key, summary in summaries.items()}
+    unconditional = {key: sorted({target for reference in summary['unconditional']
+                                  for target in scope.resolve(reference, key)})
+                     for key, summary in summaries.items()}
+
+    halts = {}
+    diverges = {}
+    for graph, result, combine in ((calls, halts, all), (unconditional, diverges, any)):
+        in_cycle = set()
+        for root in graph:
+            if root in result:
+                continue
+            stack = [(root, iter(graph[root]))]
+            result[root] = None  # On the stack
+            while stack:
+                key, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    if graph is calls:
+                        result[key] = (summaries[key]['verdict'] == "halts" and key not in in_cycle
+                                       and combine(result[c] for c in graph[key]))
+                    else:
+                        result[key] = (summaries[key]['verdict'] == "diverges" or key in in_cycle
+                                       or combine(result[c] for c in graph[key]))
+                elif child not in result:
+                    result[child] = None
+                    stack.append((child, iter(graph[child])))
+                elif result[child] is None:
+                    # Back edge: recursion. Everything on the stack reaches the cycle.
+                    in_cycle.update(entry[0] for entry in stack)
+    return {key: "diverges" if diverges[key] else "halts" if halts[key] else "unknown" for key in summaries}
+
+def summarize_program(program: str, cache=None) -> tuple[str, str]:
+    """
+    Decides a module from per-function summaries composed over its call graph.
+    Summaries come from `cache` (the process-wide cache by default), so after an edit
+    only functions whose canonical subtree changed are re-analysed; the verdicts of
+    their callers follow from the composition. Any call that may reach code the
+    summaries cannot pin down keeps the module from counting as halting.
+    Returns ('halts' | 'does not halt' | 'impossible to determine', reason).
+    """
+    cache = cache if cache is not None else _default_cache
+    try:
+        tree = ast.parse(program)
+        # A second copy to canonicalize: the Canonicalizer rewrites names in place.
+        canonical_tree = ast.parse(program)
+    except SyntaxError:
+        return "impossible to determine", "Function summaries: Could not parse the script due to a syntax error."
+
+    roots = unit_roots(tree)
+    scope = ModuleScope(tree, roots)
+    summaries = {UNRESOLVED: {'verdict': "unknown", 'callees': [], 'unconditional': []}}
+    for (key, node, is_method), (_, canonical_node, _) in zip(roots, unit_roots(canonical_tree)):
+        digest = subtree_hash(canonical_node)
+        unit = cache.get(digest)
+        if unit is None:
+            unit = unit_summaries(node)
+            cache.put(digest, unit)
+        summaries.update(scope.add_unit(key, node, is_method, unit))
+    summaries[MODULE_KEY] = local_summary(tree.body, {node for _, node, _ in roots})
+
+    verdict = compose(summaries, scope)[MODULE_KEY]
+    if verdict == "diverges":
+        return "does not halt", "Function summaries: The module unconditionally reaches an infinite loop or call cycle."
+    if verdict == "halts":
+        return "halts", "Function summaries: Every function reachable from the module halts without recursion."
+    return "impossible to determine", "Function summaries: Some reachable function has loops or recursion that could not be summarized."
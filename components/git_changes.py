@@ -0,0 +1,81 @@
+# File: components/git_changes.py
+import os
+import json
+import subprocess
+from pathlib import Path
+
+CACHE_FORMAT = "halting-verdict-cache/1"
+
+class GitError(Exception):
+    """A git command failed or the target is not inside a work tree."""
+    pass
+
+def git(root, *args) -> str:
+    try:
+        completed = subprocess.run(["git", "-C", str(root), *args], capture_output=True, text=True, check=True)
+    except FileNotFoundError:
+        raise GitError("git is not installed or not on PATH.")
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"git {' '.join(args)}: {e.stderr.strip()}")
+    return completed.stdout
+
+def repo_root(path) -> Path:
+    return Path(git(path, "rev-parse", "--show-toplevel").strip())
+
+def resolve_revision(root, revision) -> str:
+    """Full commit id of `revision` (a branch, tag, sha or expression like HEAD~3)."""
+    return git(root, "rev-parse", "--verify", f"{revision}^{{commit}}").strip()
+
+def _paths(root, output):
+    return sorted({root / line for line in output.splitlines() if line.endswith(".py")})
+
+def python_files(root, target) -> list:
+    """Every tracked or untracked (but not ignored) .py file under `target`."""
+    pathspec = os.path.relpath(target, root)
+    tracked = git(root, "ls-files", "--", pathspec)
+    untracked = git(root, "ls-files", "--others", "--exclude-standard", "--", pathspec)
+    return [path for path in _paths(root, tracked + untracked) if path.exists()]
+
+def changed_python_files(root, revision, target) -> list:
+    """.py files under `target` added, modified, renamed or copied since `revision`, plus untracked ones."""
+    pathspec = os.path.relpath(target, root)
+    changed = git(root, "diff", "--name-only", "--diff-filter=ACMR", revision, "--", pathspec)
+    untracked = git(root, "ls-files", "--others", "--exclude-standard", "--", pathspec)
+    return [path for path in _paths(root, changed + untracked) if path.exists()]
+
+def is_clean(root, target) -> bool:
+    """Whether the .py files under `target` match HEAD exactly (no edits, no untracked files)."""
+    pathspec = os.path.relpath(target, root)
+    return not any(line.endswith(".py") for line in git(root, "status", "--porcelain", "--", pathspec).splitlines())
+
+class VerdictCache:
+    """
+    Verdicts for every .py file of one baseline commit, produced by one analyzer version:
+    {'revision': sha, 'analyzer_version': ..., 'files': {repo-relative path: [result, reason]}}.
+    A run against the same baseline reuses them for the files its diff leaves untouched.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.revision = None
+        self.analyzer_version = None
+        self.files = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get('format') == CACHE_FORMAT:
+                self.revision = data['revision']
+                self.analyzer_version = data['analyzer_version']
+                self.files = data['files']
+
+    def verdicts_for(self, revision, analyzer_version) -> dict:
+        """The cached verdicts if they describe `revision` under `analyzer_version`, else {}."""
+        if self.revision == revision and self.analyzer_version == analyzer_version:
+            return self.files
+        return {}
+
+    def save(self, revision, analyzer_version, files):
+        self.revision, self.analyzer_version, self.files = revision, analyzer_version, files
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'format': CACHE_FORMAT, 'revision': revision, 'analyzer_version': analyzer_version, 'files': files}
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(data, indent=1, sort_keys=True))
+        temporary.replace(self.path)
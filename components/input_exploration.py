@@ -0,0 +1,156 @@
+# File: components/input_exploration.py
+import ast
+import io
+import os
+import sys
+import random
+import multiprocessing
+from .dynamic_tracing import dynamic_tracing
+
+# Values fed to every input channel: boundaries first, then seeded random values.
+BOUNDARY_VALUES = ["0", "1", "-1", "", "1000", "abc"]
+DEFAULT_INPUT_COUNT = 8
+STDIN_REPEAT = 16  # Lines of stdin per run, for programs that call input() in a loop
+
+class InputSourceVisitor(ast.NodeVisitor):
+    """Finds the external inputs a program reads: stdin, argv, environment variables and randomness."""
+    def __init__(self):
+        self.sources = set()
+        self.env_names = set()
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == 'input':
+            self.sources.add('stdin')
+        # os.getenv('NAME') and os.environ.get('NAME')
+        if isinstance(node.func, ast.Attribute):
+            is_getenv = node.func.attr == 'getenv'
+            is_environ_get = (node.func.attr == 'get' and isinstance(node.func.value, ast.Attribute) and
+                              node.func.value.attr == 'environ')
+            if is_getenv or is_environ_get:
+                self.sources.add('env')
+                if node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+                    self.env_names.add(node.args[0].value)
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node):
+        if node.attr in ('stdin', 'argv') and isinstance(node.value, ast.Name) and node.value.id == 'sys':
+            self.sources.add(node.attr)
+        elif node.attr == 'environ':
+            self.sources.add('env')
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        # os.environ['NAME']
+        if (isinstance(node.value, ast.Attribute) and node.value.attr == 'environ' and
+                isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)):
+            self.env_names.add(node.slice.value)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        if any(alias.name == 'random' for alias in node.names):
+            self.sources.add('random')
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node):
+        if node.module == 'random':
+            self.sources.add('random')
+        self.generic_visit(node)
+
+def find_input_sources(program: str):
+    """Returns (sources, env_names) for the program, or (set(), set()) if it cannot be parsed."""
+    try:
+        visitor = InputSourceVisitor()
+        visitor.visit(ast.parse(program))
+        return visitor.sources, visitor.env_names
+    except Exception:
+        return set(), set()
+
+def reads_external_input(program: str) -> bool:
+    return bool(find_input_sources(program)[0])
+
+def generate_inputs(env_names, count=DEFAULT_INPUT_COUNT):
+    """
+    Builds `count` input vectors, each a dict with 'stdin', 'argv', 'env' and 'seed'.
+    Boundary values come first; the rest are drawn from a fixed-seed generator so
+    runs are reproducible.
+    """
+    rng = random.Random(0)
+    inputs = []
+    for index in range(count):
+        if index < len(BOUNDARY_VALUES):
+            value = BOUNDARY_VALUES[index]
+        else:
+            value = str(rng.randint(-1000, 1000))
+        inputs.append({
+            'stdin': (value + "\n") * STDIN_REPEAT,
+            'argv': [value] if value else [],
+            'env': {name: value for name in sorted(env_names)},
+            'seed': index,
+        })
+    return inputs
+
+def describe_input(input_vector) -> str:
+    value = input_vector['argv'][0] if input_vector['argv'] else ""
+    return f"value={value!r}, seed={input_vector['seed']}"
+
+def _trace_with_input(task):
+    """Pool worker: traces the program once with its stdin, argv, environment and seed replaced."""
+    program, input_vector = task
+    saved_stdin, saved_argv, saved_environ = sys.stdin, sys.argv, dict(os.environ)
+    try:
+        sys.stdin = io.StringIO(input_vector['stdin'])
+        sys.argv = ['script.py'] + input_vector['argv']
+        os.environ.update(input_vector['env'])
+        random.seed(input_vector['seed'])
+        result, reason = dynamic_tracing(program)
+    finally:
+        sys.stdin, sys.argv = saved_stdin, saved_argv
+        os.environ.clear()
+        os.environ.update(saved_environ)
+    return input_vector, result, reason
+
+def explore_inputs(program: str, count=DEFAULT_INPUT_COUNT, processes=None) -> tuple[str, str]:
+    """
+    Dynamic tracing over several generated inputs, run concurrently in a process pool.
+    The first run that proves non-termination decides the result and the remaining
+    runs are terminated. Returns a tuple of (result, reason).
+    """
+    _, env_names = find_input_sources(program)
+    tasks = [(program, input_vector) for input_vector in generate_inputs(env_names, count)]
+    processes = min(len(tasks), processes or os.cpu_count() or 1)
+
+    if processes <= 1 or multiprocessing.current_process().daemon:
+        # Pool workers cannot have children of their own; explore serially instead.
+        outcomes = []
+        for task in tasks:
+            outcome = _trace_with_input(task)
+            if outcome[1] == "does not halt":
+                return _aggregate([outcome])
+            outcomes.append(outcome)
+        return _aggregate(outcomes)
+
+    outcomes = []
+    pool = multiprocessing.Pool(processes)
+    try:
+        for outcome in pool.imap_unordered(_trace_with_input, tasks):
+            if outcome[1] == "does not halt":
+                return _aggregate([outcome])
+            outcomes.append(outcome)
+    finally:
+        # terminate() also stops runs still in flight after an early non-halting verdict.
+        pool.terminate()
+        pool.join()
+    return _aggregate(outcomes)
+
+def _aggregate(outcomes) -> tuple[str, str]:
+    if not outcomes:
+        return "impossible to determine", "Input exploration: No inputs were generated."
+    for input_vector, result, reason in outcomes:
+        if result == "does not halt":
+            return "does not halt", f"Input exploration: With input {describe_input(input_vector)}: {reason}"
+
+    results = {result for _, result, _ in outcomes}
+    if results == {"halts"}:
+        return "halts", f"Input exploration: Program halted on all {len(outcomes)} generated inputs."
+    undecided = [input_vector for input_vector, result, _ in outcomes if result != "halts"]
+    return "impossible to determine", f"Input exploration: Tracing was inconclusive for {len(undecided)} of {len(outcomes)} generated inputs (e.g. {describe_input(undecided[0])})."
@@ -0,0 +1,116 @@
+# File: components/near_duplicates.py
+import ast
+import hashlib
+from collections import Counter
+
+FINGERPRINT_BITS = 64
+HAMMING_THRESHOLD = 3  # Differing fingerprint bits up to which two files count as near-duplicates
+MIN_FEATURES = 32      # Smaller programs are too easily confused (and cheap to analyze anyway)
+BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+MAX_CONSTANT_CHARS = 32
+
+def _token(node) -> str:
+    # Identifiers are dropped: vendored copies and variants often rename things, and
+    # positional renaming (as in the semantic hash) shifts every name after an insertion.
+    if isinstance(node, ast.Constant):
+        return repr(node.value)[:MAX_CONSTANT_CHARS]
+    if isinstance(node, ast.Attribute):
+        return "." + node.attr
+    return type(node).__name__
+
+def _statement_tokens(statement) -> str:
+    """The statement's own node types, constants and attribute names, excluding nested blocks."""
+    tokens = [type(statement).__name__]
+    if isinstance(statement, (ast.Import, ast.ImportFrom)):
+        tokens.append(getattr(statement, 'module', None) or "")
+        tokens.extend(alias.name for alias in statement.names)
+    stack = [getattr(statement, field) for field in statement._fields if field not in BLOCK_FIELDS]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+            tokens.append(_token(value))
+            stack.extend(getattr(value, field) for field in value._fields)
+    return " ".join(tokens)
+
+def _feature_hash(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def ast_features(program: str) -> Counter:
+    """
+    Weighted features of a program: one per statement (its tokens) and one per pair of
+    consecutive statements in a block, so both content and local order count.
+    Raises SyntaxError for unparseable programs.
+    """
+    features = Counter()
+    for node in ast.walk(ast.parse(program)):
+        for field in BLOCK_FIELDS:
+            block = getattr(node, field, None)
+            if not isinstance(block, list):
+                continue
+            previous = None
+            for statement in block:
+                if not isinstance(statement, ast.stmt):
+                    statement_feature = _feature_hash(type(statement).__name__)  # An except handler or match case
+                else:
+                    statement_feature = _feature_hash(_statement_tokens(statement))
+                features[statement_feature] += 1
+                if previous is not None:
+                    features[_feature_hash(f"{previous}>{statement_feature}")] += 1
+                previous = statement_feature
+    return features
+
+def simhash(features: Counter) -> int:
+    """64-bit SimHash: bit i is set if the features with bit i set outweigh those without."""
+    weights = [0] * FINGERPRINT_BITS
+    for feature, weight in features.items():
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += weight if feature >> bit & 1 else -weight
+    return sum(1 << bit for bit in range(FINGERPRINT_BITS) if weights[bit] > 0)
+
+def fingerprint(program: str):
+    """The program's SimHash, or None if it cannot be parsed or is too small to compare."""
+    try:
+        features = ast_features(program)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+    return simhash(features) if sum(features.values()) >= MIN_FEATURES else None
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+class SimHashIndex:
+    """
+    Finds stored fingerprints within `threshold` bits of a query. Fingerprints are split
+    into threshold + 1 bands, so any two within the threshold agree exactly on at
+    least one band (pigeonhole); only entries sharing a band are compared.
+    """
+    def __init__(self, threshold=HAMMING_THRESHOLD):
+        if not 0 <= threshold < FINGERPRINT_BITS // 2:
+            raise ValueError(f"Hamming threshold must be between 0 and {FINGERPRINT_BITS // 2 - 1}.")
+        self.threshold = threshold
+        bands = threshold + 1
+        width = FINGERPRINT_BITS // bands
+        self._bands = [(band * width, width if band < bands - 1 else FINGERPRINT_BITS - band * width)
+                       for band in range(bands)]
+        self._buckets = [{} for _ in self._bands]
+        self._values = {}
+
+    def _keys(self, fingerprint):
+        return [(fingerprint >> start) & ((1 << width) - 1) for start, width in self._bands]
+
+    def add(self, fingerprint: int, value):
+        self._values.setdefault(fingerprint, value)
+        for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+            buckets.setdefault(key, []).append(fingerprint)
+
+    def nearest(self, fingerprint: int):
+        """(distance, value) of the closest stored fingerprint within the threshold, or None."""
+        best = None
+        for buckets, key in zip(self._buckets, self._keys(fingerprint)):
+            for candidate in buckets.get(key, ()):
+                distance = hamming(fingerprint, candidate)
+                if distance <= self.threshold and (best is None or distance < best[0]):
+                    best = (distance, self._values[candidate])
+        return best
@@ -0,0 +1,170 @@
+# File: components/phase_router.py
+import ast
+import json
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # Optional: only routing needs it
+    np = None
+
+from components.artifact_store import content_key
+from components.phase_scheduler import PhaseModel, MAX_SKIP_RATE, MIN_OBSERVATIONS, EXPLORATION_INTERVAL
+
+ROUTER_FORMAT = "halting-phase-router/1"
+# Fixed rather than taken from the ast module, whose node classes vary by Python version.
+STATEMENT_TYPES = ("FunctionDef", "AsyncFunctionDef", "ClassDef", "Return", "Delete", "Assign", "AugAssign",
+                   "AnnAssign", "For", "AsyncFor", "While", "If", "With", "AsyncWith", "Match", "Raise", "Try",
+                   "TryStar", "Assert", "Import", "ImportFrom", "Global", "Nonlocal", "Expr", "Pass", "Break",
+                   "Continue")
+EXPRESSION_TYPES = ("BoolOp", "NamedExpr", "BinOp", "UnaryOp", "Lambda", "IfExp", "Dict", "Set", "ListComp",
+                    "SetComp", "DictComp", "GeneratorExp", "Await", "Yield", "YieldFrom", "Compare", "Call",
+                    "JoinedStr", "Constant", "Attribute", "Subscript", "Starred", "Name", "List", "Tuple", "Slice")
+FLAGGED_IMPORTS = ("sys", "os", "time", "random", "threading", "subprocess", "socket", "signal", "asyncio",
+                   "itertools")
+FEATURE_NAMES = (STATEMENT_TYPES + EXPRESSION_TYPES
+                 + ("bytes", "lines", "recursive_calls", "while_true", "unparseable")
+                 + tuple(f"imports_{module}" for module in FLAGGED_IMPORTS))
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Phase routing needs NumPy (pip install numpy).")
+
+def feature_row(program: str) -> list:
+    """Raw counts for FEATURE_NAMES: node types, size, self-calls, `while True` loops and imports of note."""
+    counts = dict.fromkeys(FEATURE_NAMES, 0)
+    counts['bytes'] = len(program)
+    counts['lines'] = program.count("\n") + 1
+    try:
+        tree = ast.parse(program)
+    except (SyntaxError, ValueError, RecursionError):
+        counts['unparseable'] = 1
+        return list(counts.values())
+    stack = [(tree, None)]  # (node, name of the innermost enclosing function)
+    while stack:
+        node, function = stack.pop()
+        name = type(node).__name__
+        if name in counts:
+            counts[name] += 1
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            function = node.name
+        elif isinstance(node, ast.Call):
+            counts['recursive_calls'] += isinstance(node.func, ast.Name) and node.func.id == function
+        elif isinstance(node, ast.While) and isinstance(node.test, ast.Constant) and node.test.value:
+            counts['while_true'] += 1
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module or ""]
+            for module in modules:
+                flag = f"imports_{module.partition('.')[0]}"
+                if flag in counts:
+                    counts[flag] = 1
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                stack.extend((child, function) for child in value if isinstance(child, ast.AST))
+            elif isinstance(value, ast.AST):
+                stack.append((value, function))
+    return list(counts.values())
+
+def feature_matrix_of_rows(rows) -> "np.ndarray":
+    """Stacks feature_row results (computed anywhere, e.g. in pool workers) into one log-scaled matrix."""
+    _require_numpy()
+    return np.log1p(np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES)))
+
+def feature_matrix(programs) -> "np.ndarray":
+    """One row of log-scaled FEATURE_NAMES counts per program, stacked for the whole batch."""
+    return feature_matrix_of_rows([feature_row(program) for program in programs])
+
+class PhaseRouter:
+    """
+    Nearest-centroid classifier of the phase that will decide a file, over standardized
+    feature_matrix rows. Each predicted phase is a PhaseModel bucket ('route:<phase>')
+    holding the phase statistics of the training files predicted into it, so a batch is
+    routed with one distance computation, and the phases skipped for a route follow
+    the PhaseModel rule (observed often enough, never decisive there, not cheap).
+    """
+    def __init__(self):
+        _require_numpy()
+        self.phases = []
+        self.mean = np.zeros(len(FEATURE_NAMES))
+        self.scale = np.ones(len(FEATURE_NAMES))
+        self.centroids = np.zeros((0, len(FEATURE_NAMES)))
+        self.model = PhaseModel()
+
+    @classmethod
+    def fit(cls, matrix, phase_times: list) -> "PhaseRouter":
+        """Trains on a feature matrix and each row's phase times (rows with none are left out)."""
+        router = cls()
+        rows = [index for index, times in enumerate(phase_times) if times]
+        matrix, phase_times = matrix[rows], [phase_times[index] for index in rows]
+        if not rows:
+            return router
+        deciders = np.array([list(times)[-1] for times in phase_times])
+        router.phases = sorted(set(deciders))
+        router.mean = matrix.mean(axis=0)
+        router.scale = np.where(matrix.std(axis=0) > 0, matrix.std(axis=0), 1.0)
+        standardized = (matrix - router.mean) / router.scale
+        router.centroids = np.stack([standardized[deciders == phase].mean(axis=0) for phase in router.phases])
+        for route, times in zip(router.predict(matrix), phase_times):
+            router.model.observe_bucket(f"route:{route}", times)
+        return router
+
+    def predict(self, matrix) -> list:
+        """The predicted deciding phase of every row."""
+        if not self.phases:
+            return [None] * len(matrix)
+        standardized = (matrix - self.mean) / self.scale
+        distances = ((standardized ** 2).sum(axis=1)[:, None] - 2 * standardized @ self.centroids.T
+                     + (self.centroids ** 2).sum(axis=1)[None, :])
+        return [self.phases[index] for index in distances.argmin(axis=1)]
+
+    def route(self, matrix, max_skip_rate=MAX_SKIP_RATE, min_observations=MIN_OBSERVATIONS,
+              exploration_interval=EXPLORATION_INTERVAL) -> list:
+        """
+        The set of phases to skip for every row. Every `exploration_interval`-th row of
+        a route skips nothing, so a run used to fit the next router still shows whether
+        the skipped phases decide anything there.
+        """
+        skips = {phase: self.model.skipped_phases(f"route:{phase}", max_skip_rate, min_observations) for phase in self.phases}
+        routed, counts = [], {}
+        for phase in self.predict(matrix):
+            counts[phase] = counts.get(phase, 0) + 1
+            explore = exploration_interval and counts[phase] % exploration_interval == 0
+            routed.append(set() if explore else skips.get(phase, set()))
+        return routed
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'format': ROUTER_FORMAT, 'features': FEATURE_NAMES, 'phases': self.phases,
+                                    'mean': self.mean.tolist(), 'scale': self.scale.tolist(),
+                                    'centroids': self.centroids.tolist(), 'buckets': self.model.buckets}, indent=1))
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        data = json.loads(path.read_text())
+        if data.get('format') != ROUTER_FORMAT:
+            raise ValueError(f"{path}: not a phase router.")
+        if tuple(data['features']) != FEATURE_NAMES:
+            raise ValueError(f"{path}: trained on different features; fit it again.")
+        router = cls()
+        router.phases = data['phases']
+        router.mean, router.scale = np.array(data['mean']), np.array(data['scale'])
+        router.centroids = np.array(data['centroids']).reshape(len(router.phases), len(FEATURE_NAMES))
+        router.model.buckets = data['buckets']
+        return router
+
+class RoutedScheduler:
+    """
+    A scheduler for analyze_halting that replays routes computed for a whole batch:
+    {content key: phases to skip}. Programs outside the batch run every phase.
+    """
+    def __init__(self, routes: dict):
+        self.routes = routes
+
+    def plan(self, program: str) -> tuple[dict, set]:
+        return None, self.routes.get(content_key(program), set())
+
+    def observe(self, features, phase_times: dict):
+        pass
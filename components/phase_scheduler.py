@@ -0,0 +1,140 @@
+# File: components/phase_scheduler.py
+import json
+from pathlib import Path
+
+MODEL_FORMAT = "halting-phase-model/1"
+# Never skipped: meta keeps the cross-script analysis chain, paradox guards against
+# adversarial inputs, and synthesis is the fallback that always produces a verdict.
+PINNED_PHASES = ("meta", "paradox", "synthesis")
+MIN_OBSERVATIONS = 20  # Runs of a phase in a bucket before the scheduler trusts its rate
+MAX_SKIP_RATE = 0.0    # A phase is skipped only if it decided at most this share of its runs
+MIN_SKIP_SECONDS = 0.001  # Skipping a phase cheaper than this on average is not worth the risk
+# Every this many files of a bucket still run every phase, so a skipped phase that
+# has become decisive there shows up in the model and stops being skipped.
+EXPLORATION_INTERVAL = 20
+SIZE_CLASSES = (1_000, 10_000, 100_000)  # Bytes
+LOOP_CLASSES = (0, 5)                    # Loop keywords
+
+def file_features(program: str) -> dict:
+    """Cheap features that need no parse: size, loop keyword count, whether anything is imported."""
+    return {'size': len(program),
+            'loops': program.count("while ") + program.count("for "),
+            'imports': "import " in program}
+
+def bucket(features: dict) -> str:
+    """Groups files with similar features, e.g. 'size<10000|loops<=5|imports'."""
+    size = next((f"size<{limit}" for limit in SIZE_CLASSES if features['size'] < limit), f"size>={SIZE_CLASSES[-1]}")
+    loops = next((f"loops<={limit}" for limit in LOOP_CLASSES if features['loops'] <= limit), f"loops>{LOOP_CLASSES[-1]}")
+    return f"{size}|{loops}|{'imports' if features['imports'] else 'no-imports'}"
+
+class PhaseModel:
+    """
+    Historical cost and decisiveness of every phase, per feature bucket:
+    {bucket: {phase: {'runs', 'decided', 'seconds'}}}. A phase decided a file if it was
+    the last phase to run on it (see analyze_halting's `phase_times`).
+    """
+    def __init__(self):
+        self.buckets = {}
+
+    def observe(self, features: dict, phase_times: dict):
+        self.observe_bucket(bucket(features), phase_times)
+
+    def observe_bucket(self, name: str, phase_times: dict):
+        if not phase_times:
+            return  # Timed out or crashed: no phase finished
+        phases = self.buckets.setdefault(name, {})
+        decider = list(phase_times)[-1]
+        for phase, seconds in phase_times.items():
+            stats = phases.setdefault(phase, {'runs': 0, 'decided': 0, 'seconds': 0.0})
+            stats['runs'] += 1
+            stats['decided'] += phase == decider
+            stats['seconds'] += seconds
+
+    def skipped_phases(self, name: str, max_skip_rate=MAX_SKIP_RATE, min_observations=MIN_OBSERVATIONS) -> set:
+        """
+        Phases not worth running for files in bucket `name`: observed often enough,
+        (almost) never decisive, and not cheap. Verdicts are order-dependent (the first
+        deciding phase wins), so any exact schedule runs every phase up to the decider,
+        which is what the fixed order does; time can only be saved by not running phases.
+        """
+        skipped = set()
+        for phase, stats in self.buckets.get(name, {}).items():
+            if phase in PINNED_PHASES or stats['runs'] < min_observations:
+                continue
+            if stats['decided'] / stats['runs'] <= max_skip_rate and stats['seconds'] / stats['runs'] >= MIN_SKIP_SECONDS:
+                skipped.add(phase)
+        return skipped
+
+    def expected_seconds(self, name: str, order, skipped=()) -> float:
+        """
+        Mean time-to-verdict for bucket `name` with phases run in `order`, minus `skipped`:
+        each phase costs its mean time, weighted by the chance that no earlier phase decided.
+        """
+        phases = self.buckets.get(name, {})
+        total, reach = 0.0, 1.0
+        for phase in order:
+            stats = phases.get(phase)
+            if phase in skipped or not stats or not stats['runs']:
+                continue
+            total += reach * stats['seconds'] / stats['runs']
+            reach *= 1 - stats['decided'] / stats['runs']
+        return total
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'format': MODEL_FORMAT, 'buckets': self.buckets}, indent=1, sort_keys=True))
+
+    @classmethod
+    def load(cls, path):
+        model = cls()
+        path = Path(path)
+        if path.exists():
+            data = json.loads(path.read_text())
+            if data.get('format') != MODEL_FORMAT:
+                raise ValueError(f"{path}: not a phase model.")
+            model.buckets = data['buckets']
+        return model
+
+    def describe(self, order, max_skip_rate=MAX_SKIP_RATE) -> list[str]:
+        """Per bucket: each phase's runs, decision rate and mean cost, and the expected time with and without skipping."""
+        lines = []
+        for name in sorted(self.buckets):
+            skipped = self.skipped_phases(name, max_skip_rate)
+            lines.append(f"{name}: expected {self.expected_seconds(name, order) * 1000:.1f} ms, "
+                         f"{self.expected_seconds(name, order, skipped) * 1000:.1f} ms adaptive"
+                         + (f" (skips {', '.join(phase for phase in order if phase in skipped)})" if skipped else ""))
+            for phase in order:
+                stats = self.buckets[name].get(phase)
+                if stats and stats['runs']:
+                    lines.append(f"  {phase:<10} {stats['runs']:>6} runs  {stats['decided'] / stats['runs']:6.1%} decided  "
+                                 f"{stats['seconds'] / stats['runs'] * 1000:9.2f} ms mean")
+        return lines
+
+class PhaseScheduler:
+    """
+    Decides which phases analyze_halting runs for a program, from a PhaseModel.
+    With `learn`, every analysis is observed back into the model. Every
+    `exploration_interval`-th program of a bucket skips nothing: a skipped phase is
+    never observed, so without these runs an early skip would be permanent.
+    """
+    def __init__(self, model: PhaseModel, learn=False, max_skip_rate=MAX_SKIP_RATE,
+                 exploration_interval=EXPLORATION_INTERVAL):
+        self.model = model
+        self.learn = learn
+        self.max_skip_rate = max_skip_rate
+        self.exploration_interval = exploration_interval
+        self.planned = {}  # bucket -> programs planned
+
+    def plan(self, program: str) -> tuple[dict, set]:
+        """Returns (features, phases to skip)."""
+        features = file_features(program)
+        name = bucket(features)
+        self.planned[name] = self.planned.get(name, 0) + 1
+        if self.exploration_interval and self.planned[name] % self.exploration_interval == 0:
+            return features, set()
+        return features, self.model.skipped_phases(name, self.max_skip_rate)
+
+    def observe(self, features: dict, phase_times: dict):
+        if self.learn:
+            self.model.observe(features, phase_times)
@@ -0,0 +1,140 @@
+# File: components/profiling.py
+import sys
+import heapq
+import threading
+from collections import Counter
+from pathlib import Path
+
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples
+TOP_FUNCTIONS = 10       # Functions listed per phase in the summary
+
+# The pipeline phase running in this process; main._timed keeps it up to date.
+_current_phase = None
+
+def enter_phase(phase):
+    """Marks `phase` as running and returns the previous phase, for the caller to restore."""
+    global _current_phase
+    previous = _current_phase
+    _current_phase = phase
+    return previous
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for the thread that enters it. A background thread
+    records that thread's stack every `interval` seconds, rooted at the running
+    pipeline phase and cut off above the frame that entered the sampler.
+    `stacks` maps collapsed stacks ("phase:static;outer;...;inner") to sample counts.
+    Use as a context manager.
+    """
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+        self._anchor = None
+        self._switch_interval = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._anchor = sys._getframe(1)
+        # Sampling needs the GIL; make the profiled thread hand it over as often as we sample.
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        self._anchor = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            labels = []
+            while frame is not None and frame is not self._anchor:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            frame = None
+            if self._stop.is_set():
+                break  # The profiled thread is already inside __exit__
+            if labels:
+                labels.append(f"phase:{_current_phase or 'other'}")
+                self.stacks[";".join(reversed(labels))] += 1
+
+# --- Output ---
+
+def write_collapsed(stacks, path: Path):
+    """One `frame;frame;frame count` line per stack, the input format of flamegraph.pl and speedscope."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as output:
+        for stack, count in sorted(stacks.items()):
+            output.write(f"{stack} {count}\n")
+
+def phase_summary(stacks, top=TOP_FUNCTIONS) -> list[str]:
+    """Samples per phase, and per phase the functions with the most self samples."""
+    phases = Counter()
+    self_samples = {}
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        phases[frames[0]] += count
+        self_samples.setdefault(frames[0], Counter())[frames[-1]] += count
+    total = sum(phases.values()) or 1
+    lines = []
+    for phase, count in phases.most_common():
+        lines.append(f"{phase}: {count} samples ({count / total:.1%})")
+        for function, samples in self_samples[phase].most_common(top):
+            lines.append(f"  {samples:>8}  {function}")
+    return lines
+
+class ProfileCollector:
+    """
+    Collects per-file stacks, from this process or returned by pool workers, into
+    `output_dir`: files/<file>.collapsed per file, all.collapsed across files, and
+    summary.txt. With `top`, only the `top` slowest files are kept, so every output
+    describes the files worth investigating.
+    """
+    def __init__(self, output_dir, top=None):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.aggregate = Counter()
+        self.files = []  # (seconds, key); with `top`, a min-heap of (seconds, key, stacks)
+
+    def add(self, key: str, seconds: float, stacks):
+        if not stacks:
+            return
+        if self.top is None:
+            # Write through, so profiling a whole corpus does not hold every file's stacks.
+            self._write_file(key, stacks)
+            self.aggregate.update(stacks)
+            self.files.append((seconds, key))
+        elif len(self.files) < self.top:
+            heapq.heappush(self.files, (seconds, key, stacks))
+        else:
+            heapq.heappushpop(self.files, (seconds, key, stacks))
+
+    def _write_file(self, key, stacks):
+        write_collapsed(stacks, self.output_dir / "files" / (key.replace("/", "__") + ".collapsed"))
+
+    def write(self) -> Path:
+        """Writes the aggregate and summary; returns the summary path."""
+        if self.top is not None:
+            for _, key, stacks in self.files:
+                self._write_file(key, stacks)
+                self.aggregate.update(stacks)
+        write_collapsed(self.aggregate, self.output_dir / "all.collapsed")
+        slowest = sorted(((entry[0], entry[1]) for entry in self.files), reverse=True)
+        lines = [f"Profiled {len(slowest)} files, {sum(self.aggregate.values())} samples.", "",
+                 "Slowest files:"]
+        lines += [f"  {seconds:8.3f}s  {key}" for seconds, key in slowest[:TOP_FUNCTIONS]]
+        lines += ["", "Samples by phase (self samples per function):"] + phase_summary(self.aggregate)
+        path = self.output_dir / "summary.txt"
+        path.write_text("\n".join(lines) + "\n")
+        return path
@@ -0,0 +1,76 @@
+# File: components/results_journal.py
+import json
+import hashlib
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+def analyzer_version() -> str:
+    """
+    Content hash of the analyzer's own source (main.py and components/).
+    Any change to the analyzer invalidates previously journaled verdicts.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    sources = [PROJECT_ROOT / "main.py"] + sorted((PROJECT_ROOT / "components").glob("*.py"))
+    for source in sources:
+        digest.update(source.relative_to(PROJECT_ROOT).as_posix().encode('utf-8'))
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+class ResultsJournal:
+    """
+    Append-only JSONL journal of benchmark verdicts, one line per analyzed file, with
+    a hash of the content it was given: a file rewritten in place since (e.g. by
+    --refresh or --generate) no longer matches its record. Lines are flushed as they
+    are written, so an interrupted run loses at most the file that was in flight.
+    Use as a context manager.
+    """
+    def __init__(self, path, version=None):
+        self.path = Path(path)
+        self.version = version or analyzer_version()
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        terminated = True
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb') as journal:
+                journal.seek(-1, 2)
+                terminated = journal.read(1) == b"\n"
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if not terminated:
+            # Start on a fresh line after a torn write.
+            self._file.write("\n")
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def load(self) -> dict:
+        """
+        Returns {file key: record} for every file scored under the current analyzer
+        version. Later lines win; a torn last line from a killed run is ignored.
+        """
+        records = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('version') == self.version:
+                    records[record['file']] = record
+        return records
+
+    def record(self, file_key: str, category: str, verdict: str, is_correct: bool, phases=None, content=None):
+        entry = {'version': self.version, 'file': file_key, 'content': content, 'category': category,
+                 'verdict': verdict, 'correct': is_correct, 'phases': phases or {}}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
@@ -0,0 +1,173 @@
+# File: components/solver_service.py
+import os
+import sys
+import json
+import atexit
+import select
+import threading
+import subprocess
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+
+SOFT_TIMEOUT = 5.0  # Seconds z3 is asked to give up after
+HARD_GRACE = 2.0    # Further seconds before a solver that ignored its timeout is killed
+SOLVER_PROCESSES = 1  # Solver processes per analyzer process
+
+def _serve():
+    """
+    Solver process: one long-lived z3 context and solver. Reads one JSON query
+    {'smt2', 'timeout'} per stdin line and answers {'result': 'sat' | 'unsat' |
+    'unknown' | 'error'} on stdout. Exits when stdin closes.
+    """
+    import z3
+    solver = z3.Solver()
+    for line in sys.stdin:
+        query = json.loads(line)
+        solver.set(timeout=max(1, int(query['timeout'] * 1000)))
+        solver.push()
+        try:
+            solver.add(z3.parse_smt2_string(query['smt2']))  # Unlike from_string, leaves no declarations behind
+            result = str(solver.check())
+        except z3.Z3Exception:
+            result = "error"
+        finally:
+            solver.pop()
+        sys.stdout.write(json.dumps({'result': result}) + "\n")
+        sys.stdout.flush()
+
+def _read_line(stream, deadline):
+    """The next line from a pipe, or "" if none arrives within `deadline` seconds."""
+    if os.name != "nt":
+        ready, _, _ = select.select([stream], [], [], deadline)
+        return stream.readline() if ready else ""
+    # On Windows select() only accepts sockets: wait on a reader thread instead. A
+    # thread left blocked is released when the late solver is killed and its pipe closes.
+    lines = Queue()
+    threading.Thread(target=lambda: lines.put(stream.readline()), daemon=True).start()
+    try:
+        return lines.get(timeout=deadline)
+    except Empty:
+        return ""
+
+class _SolverProcess:
+    def __init__(self):
+        # A plain subprocess rather than multiprocessing: benchmark pool workers are
+        # daemonic, and daemonic processes may not start multiprocessing children.
+        self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, text=True, bufsize=1)
+
+    def ask(self, smt2, timeout, deadline):
+        """The solver's answer, or None if it did not answer within `deadline` seconds or died."""
+        try:
+            self.process.stdin.write(json.dumps({'smt2': smt2, 'timeout': timeout}) + "\n")
+            self.process.stdin.flush()
+            line = _read_line(self.process.stdout, deadline)
+        except (OSError, ValueError):
+            return None
+        return json.loads(line)['result'] if line else None
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+class SolverService:
+    """
+    A small pool of long-lived z3 solver processes. Queries are SMT-LIB2 text (e.g.
+    `Solver.sexpr()`), so z3 is imported and its context created once per solver
+    process rather than per query. z3's own timeout is not always honoured for
+    nonlinear queries; a solver that has not answered `grace` seconds after it is
+    killed and replaced, and its query reported as 'unknown'.
+    Use `check` from any thread, or `submit` for a Future.
+    """
+    def __init__(self, processes=SOLVER_PROCESSES, timeout=SOFT_TIMEOUT, grace=HARD_GRACE):
+        self.processes = processes
+        self.timeout = timeout
+        self.grace = grace
+        self.queries = 0
+        self.kills = 0
+        self._idle = Queue()
+        self._started = []
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def check(self, smt2: str, timeout=None) -> str:
+        """Checks the assertions in `smt2`: 'sat', 'unsat', 'unknown' (timed out or killed) or 'error'."""
+        timeout = timeout or self.timeout
+        with self._lock:
+            self.queries += 1
+            solver = None
+            if len(self._started) < self.processes and self._idle.empty():
+                solver = _SolverProcess()
+                self._started.append(solver)
+        solver = solver or self._idle.get()
+        result = solver.ask(smt2, timeout, timeout + self.grace)
+        if result is None:
+            solver.kill()
+            replacement = _SolverProcess()
+            with self._lock:
+                self.kills += 1
+                self._started[self._started.index(solver)] = replacement
+            solver, result = replacement, "unknown"
+        self._idle.put(solver)
+        return result
+
+    def submit(self, smt2: str, timeout=None):
+        """Like `check`, but returns a concurrent.futures.Future of the result."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.processes, thread_name_prefix="solver")
+        return self._executor.submit(self.check, smt2, timeout)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for solver in self._started:
+            solver.close()
+        self._started = []
+        self._idle = Queue()
+
+_default_service = None
+_default_pid = None
+
+def default_service() -> SolverService:
+    """The process-wide solver service, started on first use (again in a forked child)."""
+    global _default_service, _default_pid
+    if _default_service is None or _default_pid != os.getpid():
+        _default_service = SolverService()
+        _default_pid = os.getpid()
+    return _default_service
+
+def deadline_kills() -> int:
+    """
+    Solvers the process-wide service has killed for missing their deadline so far. A
+    result computed while this grew depended on machine load, so it must not be cached.
+    """
+    if _default_service is None or _default_pid != os.getpid():
+        return 0
+    return _default_service.kills
+
+def check_solver(solver, timeout=None) -> str:
+    """Checks a z3 Solver's assertions in the process-wide service: 'sat', 'unsat', 'unknown' or 'error'."""
+    return default_service().check(solver.sexpr(), timeout)
+
+@atexit.register
+def _close_default_service():
+    # A forked child inherits this handler, but its parent's solvers are not its own.
+    if _default_service is not None and _default_pid == os.getpid():
+        _default_service.close()
+
+if __name__ == "__main__":
+    _serve()
@@ -0,0 +1,162 @@
+# File: components/spans.py
+import os
+import json
+import time
+import secrets
+import contextvars
+from collections import deque
+
+RING_CAPACITY = 1024  # Spans kept by a RingBufferExporter by default
+
+def _new_id(bits=64) -> str:
+    # Not the random module: analyzed programs and input exploration reseed it, which would repeat ids.
+    return f"{secrets.randbits(bits):0{bits // 4}x}"
+
+class Span:
+    """
+    One timed operation: a name, attributes, and its place in a trace (trace id,
+    span id, parent span id). Ended spans are handed to the tracer's exporters as
+    plain dicts (see `record`).
+    """
+    def __init__(self, tracer, name, trace_id, parent_id, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self._token = None
+
+    @property
+    def context(self) -> tuple[str, str]:
+        """(trace id, span id): pass it to another process to parent its spans under this one."""
+        return self.trace_id, self.span_id
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            self.tracer.export(self)
+
+    def record(self) -> dict:
+        return {'trace': self.trace_id, 'span': self.span_id, 'parent': self.parent_id, 'name': self.name,
+                'start': self.start, 'duration': self.duration, 'pid': os.getpid(), 'attributes': self.attributes}
+
+    def __enter__(self):
+        self._token = self.tracer._current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        self.tracer._current.reset(self._token)
+        self.end()
+
+class _NoopSpan:
+    """What a tracer without exporters hands out: every operation does nothing."""
+    context = None
+
+    def set(self, **attributes):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Tracer:
+    """
+    Records spans while at least one exporter is configured; otherwise `span` and
+    `start` return NOOP_SPAN. Hot paths check `enabled` (a plain attribute) first and
+    skip the span entirely, so disabled tracing costs one attribute read.
+    A span started inside another (in the same thread or task) becomes its child.
+    Top-level spans join the trace of `parent`, a Span.context from another process,
+    which is how pool workers' spans nest under the run that started them.
+    """
+    def __init__(self):
+        self.exporters = []
+        self.enabled = False
+        self.parent = None
+        self._current = contextvars.ContextVar("current_span", default=None)
+
+    def configure(self, exporters=(), parent=None):
+        """Replaces the exporters (none disables tracing) and the remote parent context."""
+        self.exporters = list(exporters)
+        self.enabled = bool(self.exporters)
+        self.parent = parent
+        self._current.set(None)
+
+    def start(self, name: str, **attributes):
+        """
+        A started span. Used as a context manager (`with tracer.span(...)`), it is the
+        current span while the block runs and ends after it; otherwise call its `end`.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        current = self._current.get()
+        if current is not None:
+            trace_id, parent_id = current.context
+        elif self.parent is not None:
+            trace_id, parent_id = self.parent
+        else:
+            trace_id, parent_id = _new_id(128), None
+        return Span(self, name, trace_id, parent_id, attributes)
+
+    span = start
+
+    def current(self):
+        """The innermost open span (NOOP_SPAN outside any span)."""
+        return self._current.get() or NOOP_SPAN
+
+    def export(self, span: Span):
+        record = span.record()
+        for exporter in self.exporters:
+            exporter.export(record)
+
+class JsonlExporter:
+    """
+    Appends one JSON line per span to `path`. Each line is a single O_APPEND write,
+    so several processes (e.g. pool workers) can share one file without interleaving.
+    """
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def export(self, record: dict):
+        os.write(self._fd, (json.dumps(record, default=str) + "\n").encode('utf-8'))
+
+    def close(self):
+        os.close(self._fd)
+
+class RingBufferExporter:
+    """Keeps the last `capacity` span records in memory."""
+    def __init__(self, capacity=RING_CAPACITY):
+        self.records = deque(maxlen=capacity)
+
+    def export(self, record: dict):
+        self.records.append(record)
+
+    def drain(self) -> list[dict]:
+        """The buffered records, oldest first, removing them from the buffer."""
+        records = list(self.records)
+        self.records.clear()
+        return records
+
+def format_span(record: dict) -> str:
+    """One line for a span record, e.g. `phase.static 12.3 ms result='halts'`."""
+    attributes = " ".join(f"{key}={value!r}" for key, value in record['attributes'].items())
+    return f"{record['name']} {record['duration'] * 1000:.1f} ms {attributes}".rstrip()
+
+# The process-wide tracer, disabled until configured.
+tracer = Tracer()
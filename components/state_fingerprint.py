@@ -0,0 +1,461 @@
+# File: components/state_fingerprint.py
+import dis
+import types
+import struct
+import hashlib
+from array import array
+
+FINGERPRINT_MASK = 0xFFFFFFFFFFFFFFFF
+# Set on the fingerprint of a state that was sampled or summarized somewhere: two
+# such states may differ, so an inexact fingerprint never proves a cycle.
+INEXACT_BIT = 1 << 63
+_FLOAT_BITS = struct.Struct('<d')
+_HEAPTYPE = 1 << 9  # Py_TPFLAGS_HEAPTYPE: a class defined in Python
+_PLAIN_SIZE = type("_Plain", (), {}).__basicsize__  # An instance with only __dict__ and __weakref__
+# Names through which code can reach globals it does not name.
+DYNAMIC_GLOBALS = {"globals", "vars", "locals", "exec", "eval", "__import__"}
+GLOBAL_OPS = {"LOAD_GLOBAL", "STORE_GLOBAL", "DELETE_GLOBAL", "LOAD_NAME", "STORE_NAME", "DELETE_NAME",
+              "LOAD_FROM_DICT_OR_GLOBALS"}
+JUMP_OPCODES = set(dis.hasjrel + dis.hasjabs)
+# Instructions after which control never falls through to the next one.
+TERMINATORS = {"RETURN_VALUE", "RETURN_CONST", "RAISE_VARARGS", "RERAISE", "JUMP_FORWARD", "JUMP_BACKWARD",
+               "JUMP_BACKWARD_NO_INTERRUPT", "JUMP_ABSOLUTE", "JUMP", "JUMP_NO_INTERRUPT"}
+
+# Values that are hashed directly.
+SCALAR_TYPES = (int, float, complex, bool, str, bytes, type(None), range, slice)
+
+# Objects whose fingerprint depends only on their identity: re-walking a module
+# on every line event is pointless for cycle detection. Closures and classes
+# defined in Python are the exception (see StateFingerprinter).
+IDENTITY_TYPES = (
+    types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, type,
+    # The descriptors found in class namespaces never change either.
+    types.GetSetDescriptorType, types.MemberDescriptorType, types.WrapperDescriptorType,
+    types.MethodDescriptorType, staticmethod, classmethod, property,
+)
+
+# Containers whose elements are their whole state; the fingerprint of a subclass is inexact.
+CONTAINER_TYPES = (dict, list, tuple, bytearray, set, frozenset)
+
+def combine_words(words) -> int:
+    """
+    Mixes a sequence of 64-bit words into one 64-bit fingerprint.
+    Python's tuple hash is not used here: it reduces ints modulo 2**61 - 1,
+    so hash(-1) == hash(-2) and 5 * 2**61 collides with 5.
+    """
+    digest = hashlib.blake2b(array('Q', words).tobytes(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+class _CodeFlow:
+    """
+    The basic blocks of one code object and, for each, the union of the weights of
+    every instruction reachable from its start. `weigh` maps an instruction to a
+    bitset (an int), so the result for any offset is one lookup away.
+    """
+    def __init__(self, code, weigh):
+        instructions = list(dis.get_instructions(code))
+        self.index = {instruction.offset: position for position, instruction in enumerate(instructions)}
+        handlers = [(entry.start, entry.end, self.index[entry.target])
+                    for entry in getattr(dis.Bytecode(code), 'exception_entries', ()) if entry.target in self.index]
+        self.weights = []
+        self.successors = []
+        leaders = {0} | {target for _, _, target in handlers}
+        for position, instruction in enumerate(instructions):
+            successors = []
+            if instruction.opcode in JUMP_OPCODES and instruction.argval in self.index:
+                successors.append(self.index[instruction.argval])
+                leaders.update((successors[0], position + 1))
+            if instruction.opname in TERMINATORS:
+                leaders.add(position + 1)
+            elif position + 1 < len(instructions):
+                successors.append(position + 1)
+            successors += [target for start, end, target in handlers if start <= instruction.offset < end]
+            if instruction.starts_line is not None:
+                leaders.add(position)
+            self.weights.append(weigh(instruction))
+            self.successors.append(successors)
+        self.leaders = sorted(leader for leader in leaders if leader < len(instructions))
+        self.ends = self.leaders[1:] + [len(instructions)]
+        self.block_of = {}
+        for number, (leader, block_end) in enumerate(zip(self.leaders, self.ends)):
+            for position in range(leader, block_end):
+                self.block_of[position] = number
+
+        # Backward fixpoint: a block reaches its own weights and everything its successors reach.
+        self.reach = [0] * len(self.leaders)
+        changed = True
+        while changed:
+            changed = False
+            for number in reversed(range(len(self.leaders))):
+                reach = self._from(self.leaders[number])
+                if reach != self.reach[number]:
+                    self.reach[number] = reach
+                    changed = True
+
+    def _from(self, position):
+        """What the code reaches from instruction `position`, given the block results so far."""
+        block = self.block_of[position]
+        reach = 0
+        for current in range(position, self.ends[block]):
+            reach |= self.weights[current]
+            for successor in self.successors[current]:
+                if self.block_of[successor] != block or successor == self.leaders[block]:
+                    reach |= self.reach[self.block_of[successor]]
+        return reach
+
+    def reachable(self, offset):
+        """What the code reaches from the instruction at `offset`, or None if it is not one."""
+        position = self.index.get(offset)
+        if position is None:
+            return None
+        if position == self.leaders[self.block_of[position]]:
+            return self.reach[self.block_of[position]]
+        return self._from(position)
+
+class GlobalReferences:
+    """
+    The globals a frame's future may touch: those its code can still load, store or
+    delete from the current instruction on, or that any code it may call touches.
+    Callees are matched by name (any indexed code object named like a name the
+    remaining code uses) plus the code objects the remaining code creates. A global
+    the frame is done with cannot change what it does, however large it is. The
+    program's code is indexed up front; other code (an imported module's body) when
+    first asked about. Sets of global names are kept as bitsets over `_names`.
+    """
+    def __init__(self, program_code=None):
+        self._names = []
+        self._bits = {}
+        self._dynamic = 0  # Bits of DYNAMIC_GLOBALS
+        self._globals = {}  # code -> bitset of the globals its whole bytecode touches
+        self._by_name = {}  # co_name -> code objects
+        self._edges = {}
+        self._closures = {}
+        self._named = {}  # name -> closure of the code objects it may call
+        self._flows = {}
+        self._live = {}
+        if program_code is not None:
+            self.index(program_code)
+
+    def _bit(self, name):
+        if name not in self._bits:
+            self._bits[name] = 1 << len(self._names)
+            self._names.append(name)
+            if name in DYNAMIC_GLOBALS:
+                self._dynamic |= self._bits[name]
+        return self._bits[name]
+
+    def index(self, code):
+        pending = [code]
+        while pending:
+            code = pending.pop()
+            if code in self._globals:
+                continue
+            touched = 0
+            for instruction in dis.get_instructions(code):
+                if instruction.opname in GLOBAL_OPS:
+                    touched |= self._bit(instruction.argval)
+            self._globals[code] = touched
+            self._by_name.setdefault(code.co_name, []).append(code)
+            pending.extend(constant for constant in code.co_consts if isinstance(constant, types.CodeType))
+
+    def _calls(self, code):
+        """The indexed code objects `code` may call or create."""
+        if code not in self._edges:
+            callees = {constant for constant in code.co_consts if isinstance(constant, types.CodeType)}
+            for name in code.co_names + code.co_varnames + code.co_cellvars + code.co_freevars:
+                callees.update(self._by_name.get(name, ()))
+            self._edges[code] = callees
+        return self._edges[code]
+
+    def _closure(self, code):
+        """Globals touched by `code` and by everything it may call, whole."""
+        if code not in self._closures:
+            if code not in self._globals:
+                self.index(code)
+            self._close(code)
+        return self._closures[code]
+
+    def _close(self, root):
+        # Tarjan's algorithm, iteratively: the codes of one call cycle share one closure.
+        order, low, stack, on_stack = {}, {}, [], set()
+        work = [(root, None)]
+        while work:
+            code, callees = work.pop()
+            if callees is None:
+                order[code] = low[code] = len(order)
+                stack.append(code)
+                on_stack.add(code)
+                callees = iter(self._calls(code))
+            for callee in callees:
+                if callee in self._closures:
+                    continue
+                if callee not in order:
+                    work.append((code, callees))
+                    work.append((callee, None))
+                    break
+                if callee in on_stack:
+                    low[code] = min(low[code], order[callee])
+            else:
+                if low[code] == order[code]:
+                    component = []
+                    while not component or component[-1] is not code:
+                        component.append(stack.pop())
+                    on_stack.difference_update(component)
+                    closure = 0
+                    for member in component:
+                        closure |= self._globals[member]
+                        for callee in self._calls(member):
+                            closure |= self._closures.get(callee, 0)
+                    for member in component:
+                        self._closures[member] = closure
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[code])
+
+    def _weigh(self, instruction):
+        """Globals an instruction touches, with everything it may call."""
+        argval = instruction.argval
+        if isinstance(argval, types.CodeType):
+            return self._closure(argval)
+        if not isinstance(argval, str):
+            return 0
+        if argval not in self._named:
+            self._named[argval] = 0
+            for callee in self._by_name.get(argval, ()):
+                self._named[argval] |= self._closure(callee)
+        weight = self._named[argval]
+        if instruction.opname in GLOBAL_OPS:
+            weight |= self._bit(argval)
+        return weight
+
+    def names(self, code, offset=0):
+        """
+        The global names that may still matter to a frame of `code` about to run the
+        instruction at `offset`, or None for all of them: when the code it can reach
+        may use globals it does not name, through globals(), exec() and the like.
+        """
+        flow = self._flows.get(code)
+        if flow is None:
+            if code not in self._globals:
+                self.index(code)
+            flow = self._flows[code] = _CodeFlow(code, self._weigh)
+        touched = flow.reachable(offset)
+        if touched is None:
+            touched = self._closure(code)  # Not an instruction boundary: the whole code
+        if touched not in self._live:
+            self._live[touched] = None if touched & self._dynamic else \
+                tuple(sorted(name for number, name in enumerate(self._names) if touched >> number & 1))
+        return self._live[touched]
+
+def _scalar_word(value, value_type):
+    """Encodes a scalar as a 64-bit word, injectively for 64-bit ints and all floats."""
+    if value_type is int:
+        if -0x8000000000000000 <= value <= 0x7FFFFFFFFFFFFFFF:
+            return value & FINGERPRINT_MASK
+        # Huge ints: sign, magnitude and both ends of the value.
+        magnitude = abs(value)
+        return combine_words((value < 0, magnitude.bit_length(), magnitude & FINGERPRINT_MASK,
+                              magnitude >> max(0, magnitude.bit_length() - 64)))
+    if value_type is float:
+        return int.from_bytes(_FLOAT_BITS.pack(value), 'little')
+    # str/bytes hashes are SipHash and cached on the object.
+    return hash(value) & FINGERPRINT_MASK
+
+class StateFingerprinter:
+    """
+    Computes bounded-cost 64-bit fingerprints of traced frame states.
+    1. Scalars are encoded directly.
+    2. Containers are summarized by type, identity and length, plus the
+       fingerprints of at most `max_items` of their elements, down to `max_depth`.
+       Functions include their closure cells and classes defined in Python their
+       namespace; modules and other functions count by identity alone.
+    3. Deeply immutable containers (tuples/frozensets of scalars) are cached by
+       identity so repeated line events do not re-walk them.
+    A state that had to be sampled or summarized (a long container, a value below
+    `max_depth`, an object whose state is not in its __dict__) gets INEXACT_BIT set:
+    the cycle detector only trusts exact fingerprints.
+    Frames running the analyzed program also include the globals they may touch: a
+    loop can depend on globals it only changes in calls.
+    """
+    def __init__(self, max_depth=2, max_items=16, max_cache_size=4096):
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_cache_size = max_cache_size
+        self._exact = True
+        # id(obj) -> (obj, fingerprint). Holding `obj` keeps its id from being reused.
+        self._immutable_cache = {}
+        # type -> 64-bit tag, so that 1, 1.0, True and "1" never share a fingerprint.
+        self._type_tags = {}
+        # type -> whether its instances keep all their state in __dict__
+        self._plain_types = {}
+
+    def fingerprint_frame(self, line_no: int, f_locals: dict, code=None, activation: int = 0, offset: int = 0,
+                          f_globals=None, global_names=None) -> int:
+        """
+        Returns the fingerprint of a (code object, activation, line number, bytecode
+        offset, local variables, globals) state, with INEXACT_BIT set if it is inexact.
+        Including the code object keeps a class body or an imported module from
+        colliding with the analyzed program's own frames at the same line; the
+        activation number keeps two separate calls of the same function with the
+        same arguments from looking like one loop; the offset separates the several
+        line events a multi-line expression emits for the same line.
+        Pass `f_globals` for frames of the analyzed program and for module frames,
+        with the `global_names` that may still matter from `offset` on
+        (GlobalReferences.names; None for all). A module frame, whose locals are its
+        globals, then only costs those names, and a large global it no longer reads
+        does not make its states inexact.
+        """
+        self._exact = True
+        words = [id(code) & FINGERPRINT_MASK, activation & FINGERPRINT_MASK,
+                 line_no & FINGERPRINT_MASK, offset & FINGERPRINT_MASK]
+        if f_locals is not f_globals:
+            self._add_variables(words, f_locals.items())
+        if f_globals is not None:
+            words.append(len(words))  # Separates the locals from the globals
+            self._add_variables(words, f_globals.items() if global_names is None else
+                                ((name, f_globals[name]) for name in global_names if name in f_globals))
+        fingerprint = combine_words(words) & ~INEXACT_BIT
+        return fingerprint if self._exact else fingerprint | INEXACT_BIT
+
+    def _add_variables(self, words, items):
+        for name, value in items:
+            if name == '__builtins__':
+                # Module-level frames carry the whole builtins namespace; it never drives a loop.
+                continue
+            words.append(hash(name) & FINGERPRINT_MASK)
+            words.append(self._type_tag(type(value)))
+            words.append(self.fingerprint(value))
+
+    def fingerprint(self, value, depth=0) -> int:
+        """Returns the fingerprint of a single value. Never raises."""
+        try:
+            return self._fingerprint(value, depth)
+        except Exception:
+            # Broken __hash__/__len__/__iter__ implementations fall back to identity.
+            self._exact = False
+            return id(value) & FINGERPRINT_MASK
+
+    def _type_tag(self, value_type):
+        tag = self._type_tags.get(value_type)
+        if tag is None:
+            tag = hash(value_type.__qualname__) & FINGERPRINT_MASK
+            self._type_tags[value_type] = tag
+        return tag
+
+    def _child_words(self, values, depth):
+        words = []
+        for value in values:
+            words.append(self._type_tag(type(value)))
+            words.append(self._fingerprint(value, depth + 1))
+        return words
+
+    def _fingerprint(self, value, depth):
+        value_type = type(value)
+        if value_type in SCALAR_TYPES:
+            return _scalar_word(value, value_type)
+        if isinstance(value, IDENTITY_TYPES) and not (
+                (value_type is types.FunctionType and value.__closure__)
+                or (value_type is type and value.__flags__ & _HEAPTYPE)):
+            return id(value) & FINGERPRINT_MASK
+
+        if value_type in (tuple, frozenset):
+            cached = self._immutable_cache.get(id(value))
+            if cached is not None and cached[0] is value:
+                return cached[1]
+
+        if depth >= self.max_depth:
+            return self._summary(value)
+        if value_type not in CONTAINER_TYPES and isinstance(value, CONTAINER_TYPES):
+            # Subclasses may keep state of their own: their fingerprint can only be a sample.
+            self._exact = False
+
+        if value_type is types.FunctionType:
+            # A closure's state lives in its cells.
+            cells = []
+            for cell in value.__closure__:
+                try:
+                    cells.append(cell.cell_contents)
+                except ValueError:  # Empty cell
+                    cells.append(cell)
+            return combine_words([id(value)] + self._child_words(cells, depth))
+        if value_type is type:
+            return self._mapping(value, vars(value), depth)
+        if isinstance(value, dict):
+            return self._mapping(value, value, depth)
+
+        if isinstance(value, (list, tuple, bytearray)):
+            if len(value) <= self.max_items:
+                sample = value
+            else:
+                # Head and tail cover the common append/pop/index-from-end patterns.
+                self._exact = False
+                half = self.max_items // 2
+                sample = value[:half] + value[-half:]
+            if value_type is tuple:
+                fingerprint = combine_words([len(value)] + self._child_words(sample, depth))
+                if len(value) <= self.max_items and all(type(item) in SCALAR_TYPES for item in value):
+                    self._remember(value, fingerprint)
+                return fingerprint
+            return combine_words([id(value), len(value)] + self._child_words(sample, depth))
+
+        if isinstance(value, (set, frozenset)):
+            # Order-independent: sum of element fingerprints.
+            combined = 0
+            for index, item in enumerate(value):
+                if index >= self.max_items:
+                    self._exact = False
+                    break
+                combined = (combined + combine_words(self._child_words((item,), depth))) & FINGERPRINT_MASK
+            if value_type is frozenset:
+                fingerprint = combine_words((len(value), combined))
+                if len(value) <= self.max_items and all(type(item) in SCALAR_TYPES for item in value):
+                    self._remember(value, fingerprint)
+                return fingerprint
+            return combine_words((id(value), len(value), combined))
+
+        # Plain instances: summarize their attribute dictionary one level down.
+        attributes = getattr(value, '__dict__', None)
+        if isinstance(attributes, dict):
+            if not self._plain_type(value_type):
+                self._exact = False
+            return combine_words((id(value), self._fingerprint(attributes, depth + 1)))
+        return self._summary(value)
+
+    def _mapping(self, value, mapping, depth):
+        """A dict, or a class by its namespace: at most `max_items` items are sampled."""
+        sample = []
+        for index, (key, item) in enumerate(mapping.items()):
+            if index >= self.max_items:
+                self._exact = False
+                break
+            sample.append(key)
+            sample.append(item)
+        return combine_words([id(value), len(mapping)] + self._child_words(sample, depth))
+
+    def _plain_type(self, value_type) -> bool:
+        """
+        Whether instances keep all their state in __dict__: Python classes all the way down,
+        without slots, and no larger than a plain instance (a C base such as _random.Random
+        is a heap type too, but keeps its state natively).
+        """
+        plain = self._plain_types.get(value_type)
+        if plain is None:
+            plain = (value_type.__basicsize__ == _PLAIN_SIZE and
+                     all(cls.__flags__ & _HEAPTYPE and '__slots__' not in vars(cls) for cls in value_type.__mro__[:-1]))
+            self._plain_types[value_type] = plain
+        return plain
+
+    def _summary(self, value):
+        """Identity plus length: the cheapest summary that still notices growth. Always inexact."""
+        self._exact = False
+        try:
+            length = len(value) & FINGERPRINT_MASK
+        except Exception:
+            length = FINGERPRINT_MASK
+        return combine_words((id(value), length))
+
+    def _remember(self, value, fingerprint):
+        if len(self._immutable_cache) >= self.max_cache_size:
+            self._immutable_cache.clear()
+        self._immutable_cache[id(value)] = (value, fingerprint)
@@ -1,5 +1,7 @@
 import ast
-from z3 import Solver, Int, sat, Not, And, Or
+from z3 import Solver, Int, Not, And, Or
+
+from components.solver_service import check_solver
 
 def parse_update(body, var_name):
     """Parses the loop body to find how the loop variable is updated."""
@@ -51,13 +53,13 @@ def symbolic_analysis(program: str) -> str:
                 s.push()
                 # 1. Ranking function must be non-negative when loop condition is true
                 s.add(And(condition, ranking_function < 0))
-                if s.check() == sat:
+                if check_solver(s) == "sat":
                     s.pop()
                     continue
 
                 # 2. Each iteration under the condition must strictly decrease the ranking function
                 s.add(And(condition, update_relation, ranking_function <= loop_var_prime))
-                if s.check() == sat:
+                if check_solver(s) == "sat":
                     s.pop()
                     continue 
 
@@ -1,6 +1,8 @@
 # File: components/symbolic_prover.py
 import ast
-from z3 import Solver, Int, sat, And, Or, Not
+from z3 import Solver, Int, And, Or, Not
+
+from components.solver_service import check_solver
 
 def prove_termination(program: str) -> tuple[str, str]:
     """
@@ -10,7 +12,6 @@ def prove_termination(program: str) -> tuple[str, str]:
     try:
         tree = ast.parse(program)
         solver = Solver()
-        solver.set(timeout=5000)  # 5 seconds timeout
 
         for node in ast.walk(tree):
             # Case 1: Handle simple 'for i in range(constant)' loops
@@ -82,12 +83,12 @@ def prove_termination(program: str) -> tuple[str, str]:
                     solver.push()
                     # Check non-negative
                     solver.add(And(condition, ranking < 0))
-                    if solver.check() == sat:
+                    if check_solver(solver) == "sat":
                         solver.pop()
                         continue
                     # Check decrease
                     solver.add(And(condition, update_relation, ranking <= (const_val - loop_var_prime)))
-                    if solver.check() == sat:
+                    if check_solver(solver) == "sat":
                         solver.pop()
                         continue
                     solver.pop()
@@ -0,0 +1,227 @@
+# File: components/trace_recording.py
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from .divergence_detection import LoopGuard, DivergenceMonitor
+from .state_fingerprint import INEXACT_BIT
+
+# File layout: MAGIC, then a sequence of chunks. Each chunk is
+#   4-byte tag | uint32 record count | uint64 payload length | payload
+# and payloads are zero-padded to 8 bytes so every buffer in the mapping is aligned.
+# HEAD/RUN_/VERD payloads are UTF-8 JSON; LINE/FPRT/GARD payloads are raw
+# `array` buffers in the byte order recorded in HEAD.
+#   LINE: int32 line-number deltas (first delta of a run is relative to 0)
+#   FPRT: uint64 state fingerprints, one per line event (top bit set if inexact)
+#   GARD: loop-guard samples, GUARD_RECORD each
+MAGIC = b"PHATRC\x02\x00"
+CHUNK_HEADER = struct.Struct('<4sIQ')
+GUARD_RECORD = struct.Struct('=QQId')  # event index, frame key, header line, quantity (NaN if not numeric)
+DEFAULT_CHUNK_EVENTS = 65536
+
+class TraceRecorder:
+    """
+    Records the line events of a traced execution into a compact, chunked binary file.
+    Buffers are `array`-backed and flushed every `chunk_events` events, so memory
+    use is bounded regardless of trace length.
+    """
+    def __init__(self, path, chunk_events=DEFAULT_CHUNK_EVENTS):
+        self.path = path
+        self.chunk_events = chunk_events
+        self._file = None
+        self._line_deltas = array('i')
+        self._fingerprints = array('Q')
+        self._guards = bytearray()
+        self._guard_count = 0
+        self._last_line = 0
+        self._event_index = 0
+
+    def start(self, guards: dict, metadata=None):
+        """Opens the file and writes the header with the monitored loop guards."""
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC)
+        header = {
+            'byteorder': sys.byteorder,
+            'guards': [guard.to_dict() for guard in guards.values()],
+        }
+        header.update(metadata or {})
+        self._write_json(b"HEAD", header)
+
+    def begin_run(self, trace_budget: int, depth_budget: int):
+        """Marks the start of one traced execution (escalating budgets produce several)."""
+        self._flush()
+        self._last_line = 0
+        self._event_index = 0
+        self._write_json(b"RUN_", {'trace_budget': trace_budget, 'depth_budget': depth_budget})
+
+    def record_line(self, lineno: int, fingerprint: int):
+        self._line_deltas.append(lineno - self._last_line)
+        self._last_line = lineno
+        self._fingerprints.append(fingerprint)
+        self._event_index += 1
+        if len(self._fingerprints) >= self.chunk_events:
+            self._flush()
+
+    def record_guard(self, frame_key: int, lineno: int, quantity):
+        value = math.nan if quantity is None else float(quantity)
+        self._guards += GUARD_RECORD.pack(self._event_index, frame_key & 0xFFFFFFFFFFFFFFFF, lineno, value)
+        self._guard_count += 1
+
+    def finish(self, result: str, reason: str):
+        """Writes the verdict and closes the file."""
+        if self._file is None:
+            return
+        self._flush()
+        self._write_json(b"VERD", {'result': result, 'reason': reason})
+        self._file.close()
+        self._file = None
+
+    def _flush(self):
+        if self._file is None:
+            return
+        if self._fingerprints:
+            self._write_chunk(b"LINE", len(self._line_deltas), self._line_deltas.tobytes())
+            self._write_chunk(b"FPRT", len(self._fingerprints), self._fingerprints.tobytes())
+            self._line_deltas = array('i')
+            self._fingerprints = array('Q')
+        if self._guard_count:
+            self._write_chunk(b"GARD", self._guard_count, bytes(self._guards))
+            self._guards = bytearray()
+            self._guard_count = 0
+
+    def _write_json(self, tag, data):
+        payload = json.dumps(data).encode('utf-8')
+        self._write_chunk(tag, 1, payload)
+
+    def _write_chunk(self, tag, count, payload):
+        self._file.write(CHUNK_HEADER.pack(tag, count, len(payload)))
+        self._file.write(payload)
+        self._file.write(b"\x00" * (-len(payload) % 8))
+
+class RecordedRun:
+    """One traced execution read back from a trace file."""
+    def __init__(self, trace_budget, depth_budget):
+        self.trace_budget = trace_budget
+        self.depth_budget = depth_budget
+        self.line_chunks = []
+        self.fingerprint_chunks = []
+        self.guard_chunks = []
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.fingerprint_chunks)
+
+    def lines(self):
+        """Yields absolute line numbers, undoing the delta encoding."""
+        line = 0
+        for chunk in self.line_chunks:
+            for delta in chunk:
+                line += delta
+                yield line
+
+    def fingerprints(self):
+        for chunk in self.fingerprint_chunks:
+            yield from chunk
+
+    def guard_samples(self):
+        """Yields (event index, frame key, line, quantity or None)."""
+        for chunk in self.guard_chunks:
+            for event_index, frame_key, lineno, quantity in GUARD_RECORD.iter_unpack(chunk):
+                yield event_index, frame_key, lineno, None if math.isnan(quantity) else quantity
+
+class TraceReader:
+    """
+    Memory-maps a trace file. Event buffers are exposed as zero-copy
+    memoryview casts over the mapping; use as a context manager.
+    """
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self.header = {}
+        self.verdict = None
+        self.runs = []
+        self._parse()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for run in self.runs:
+            for chunks in (run.line_chunks, run.fingerprint_chunks, run.guard_chunks):
+                for chunk in chunks:
+                    chunk.release()
+        self.runs = []
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    @property
+    def guards(self):
+        return {data['lineno']: LoopGuard.from_dict(data) for data in self.header.get('guards', [])}
+
+    def _parse(self):
+        if self._view[:len(MAGIC)] != MAGIC:
+            if self._view[:6] == MAGIC[:6]:
+                raise ValueError("Trace file was written by another version of the analyzer; record it again.")
+            raise ValueError("Not a halting-analyzer trace file.")
+        offset = len(MAGIC)
+        run = None
+        while offset < len(self._view):
+            tag, count, length = CHUNK_HEADER.unpack_from(self._view, offset)
+            offset += CHUNK_HEADER.size
+            payload = self._view[offset:offset + length]
+            offset += length + (-length % 8)
+            if tag == b"HEAD":
+                self.header = json.loads(bytes(payload))
+                if self.header.get('byteorder') != sys.byteorder:
+                    raise ValueError("Trace was recorded on a machine with a different byte order.")
+            elif tag == b"RUN_":
+                data = json.loads(bytes(payload))
+                run = RecordedRun(data['trace_budget'], data['depth_budget'])
+                self.runs.append(run)
+            elif tag == b"VERD":
+                self.verdict = json.loads(bytes(payload))
+            elif run is None:
+                raise ValueError("Event chunk found before any run marker.")
+            elif tag == b"LINE":
+                run.line_chunks.append(payload.cast('i'))
+            elif tag == b"FPRT":
+                run.fingerprint_chunks.append(payload.cast('Q'))
+            elif tag == b"GARD":
+                run.guard_chunks.append(payload)
+
+def replay_cycle_detection(run: RecordedRun):
+    """
+    Re-runs cycle detection over a recorded run.
+    Returns (event index, line) of the first repeated exact state, or None.
+    """
+    seen = set()
+    for index, (line, fingerprint) in enumerate(zip(run.lines(), run.fingerprints())):
+        if fingerprint & INEXACT_BIT:
+            continue
+        if fingerprint in seen:
+            return index, line
+        seen.add(fingerprint)
+    return None
+
+def replay_divergence_detection(run: RecordedRun, guards: dict, window=None):
+    """
+    Re-runs divergence detection over the loop-guard samples of a recorded run.
+    Returns (event index, LoopGuard) of the first divergent loop, or None. A loop
+    that may exit otherwise only counts if it still diverges when the run's budget ran out.
+    """
+    monitor = DivergenceMonitor(guards) if window is None else DivergenceMonitor(guards, window)
+    for event_index, frame_key, lineno, quantity in run.guard_samples():
+        guard = monitor.observe_quantity(frame_key, lineno, quantity)
+        if guard is not None:
+            return event_index, guard
+    if len(run) > run.trace_budget:
+        guard = monitor.persisting()
+        if guard is not None:
+            return len(run) - 1, guard
+    return None
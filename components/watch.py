@@ -0,0 +1,92 @@
+# File: components/watch.py
+import os
+import time
+
+from components.semantic_hashing import get_semantic_hash
+
+POLL_INTERVAL = 0.5  # Seconds between scans of the tree
+DEBOUNCE = 0.3       # A burst of changes is over once the tree has been quiet this long
+
+def scan_tree(root) -> dict:
+    """{path: (mtime_ns, size)} for every .py file under `root`, skipping hidden and cache directories."""
+    snapshot = {}
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(name for name in subdirs if name != "__pycache__" and not name.startswith("."))
+        for name in files:
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def changed_paths(old: dict, new: dict) -> set:
+    """Paths added, removed, or whose mtime or size differ between two snapshots."""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+class TreeWatcher:
+    """
+    Detects changes to the .py files under a directory by mtime/size polling, which
+    works on every platform and filesystem (including network mounts and containers
+    where inotify events are unreliable).
+    """
+    def __init__(self, root, poll_interval=POLL_INTERVAL, debounce=DEBOUNCE):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.snapshot = scan_tree(root)
+
+    def wait_for_changes(self) -> list:
+        """
+        Blocks until files change, then keeps collecting until the tree has been quiet
+        for `debounce` seconds, so an editor's save-rename-touch burst or a checkout is
+        handled as one batch. Returns the changed paths, sorted.
+        """
+        while True:
+            time.sleep(self.poll_interval)
+            current = scan_tree(self.root)
+            changed = changed_paths(self.snapshot, current)
+            if not changed:
+                continue
+            while True:
+                time.sleep(self.debounce)
+                settled = scan_tree(self.root)
+                more = changed_paths(current, settled)
+                current = settled
+                if not more:
+                    break
+                changed |= more
+            self.snapshot = current
+            return sorted(changed)
+
+class VerdictIndex:
+    """
+    Warm in-memory index of {path: {'hash', 'result', 'reason'}}. `analyze` maps
+    program source to (result, reason).
+    """
+    def __init__(self, analyze):
+        self.analyze = analyze
+        self.entries = {}
+
+    def update(self, path) -> tuple[str, dict | None, dict | None]:
+        """
+        Brings one path up to date. Returns (status, previous entry, current entry), where
+        status is 'removed', 'unchanged' (an edit that left the semantic hash intact, such
+        as a comment or a rename, which is not re-analysed) or 'analyzed'.
+        """
+        previous = self.entries.get(path)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as source:
+                program = source.read()
+        except OSError:
+            self.entries.pop(path, None)
+            return "removed", previous, None
+        program_hash = get_semantic_hash(program)
+        if previous is not None and previous['hash'] == program_hash:
+            return "unchanged", previous, previous
+        result, reason = self.analyze(program)
+        entry = {'hash': program_hash, 'result': result, 'reason': reason}
+        self.entries[path] = entry
+        return "analyzed", previous, entry
@@ -0,0 +1,217 @@
+# File: components/worker_pool.py
+import os
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+def current_rss_mb():
+    """
+    Current resident set size of this process in MB, or None without /proc (e.g. on
+    macOS or Windows). getrusage is no substitute: it reports the peak, which never
+    drops, and in different units per platform.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def _worker_main(conn, func, initializer, max_tasks, max_rss_mb):
+    """
+    Worker loop: receives chunks of tasks, sends back one result per task, then
+    reports whether it wants to be recycled.
+    """
+    if initializer is not None:
+        initializer()
+    completed = 0
+    while True:
+        try:
+            chunk = conn.recv()
+        except EOFError:
+            break
+        if chunk is None:
+            break
+        for task in chunk:
+            try:
+                conn.send(('result', func(task)))
+            except KeyboardInterrupt:
+                raise
+            except BaseException as e:
+                # An analyzed program calling sys.exit() must not take the worker down with it.
+                conn.send(('error', f"{type(e).__name__}: {e}"))
+        completed += len(chunk)
+        rss_mb = current_rss_mb() if max_rss_mb else None
+        recycle = bool((max_tasks and completed >= max_tasks) or
+                       (rss_mb is not None and rss_mb > max_rss_mb))
+        conn.send(('idle', recycle))
+        if recycle:
+            break
+    conn.close()
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.pending = deque()  # Tasks of the current chunk without a result yet
+        self.busy = False       # Between sending a chunk and receiving 'idle'
+        self.deadline = None    # When the task at the head of `pending` times out
+
+class SupervisedPool:
+    """
+    A process pool with hard per-task timeouts and worker recycling.
+    1. A task that runs longer than `task_timeout` seconds gets its worker killed
+       and replaced; `failure_result(task, "timeout")` is yielded in its place and
+       the rest of that worker's chunk is re-queued.
+    2. A worker that dies mid-task yields `failure_result(task, "crashed")`.
+    3. Workers exit and are replaced after `max_tasks_per_worker` tasks, or once
+       their RSS exceeds `max_rss_mb` (where it can be measured, see current_rss_mb).
+    `initializer` runs once in every (re)spawned worker.
+    """
+    def __init__(self, func, processes=None, initializer=None, task_timeout=None,
+                 max_tasks_per_worker=None, max_rss_mb=None, failure_result=None):
+        self.func = func
+        self.processes = processes or os.cpu_count() or 1
+        self.initializer = initializer
+        self.task_timeout = task_timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.failure_result = failure_result or (lambda task, reason: (task, reason))
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                self._kill(worker)
+        self._workers = []
+
+    def imap_unordered(self, tasks, chunksize=1, cost=None):
+        """
+        Yields one result per task, in completion order. Idle workers take the next
+        chunk from one shared queue, so a worker that finishes early picks up work that
+        would otherwise wait behind a slow one. With `cost` (task -> estimated seconds),
+        chunks are sized by cost, not count (guided self-scheduling): each holds about
+        1/(2 x processes) of the queued work, at most `chunksize` tasks. Expensive tasks
+        then travel alone, cheap ones are batched, and chunks shrink towards the end of
+        the queue, where one large chunk would leave the other workers idle.
+        """
+        queue = deque(tasks)
+        queued_cost = sum(cost(task) for task in queue) if cost else 0.0
+        idle = [worker for worker in self._workers if not worker.busy]  # Left over from an earlier call
+        while len(self._workers) < min(self.processes, max(1, len(queue))):
+            idle.append(self._spawn())
+
+        while queue or any(worker.busy for worker in self._workers):
+            # Hand out chunks to idle workers
+            while idle and queue:
+                worker = idle.pop()
+                if cost:
+                    budget = queued_cost / (2 * self.processes)
+                    chunk, chunk_cost = [], 0.0
+                    while queue and len(chunk) < chunksize and (not chunk or chunk_cost + cost(queue[0]) <= budget):
+                        chunk.append(queue.popleft())
+                        chunk_cost += cost(chunk[-1])
+                    queued_cost -= chunk_cost
+                else:
+                    chunk = [queue.popleft() for _ in range(min(chunksize, len(queue)))]
+                worker.pending.extend(chunk)
+                worker.deadline = self._deadline()
+                worker.busy = True
+                worker.conn.send(chunk)
+
+            busy = [worker for worker in self._workers if worker.busy]
+            ready = wait([worker.conn for worker in busy], timeout=self._wait_timeout(busy))
+
+            for worker in busy:
+                if worker.conn not in ready:
+                    continue
+                try:
+                    while worker.conn.poll():
+                        kind, payload = worker.conn.recv()
+                        if kind == 'result':
+                            worker.pending.popleft()
+                            worker.deadline = self._deadline()
+                            yield payload
+                        elif kind == 'error':
+                            yield self.failure_result(worker.pending.popleft(), "error")
+                            worker.deadline = self._deadline()
+                        elif kind == 'idle':
+                            worker.busy = False
+                            if payload:
+                                self.recycled += 1
+                                worker.process.join(timeout=1)
+                                idle.append(self._replace(worker, kill=False))
+                            else:
+                                idle.append(worker)
+                            break
+                except (EOFError, OSError):
+                    # The worker died mid-chunk, e.g. the analyzed program called os._exit().
+                    self.crashes += 1
+                    if worker.pending:
+                        yield self.failure_result(worker.pending.popleft(), "crashed")
+                    queued_cost += sum(cost(task) for task in worker.pending) if cost else 0.0
+                    queue.extendleft(reversed(worker.pending))
+                    idle.append(self._replace(worker, kill=True))
+
+            now = time.monotonic()
+            for worker in list(self._workers):
+                if worker.pending and worker.deadline is not None and now >= worker.deadline:
+                    self.timeouts += 1
+                    yield self.failure_result(worker.pending.popleft(), "timeout")
+                    queued_cost += sum(cost(task) for task in worker.pending) if cost else 0.0
+                    queue.extendleft(reversed(worker.pending))
+                    idle.append(self._replace(worker, kill=True))
+
+    def _deadline(self):
+        return time.monotonic() + self.task_timeout if self.task_timeout else None
+
+    def _wait_timeout(self, busy):
+        deadlines = [worker.deadline for worker in busy if worker.pending and worker.deadline is not None]
+        if not deadlines:
+            return None
+        return max(0, min(deadlines) - time.monotonic())
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, self.func, self.initializer, self.max_tasks_per_worker, self.max_rss_mb),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker, kill):
+        if kill:
+            self._kill(worker)
+        worker.conn.close()
+        worker.pending.clear()
+        self._workers.remove(worker)
+        return self._spawn()
+
+    @staticmethod
+    def _kill(worker):
+        worker.process.terminate()
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
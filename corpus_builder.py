@@ -0,0 +1,156 @@
+import os
+import json
+import shutil
+import site
+import hashlib
+import sysconfig
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = "halting-corpus-manifest/1"
+SKIPPED_DIRS = {"__pycache__", "site-packages", "dist-packages"}
+COPY_WORKERS = 16  # Harvesting is I/O bound, so threads suffice
+
+def local_source_roots():
+    """(label, directory) for the stdlib and every installed site-packages directory."""
+    roots = [("stdlib", Path(sysconfig.get_paths()['stdlib']))]
+    site_dirs = list(site.getsitepackages()) + [site.getusersitepackages(), sysconfig.get_paths()['purelib']]
+    seen = set()
+    for directory in site_dirs:
+        path = Path(directory)
+        if path in seen or not path.is_dir():
+            continue
+        seen.add(path)
+        roots.append(("site-packages", path))
+    return roots
+
+def walk_sources(roots):
+    """Yields (label, root, path) for every .py file under the roots, skipping nested package dirs."""
+    for label, root in roots:
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = sorted(name for name in subdirs if name not in SKIPPED_DIRS)
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    yield label, root, Path(directory) / name
+
+def file_digest(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+def corpus_name(label: str, root: Path, path: Path, digest: str) -> Path:
+    """
+    Destination relative to the corpus directory: grouped by origin and top-level
+    package, with the content hash in the name so distinct files never collide.
+    """
+    relative = path.relative_to(root)
+    group = relative.parts[0] if len(relative.parts) > 1 else "_toplevel"
+    if group.endswith(".py"):
+        group = group[:-3]
+    return Path(label) / group / f"{path.stem}_{digest[:12]}.py"
+
+class CorpusManifest:
+    """
+    Content-hash manifest of a harvested corpus.
+    `files` maps a content digest to {'path': corpus-relative path, 'size': bytes, 'sources': [...]},
+    so a file installed in several places is stored once; `sources` maps each harvested
+    source path to the (mtime_ns, size, digest) it had when last hashed, which lets a
+    refresh skip unchanged files without reading them.
+    """
+    def __init__(self, corpus_dir: Path):
+        self.corpus_dir = Path(corpus_dir)
+        self.path = self.corpus_dir / MANIFEST_NAME
+        self.files = {}
+        self.sources = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get('format') == MANIFEST_FORMAT:
+                self.files = data['files']
+                self.sources = data['sources']
+
+    def save(self):
+        self.corpus_dir.mkdir(parents=True, exist_ok=True)
+        data = {'format': MANIFEST_FORMAT, 'files': self.files, 'sources': self.sources}
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(data, indent=1, sort_keys=True))
+        temporary.replace(self.path)
+
+def _hash_source(entry):
+    """Worker: returns (entry, digest, stat) for a source whose stat changed since the last build."""
+    label, root, path = entry
+    try:
+        stat = path.stat()
+        return entry, file_digest(path), stat
+    except OSError:
+        return entry, None, None
+
+def _copy_file(job):
+    source, destination = job
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(source, destination)
+
+def harvest_local_sources(corpus_dir: Path, roots=None, workers=COPY_WORKERS) -> dict:
+    """
+    Harvests .py files from the stdlib and installed site-packages into `corpus_dir`.
+    Runs offline and incrementally: only sources that are new or whose mtime/size changed
+    are re-hashed, only contents not yet in the manifest are copied, and corpus files
+    whose sources have all disappeared or changed are removed.
+    Returns counts of {'scanned', 'hashed', 'added', 'removed', 'duplicates', 'files'}.
+    """
+    corpus_dir = Path(corpus_dir)
+    manifest = CorpusManifest(corpus_dir)
+    roots = roots or local_source_roots()
+
+    current = {}  # source path -> (label, root, path)
+    stale = []
+    for label, root, path in walk_sources(roots):
+        key = str(path)
+        current[key] = (label, root, path)
+        known = manifest.sources.get(key)
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if known is None or known['mtime_ns'] != stat.st_mtime_ns or known['size'] != stat.st_size:
+            stale.append((label, root, path))
+
+    # Sources that vanished or changed no longer vouch for their old content.
+    for key in [key for key in manifest.sources if key not in current]:
+        del manifest.sources[key]
+    with ThreadPoolExecutor(workers) as executor:
+        hashed = list(executor.map(_hash_source, stale))
+
+    copies = []
+    duplicates = 0
+    for (label, root, path), digest, stat in hashed:
+        if digest is None:
+            continue
+        key = str(path)
+        manifest.sources[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'digest': digest}
+        entry = manifest.files.get(digest)
+        if entry is None:
+            destination = corpus_name(label, root, path, digest)
+            manifest.files[digest] = {'path': destination.as_posix(), 'size': stat.st_size, 'sources': [key]}
+            copies.append((path, corpus_dir / destination))
+        elif key not in entry['sources']:
+            entry['sources'].append(key)
+            duplicates += 1
+
+    # Drop contents no current source has anymore (uninstalled or edited files).
+    live = {source['digest'] for source in manifest.sources.values()}
+    removed = 0
+    for digest in [digest for digest in manifest.files if digest not in live]:
+        (corpus_dir / manifest.files.pop(digest)['path']).unlink(missing_ok=True)
+        removed += 1
+    pending = {destination for _, destination in copies}
+    for digest, entry in manifest.files.items():
+        entry['sources'] = [key for key in entry['sources'] if manifest.sources.get(key, {}).get('digest') == digest]
+        destination = corpus_dir / entry['path']
+        if destination not in pending and not destination.exists():
+            # Deleted from the corpus by hand: restore it from a source.
+            copies.append((Path(entry['sources'][0]), destination))
+
+    with ThreadPoolExecutor(workers) as executor:
+        list(executor.map(_copy_file, copies))
+    manifest.save()
+    return {'scanned': len(current), 'hashed': len(stale), 'added': len(copies),
+            'removed': removed, 'duplicates': duplicates, 'files': len(manifest.files)}
@@ -1,6 +1,7 @@
 import argparse
 import sys
 import os
+import time
 from components.paradox_detection import detect_paradox
 from components.static_analysis import static_preparation
 from components.heuristic_classifier import classify_known_problems
@@ -9,50 +10,158 @@ from components.dynamic_tracing import dynamic_tracing
 from components.decision_synthesis import decision_synthesis
 from components.cross_script_recursion import start_analysis, end_analysis, RecursionCycleDetected
 from components.semantic_hashing import get_semantic_hash
+from components.trace_recording import TraceRecorder
+from components.input_exploration import reads_external_input, explore_inputs as explore_input_space
+from components.profiling import enter_phase, StackSampler, ProfileCollector
+from components.function_summaries import summarize_program, default_cache
+from components.watch import TreeWatcher, VerdictIndex, DEBOUNCE
+from components.git_changes import (GitError, VerdictCache, repo_root, resolve_revision, python_files,
+                                    changed_python_files, is_clean)
+from components.results_journal import analyzer_version
+from components.phase_scheduler import PhaseModel, PhaseScheduler
+from components.artifact_store import SOURCE_PHASES
+from components.solver_service import deadline_kills
+from components.spans import tracer, JsonlExporter, RingBufferExporter, format_span
 
-def analyze_halting(program: str) -> tuple[str, str]:
+# Pipeline phases, in the order analyze_halting runs them.
+PHASES = ("meta", "paradox", "summary", "static", "heuristic", "prover", "dynamic", "synthesis")
+DEBUG_SPANS = 256  # Spans --debug keeps per script
+
+def _timed(phase_times, phase, func, *args, **kwargs):
+    """
+    Runs one phase, adding its wall-clock time to `phase_times` if given, labelling it
+    for the profiler, and tracing it as a 'phase.<name>' span with its result.
+    """
+    previous = enter_phase(phase)
+    start = time.perf_counter()
+    try:
+        if not tracer.enabled:
+            return func(*args, **kwargs)
+        with tracer.span("phase." + phase) as span:
+            result = func(*args, **kwargs)
+            if result is not None:
+                span.set(result=result[0] if isinstance(result, tuple) else result)
+            return result
+    finally:
+        enter_phase(previous)
+        if phase_times is not None:
+            phase_times[phase] = phase_times.get(phase, 0.0) + time.perf_counter() - start
+
+def _derived(facts, phase_times, phase, func, *args):
+    """
+    Like _timed, but for a source-only phase: reads its result from `facts` if present,
+    else stores it there, unless a solver was killed at its deadline meanwhile.
+    """
+    if facts is not None and phase in facts:
+        return _timed(phase_times, phase, facts.__getitem__, phase)
+    kills = deadline_kills()
+    result = _timed(phase_times, phase, func, *args)
+    if facts is not None and deadline_kills() == kills:
+        facts[phase] = result
+    return result
+
+def derive_facts(program: str, facts: dict) -> dict:
+    """Fills in every source-only phase result missing from `facts`, e.g. to precompute an ArtifactStore."""
+    derivations = {"meta": get_semantic_hash, "paradox": detect_paradox, "summary": summarize_program,
+                   "static": static_preparation, "heuristic": classify_known_problems, "prover": prove_termination}
+    for phase in SOURCE_PHASES:
+        if phase not in facts:
+            kills = deadline_kills()
+            result = derivations[phase](program)
+            if deadline_kills() == kills:
+                facts[phase] = result
+    return facts
+
+def analyze_halting(program: str, trace_recorder=None, explore_inputs: bool = False, phase_times=None,
+                    summary_cache=None, scheduler=None, artifacts=None) -> tuple[str, str]:
     """
     Analyze if a program halts using a multi-phase approach.
+    If a TraceRecorder is given, the dynamic tracing phase records its trace into it.
+    With `explore_inputs`, programs that read stdin/argv/env/randomness are traced
+    concurrently over several generated inputs instead of once.
+    If a `phase_times` dict is given, it is filled with {phase: seconds} for every
+    phase that ran, in order; the last entry is the phase that decided the result.
+    Per-function summaries are cached in `summary_cache` (the process-wide cache by
+    default), so re-analysing an edited module only re-summarizes changed functions.
+    A PhaseScheduler skips the phases its model found never decisive for programs like
+    this one (a skipped phase counts as inconclusive) and learns from the outcome.
+    With an ArtifactStore, the results of the phases that only inspect the source are
+    read from it for content analyzed before, and stored there otherwise.
+    Each analysis is traced as an 'analyze' span, with one child span per phase.
     Returns a tuple of (result, reason).
     """
-    program_hash = get_semantic_hash(program)
+    arguments = (program, trace_recorder, explore_inputs, phase_times, summary_cache, scheduler, artifacts)
+    if not tracer.enabled:
+        return _analyze_halting(*arguments)
+    with tracer.span("analyze", bytes=len(program)) as span:
+        result, reason = _analyze_halting(*arguments)
+        span.set(verdict=result, reason=reason)
+        return result, reason
+
+def _analyze_halting(program, trace_recorder, explore_inputs, phase_times, summary_cache, scheduler, artifacts):
+    skipped = set()
+    if scheduler is not None:
+        features, skipped = scheduler.plan(program)
+        if phase_times is None:
+            phase_times = {}
+    facts = artifacts.load(program) if artifacts is not None else None
+    known_facts = len(facts) if facts is not None else 0
+    program_hash = _derived(facts, phase_times, "meta", get_semantic_hash, program)
 
     try:
-        start_analysis(program_hash)
+        _timed(phase_times, "meta", start_analysis, program_hash)
     except RecursionCycleDetected as e:
         reason = f"Meta-analysis: Cross-script recursion detected in cycle: {e}"
-        print(f"Debug: {reason}", file=sys.stderr)
         return "does not halt", reason
 
     try:
-        if detect_paradox(program):
+        if _derived(facts, phase_times, "paradox", detect_paradox, program):
             reason = "Phase 0: Detected a classic self-referential paradox structure."
-            print(f"Debug: {reason}", file=sys.stderr)
             return "impossible to determine", reason
+
+        summary_result, summary_reason = "impossible to determine", "Function summaries: Skipped by the phase scheduler."
+        if "summary" not in skipped:
+            summary_result, summary_reason = _derived(facts, phase_times, "summary", summarize_program, program, summary_cache)
+            if summary_result == "does not halt":
+                return summary_result, summary_reason
         
-        static_result, static_reason = static_preparation(program)
-        print(f"Debug: Static result = {static_result}", file=sys.stderr)
-        if static_result in ["halts", "does not halt"]:
+        static_result, static_reason = "impossible to determine", "Static analysis: Skipped by the phase scheduler."
+        if "static" not in skipped:
+            static_result, static_reason = _derived(facts, phase_times, "static", static_preparation, program)
+            if static_result == "does not halt":
+                return static_result, static_reason
+        # A summary's "halts" only holds if static analysis found no infinite loop.
+        if summary_result == "halts":
+            if phase_times is not None:
+                phase_times["summary"] = phase_times.pop("summary")  # The deciding phase comes last
+            return summary_result, summary_reason
+        if static_result == "halts":
             return static_result, static_reason
         
-        heuristic_result, heuristic_reason = classify_known_problems(program)
-        print(f"Debug: Heuristic result = {heuristic_result}", file=sys.stderr)
-        if heuristic_result == "impossible to determine":
-            return heuristic_result, heuristic_reason
-
-        prover_result, prover_reason = prove_termination(program)
-        print(f"Debug: Prover result = {prover_result}", file=sys.stderr)
-        if prover_result in ["halts", "does not halt"]:
-            return prover_result, prover_reason
+        if "heuristic" not in skipped:
+            heuristic_result, heuristic_reason = _derived(facts, phase_times, "heuristic", classify_known_problems, program)
+            if heuristic_result == "impossible to determine":
+                return heuristic_result, heuristic_reason
+
+        prover_result, prover_reason = "impossible to determine", "Symbolic prover: Skipped by the phase scheduler."
+        if "prover" not in skipped:
+            prover_result, prover_reason = _derived(facts, phase_times, "prover", prove_termination, program)
+            if prover_result in ["halts", "does not halt"]:
+                return prover_result, prover_reason
         
-        dynamic_result, dynamic_reason = dynamic_tracing(program)
-        print(f"Debug: Dynamic result = {dynamic_result}", file=sys.stderr)
-        if dynamic_result in ["halts", "does not halt"]:
-            return dynamic_result, dynamic_reason
+        dynamic_result, dynamic_reason = "impossible to determine", "Dynamic tracing: Skipped by the phase scheduler."
+        if "dynamic" not in skipped:
+            if explore_inputs and reads_external_input(program):
+                dynamic_result, dynamic_reason = _timed(phase_times, "dynamic", explore_input_space, program)
+            else:
+                dynamic_result, dynamic_reason = _timed(phase_times, "dynamic", dynamic_tracing, program,
+                                                        recorder=trace_recorder)
+            if dynamic_result in ["halts", "does not halt"]:
+                return dynamic_result, dynamic_reason
         
         # Phase 4: Decision Synthesis (as a fallback)
-        final_result = decision_synthesis(static_result, prover_result, dynamic_result, program)
-        print(f"Debug: Final result = {final_result}", file=sys.stderr)
+        final_result = _timed(phase_times, "synthesis", decision_synthesis,
+                              static_result, prover_result, dynamic_result, program)
         
         if final_result == "does not halt":
             reason = "Phase 4: Synthesis fallback detected a call to the analyzer."
@@ -63,10 +172,115 @@ def analyze_halting(program: str) -> tuple[str, str]:
         
     except Exception as e:
         reason = f"An unexpected error occurred in the analysis pipeline: {str(e)}"
-        print(f"Debug: Exception = {str(e)}", file=sys.stderr)
+        tracer.current().set(error=str(e))
         return "impossible to determine", reason
     finally:
         end_analysis(program_hash)
+        if facts is not None and len(facts) > known_facts:
+            artifacts.save(program, facts)
+        if scheduler is not None:
+            scheduler.observe(features, phase_times)
+
+def watch_directory(scripts_dir, explore_inputs=False, debounce=DEBOUNCE, scheduler=None):
+    """
+    Analyzes every script under `scripts_dir` once, then keeps the verdicts live until
+    interrupted: each batch of saved files is re-analyzed and the new verdicts printed.
+    Files whose semantic hash did not change are not re-analyzed.
+    """
+    index = VerdictIndex(lambda program: analyze_halting(program, explore_inputs=explore_inputs, scheduler=scheduler))
+    watcher = TreeWatcher(scripts_dir, debounce=debounce)
+
+    def report(path, status, previous, entry):
+        name = os.path.relpath(path, scripts_dir)
+        stamp = time.strftime("%H:%M:%S")
+        if status == "removed":
+            if previous is not None:
+                print(f"[{stamp}] {name}: removed", flush=True)
+        elif status == "unchanged":
+            print(f"[{stamp}] {name}: no semantic change, still '{entry['result']}'", flush=True)
+        else:
+            change = f" (was '{previous['result']}')" if previous and previous['result'] != entry['result'] else ""
+            print(f"[{stamp}] {name}: {entry['result']}{change} - {entry['reason']}", flush=True)
+
+    print(f"--- Watching '{scripts_dir}' for changes (Ctrl+C to stop) ---")
+    for path in sorted(watcher.snapshot):
+        report(path, *index.update(path))
+    try:
+        while True:
+            for path in watcher.wait_for_changes():
+                report(path, *index.update(path))
+    except KeyboardInterrupt:
+        print("\n--- Stopped watching ---")
+
+def print_debug_spans(debug_spans):
+    """Prints and empties the spans buffered since the last call, one per line (children before their parents)."""
+    if debug_spans is not None:
+        for record in debug_spans.drain():
+            print(f"Debug: {format_span(record)}", file=sys.stderr)
+
+def analyze_changed_files(scripts_dir, since=None, cache_path=None, explore_inputs=False, debug_spans=None):
+    """
+    Git-aware mode: analyzes only the .py files under `scripts_dir` changed since the
+    revision `since` (every file if `since` is None). Verdicts for the other files are
+    reused from the cache at `cache_path` when it was written for `since` by this
+    analyzer version. If every file then has a verdict and the tree is clean, the cache
+    is rewritten for HEAD, so the next run can diff against it.
+    With `debug_spans` (a RingBufferExporter), each file's spans are printed after it.
+    """
+    root = repo_root(scripts_dir)
+    version = analyzer_version()
+    cache = VerdictCache(cache_path) if cache_path else None
+    current = python_files(root, scripts_dir)
+    if since is None:
+        to_analyze, cached = current, {}
+        print(f"--- Analyzing all {len(current)} .py files under '{scripts_dir}' ---")
+    else:
+        base = resolve_revision(root, since)
+        to_analyze = changed_python_files(root, base, scripts_dir)
+        cached = cache.verdicts_for(base, version) if cache else {}
+        print(f"--- {len(to_analyze)} of {len(current)} .py files under '{scripts_dir}' changed since {since} ({base[:12]}) ---")
+        if cache and not cached:
+            print(f"No cached verdicts for {base[:12]} from this analyzer version in {cache_path}; unchanged files are not reported.")
+
+    changed = set(to_analyze)
+    verdicts = {}
+    for path in current:
+        key = path.relative_to(root).as_posix()
+        if path not in changed and key in cached:
+            verdicts[key] = cached[key]
+    reused = len(verdicts)
+
+    for path in to_analyze:
+        key = path.relative_to(root).as_posix()
+        print(f"\n[Analyzing]: {key}")
+        print("-" * (12 + len(key)))
+        try:
+            result, reason = analyze_halting(path.read_text(encoding='utf-8', errors='ignore'),
+                                             explore_inputs=explore_inputs)
+        except Exception as e:
+            print(f"Error analyzing {key}: {e}", file=sys.stderr)
+            continue
+        verdicts[key] = [result, reason]
+        print(f"Result: {result}")
+        print(f"Reason: {reason}")
+        print_debug_spans(debug_spans)
+
+    counts = {}
+    for result, _ in verdicts.values():
+        counts[result] = counts.get(result, 0) + 1
+    print(f"\n--- {len(verdicts) - reused} analyzed, {reused} reused from the cache: "
+          + ", ".join(f"{count} {result}" for result, count in sorted(counts.items())) + " ---")
+
+    if cache is None:
+        return
+    if len(verdicts) < len(current):
+        print(f"Cache not updated: {len(current) - len(verdicts)} files have no verdict.")
+    elif not is_clean(root, scripts_dir):
+        print("Cache not updated: the working tree has uncommitted .py changes.")
+    else:
+        head = resolve_revision(root, "HEAD")
+        cache.save(head, version, verdicts)
+        print(f"Cache written for {head[:12]} to {cache_path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -79,8 +293,92 @@ if __name__ == "__main__":
         default=None,
         help="Path to a specific directory of scripts to analyze.\nIf not provided, defaults to the project's 'scripts' directory."
     )
+    parser.add_argument(
+        '--record-traces',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help="Write a compact binary trace of each dynamically traced script into DIR.\nInspect them offline with replay_trace.py."
+    )
+    parser.add_argument(
+        '--explore-inputs',
+        action='store_true',
+        help="Trace scripts that read stdin, argv, environment variables or randomness\nconcurrently over several generated inputs."
+    )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        metavar='DIR',
+        help="Sample each script's analysis and write collapsed stacks (per script and\naggregated, rooted at the pipeline phase) plus a summary into DIR."
+    )
+    parser.add_argument(
+        '--profile-top',
+        type=int,
+        default=None,
+        metavar='N',
+        help="With --profile, keep only the N slowest scripts."
+    )
+    parser.add_argument(
+        '--summary-cache',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help="Load per-function summaries from FILE and save them back afterwards, so a\nre-run only re-summarizes functions that changed."
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help="Analyze the target tree, then keep running and re-analyze files as they change,\nprinting each updated verdict."
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=DEBOUNCE,
+        metavar='SECONDS',
+        help=f"With --watch, wait until the tree has been quiet this long before re-analyzing\n(default: {DEBOUNCE})."
+    )
+    parser.add_argument(
+        '--since',
+        type=str,
+        default=None,
+        metavar='REV',
+        help="Only analyze .py files (recursively, tracked or untracked) that changed in the\ngit work tree since REV."
+    )
+    parser.add_argument(
+        '--verdict-cache',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help="Reuse verdicts for files unchanged since --since REV from FILE, and rewrite FILE\nfor HEAD afterwards. Without --since, analyzes every file to build the cache."
+    )
+    parser.add_argument(
+        '--adaptive',
+        type=str,
+        default=None,
+        metavar='MODEL',
+        help="Skip the phases that the phase model in MODEL found never decisive for scripts\nlike each one, and update MODEL with every analysis. Not used with --since, whose\ncached verdicts must come from the full pipeline."
+    )
+    parser.add_argument(
+        '--trace',
+        type=str,
+        default=None,
+        metavar='FILE',
+        help="Append a JSON line per span to FILE: one 'analyze' span per script with a child\nspan per phase, carrying its duration and result."
+    )
+    parser.add_argument(
+        '--debug',
+        action='store_true',
+        help="Print each script's analysis and phase spans to stderr after its verdict."
+    )
     args = parser.parse_args()
 
+    debug_spans = RingBufferExporter(DEBUG_SPANS) if args.debug else None
+    tracer.configure(([JsonlExporter(args.trace)] if args.trace else []) + ([debug_spans] if debug_spans else []))
+
+    if args.record_traces:
+        os.makedirs(args.record_traces, exist_ok=True)
+
     # Determine which directory to analyze
     if args.target:
         scripts_dir = args.target
@@ -91,6 +389,29 @@ if __name__ == "__main__":
         # Default behavior
         scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts')
 
+    profiler = ProfileCollector(args.profile, args.profile_top) if args.profile else None
+    if args.summary_cache:
+        default_cache().load(args.summary_cache)
+    scheduler = PhaseScheduler(PhaseModel.load(args.adaptive), learn=True) if args.adaptive else None
+
+    if args.since or args.verdict_cache:
+        try:
+            analyze_changed_files(scripts_dir, args.since, args.verdict_cache, args.explore_inputs, debug_spans)
+        except GitError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if args.summary_cache:
+            default_cache().save(args.summary_cache)
+        sys.exit(0)
+
+    if args.watch:
+        watch_directory(scripts_dir, args.explore_inputs, args.debounce, scheduler)
+        if args.summary_cache:
+            default_cache().save(args.summary_cache)
+        if scheduler:
+            scheduler.model.save(args.adaptive)
+        sys.exit(0)
+
     print(f"--- Running Halting Analysis on all scripts in '{scripts_dir}' ---")
 
     for script_name in sorted(os.listdir(scripts_dir)):
@@ -103,12 +424,31 @@ if __name__ == "__main__":
                 with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
                     program_code = f.read()
                 
-                result, reason = analyze_halting(program_code)
+                trace_recorder = None
+                if args.record_traces:
+                    trace_recorder = TraceRecorder(os.path.join(args.record_traces, script_name[:-3] + '.trace'))
+                if profiler:
+                    phase_times = {}
+                    with StackSampler() as sampler:
+                        result, reason = analyze_halting(program_code, trace_recorder, args.explore_inputs, phase_times,
+                                                         scheduler=scheduler)
+                    profiler.add(script_name, sum(phase_times.values()), sampler.stacks)
+                else:
+                    result, reason = analyze_halting(program_code, trace_recorder, args.explore_inputs,
+                                                     scheduler=scheduler)
                 print(f"Result: {result}")
                 print(f"Reason: {reason}")
                 print("-" * (12 + len(script_name)))
+                print_debug_spans(debug_spans)
 
             except Exception as e:
                 print(f"Error analyzing {script_name}: {e}", file=sys.stderr)
     
+    if profiler:
+        print(f"\nProfile written to {profiler.write()}")
+    if args.summary_cache:
+        default_cache().save(args.summary_cache)
+    if scheduler:
+        scheduler.model.save(args.adaptive)
+
     print("\n--- Analysis Complete ---")
\ No newline at end of file
@@ -0,0 +1,240 @@
+import gc
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import platform
+import argparse
+import contextlib
+import statistics
+import sysconfig
+from pathlib import Path
+
+from components.semantic_hashing import get_semantic_hash
+from components.paradox_detection import detect_paradox
+from components.function_summaries import summarize_program, SummaryCache
+from components.static_analysis import static_preparation
+from components.heuristic_classifier import classify_known_problems
+from components.symbolic_prover import prove_termination
+from components.dynamic_tracing import dynamic_tracing
+from components.decision_synthesis import decision_synthesis
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SCRIPTS_DIR = PROJECT_ROOT / "scripts"
+STDLIB_DIR = Path(sysconfig.get_paths()['stdlib'])
+BASELINE_PATH = PROJECT_ROOT / "baselines" / "microbench.json"
+BASELINE_FORMAT = "halting-microbench/1"
+
+WARMUP = 2
+REPEATS = 15
+MIN_SAMPLE_SECONDS = 0.01  # Each sample loops a case until it takes at least this long
+SIGNIFICANCE = 0.01        # Two-sided p-value below which a difference counts
+MIN_EFFECT = 0.10          # Relative median change below which a difference is ignored
+
+# --- Fixtures ---
+# Representative inputs: small adversarial scripts plus medium-sized stdlib modules.
+FIXTURES = {
+    'ackermann': SCRIPTS_DIR / "ackermann.py",
+    'bounded_loop': SCRIPTS_DIR / "bounded_loop.py",
+    'collatz_conjecture': SCRIPTS_DIR / "collatz_conjecture.py",
+    'complex_non_halting': SCRIPTS_DIR / "complex_non_halting.py",
+    'non_halting': SCRIPTS_DIR / "non_halting.py",
+    'paradox': SCRIPTS_DIR / "paradox.py",
+    'truly_obfuscated_paradox': SCRIPTS_DIR / "truly_obfuscated_paradox.py",
+    'stdlib_heapq': STDLIB_DIR / "heapq.py",
+    'stdlib_textwrap': STDLIB_DIR / "textwrap.py",
+    'stdlib_fractions': STDLIB_DIR / "fractions.py",
+}
+# Fixtures that are safe to execute: no file writes, no analyzer self-calls.
+EXECUTABLE_FIXTURES = ['ackermann', 'bounded_loop', 'collatz_conjecture', 'complex_non_halting',
+                       'non_halting', 'stdlib_heapq', 'stdlib_textwrap']
+
+def _summaries(program):
+    # A fresh cache each call: this times summarizing, not cache lookups.
+    return summarize_program(program, SummaryCache())
+
+def _synthesis(program):
+    return decision_synthesis("impossible to determine", "impossible to determine", "impossible to determine", program)
+
+BENCHMARKS = {
+    'get_semantic_hash': (get_semantic_hash, list(FIXTURES)),
+    'detect_paradox': (detect_paradox, list(FIXTURES)),
+    'summarize_program': (_summaries, list(FIXTURES)),
+    'static_preparation': (static_preparation, list(FIXTURES)),
+    'classify_known_problems': (classify_known_problems, list(FIXTURES)),
+    'prove_termination': (prove_termination, list(FIXTURES)),
+    'dynamic_tracing': (dynamic_tracing, EXECUTABLE_FIXTURES),
+    'decision_synthesis': (_synthesis, list(FIXTURES)),
+}
+
+# --- Timing ---
+
+def calibrate(func, program):
+    """Number of calls per sample so that one sample takes at least MIN_SAMPLE_SECONDS."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(program)
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS or number >= 1 << 16:
+            return number
+        number *= 4
+
+def time_sample(func, program, number):
+    """Per-call seconds over `number` calls, with the cyclic GC paused as timeit does."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(program)
+        return (time.perf_counter() - start) / number
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def run_suite(selected=None, warmup=WARMUP, repeats=REPEATS, verbose=True) -> dict:
+    """
+    Times every (benchmark, fixture) case. Returns {case: {'fixture_hash', 'samples'}}.
+    Samples are taken round-robin across cases, so slow drift in machine load spreads
+    over all cases instead of biasing whichever case happened to run during it.
+    """
+    programs = {name: path.read_text(encoding='utf-8', errors='ignore')
+                for name, path in FIXTURES.items() if path.exists()}
+    cases = []
+    for benchmark, (func, fixtures) in BENCHMARKS.items():
+        if selected and benchmark not in selected:
+            continue
+        for fixture in fixtures:
+            if fixture in programs:
+                cases.append((f"{benchmark}/{fixture}", func, programs[fixture]))
+
+    results = {}
+    # Fixtures print and the analyzer writes debug output; keep both out of the report.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        numbers = {}
+        for case, func, program in cases:
+            for _ in range(warmup):
+                func(program)
+            numbers[case] = calibrate(func, program)
+            results[case] = {
+                'fixture_hash': hashlib.blake2b(program.encode('utf-8'), digest_size=8).hexdigest(),
+                'samples': [],
+            }
+        for _ in range(repeats):
+            for case, func, program in cases:
+                results[case]['samples'].append(time_sample(func, program, numbers[case]))
+
+    if verbose:
+        for case, result in results.items():
+            print(f"{case:<50} median {format_seconds(statistics.median(result['samples']))}")
+    return results
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+# --- Baselines ---
+
+def environment():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'processor': platform.processor() or platform.machine()}
+
+def save_baseline(results, path=BASELINE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'format': BASELINE_FORMAT, 'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'environment': environment(), 'cases': results}
+    path.write_text(json.dumps(data, indent=1, sort_keys=True))
+
+def load_baseline(path=BASELINE_PATH) -> dict:
+    data = json.loads(Path(path).read_text())
+    if data.get('format') != BASELINE_FORMAT:
+        raise ValueError(f"{path}: not a microbenchmark baseline.")
+    return data
+
+# --- Comparison ---
+
+def mann_whitney_p(before, after):
+    """
+    Two-sided p-value of the Mann-Whitney U test (normal approximation with tie
+    correction). Rank-based, so a few outlier samples cannot fake a regression.
+    """
+    combined = sorted([(value, 0) for value in before] + [(value, 1) for value in after])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    index = 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        for position in range(index, end + 1):
+            ranks[position] = (index + end) / 2 + 1
+        ties = end - index + 1
+        tie_term += ties ** 3 - ties
+        index = end + 1
+    n1, n2 = len(before), len(after)
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return math.erfc(max(z, 0) / math.sqrt(2))
+
+def compare(baseline: dict, results: dict, significance=SIGNIFICANCE, min_effect=MIN_EFFECT) -> bool:
+    """Prints every case's change against the baseline. Returns True if any case slowed down significantly."""
+    if baseline['environment'] != environment():
+        print(f"Warning: baseline was recorded on {baseline['environment']}, this machine is {environment()}.")
+    regressed = False
+    print(f"\n{'Case':<50} {'Baseline':>11} {'Current':>11} {'Change':>8}  p-value")
+    for case, current in results.items():
+        recorded = baseline['cases'].get(case)
+        if recorded is None:
+            print(f"{case:<50} {'(new)':>11} {format_seconds(statistics.median(current['samples']))}")
+            continue
+        if recorded['fixture_hash'] != current['fixture_hash']:
+            print(f"{case:<50} skipped: fixture changed since the baseline")
+            continue
+        before, after = statistics.median(recorded['samples']), statistics.median(current['samples'])
+        change = (after - before) / before if before else 0.0
+        p_value = mann_whitney_p(recorded['samples'], current['samples'])
+        verdict = ""
+        if p_value < significance and abs(change) >= min_effect:
+            verdict = "SLOWER" if change > 0 else "faster"
+            regressed = regressed or change > 0
+        print(f"{case:<50} {format_seconds(before)} {format_seconds(after)} {change:+7.1%}  {p_value:.4f} {verdict}")
+    return regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the individual analysis phases.")
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), help="Only run these benchmarks.")
+    parser.add_argument('--warmup', type=int, default=WARMUP, help=f"Untimed calls per case (default: {WARMUP}).")
+    parser.add_argument('--repeats', type=int, default=REPEATS, help=f"Timed samples per case (default: {REPEATS}).")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help=f"Baseline file (default: {BASELINE_PATH.relative_to(PROJECT_ROOT)}).")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--save', action='store_true', help="Store the results as the new baseline.")
+    mode.add_argument('--compare', action='store_true', help="Compare against the baseline; exit 1 on a significant slowdown.")
+    parser.add_argument('--significance', type=float, default=SIGNIFICANCE, help=f"p-value threshold (default: {SIGNIFICANCE}).")
+    parser.add_argument('--min-effect', type=float, default=MIN_EFFECT, help=f"Minimum relative change reported (default: {MIN_EFFECT}).")
+    args = parser.parse_args()
+
+    results = run_suite(args.benchmarks, args.warmup, args.repeats)
+    if args.save:
+        if args.benchmarks and args.baseline.exists():
+            # Keep the cases that were not re-run.
+            merged = load_baseline(args.baseline)['cases']
+            merged.update(results)
+            results = merged
+        save_baseline(results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif args.compare:
+        if compare(load_baseline(args.baseline), results, args.significance, args.min_effect):
+            sys.exit(1)
@@ -0,0 +1,61 @@
+import argparse
+import sys
+from collections import Counter
+from components.trace_recording import TraceReader, replay_cycle_detection, replay_divergence_detection
+
+def inspect_trace(path: str, run_index: int = -1, window=None, top_lines: int = 5):
+    """Prints a recorded trace's verdict and re-runs cycle and divergence detection on it."""
+    with TraceReader(path) as reader:
+        print(f"\n[Trace]: {path}")
+        print("-" * (9 + len(path)))
+        if reader.verdict:
+            print(f"Recorded result: {reader.verdict['result']}")
+            print(f"Recorded reason: {reader.verdict['reason']}")
+        print(f"Runs: {len(reader.runs)} ({', '.join(str(len(run)) for run in reader.runs)} line events)")
+        if not reader.runs:
+            return
+
+        run = reader.runs[run_index]
+        print(f"Replaying run {run_index % len(reader.runs)} (trace budget {run.trace_budget}, depth budget {run.depth_budget}):")
+
+        cycle = replay_cycle_detection(run)
+        if cycle:
+            print(f"  Cycle: state repeated at event {cycle[0]} (line {cycle[1]})")
+        else:
+            print("  Cycle: none")
+
+        divergence = replay_divergence_detection(run, reader.guards, window)
+        if divergence:
+            event_index, guard = divergence
+            print(f"  Divergence: variable '{guard.variable}' on line {guard.lineno} at event {event_index}")
+        else:
+            print("  Divergence: none")
+
+        hottest = Counter(run.lines()).most_common(top_lines)
+        print("  Hottest lines: " + ", ".join(f"{line} ({count}x)" for line, count in hottest))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Inspect traces recorded by 'main.py --record-traces' without re-executing the programs.",
+        formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('traces', nargs='+', help="Trace files to inspect.")
+    parser.add_argument(
+        '--run',
+        type=int,
+        default=-1,
+        help="Which traced run to replay when budgets were escalated.\nDefaults to the last (deciding) run."
+    )
+    parser.add_argument(
+        '--window',
+        type=int,
+        default=None,
+        help="Consecutive diverging iterations required to report divergence.\nDefaults to the tracer's own window."
+    )
+    args = parser.parse_args()
+
+    for trace_path in args.traces:
+        try:
+            inspect_trace(trace_path, args.run, args.window)
+        except Exception as e:
+            print(f"Error reading {trace_path}: {e}", file=sys.stderr)
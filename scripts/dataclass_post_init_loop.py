@@ -0,0 +1,12 @@
+# Non-halting: the generated __init__ of a dataclass calls __post_init__
+from dataclasses import dataclass
+
+@dataclass
+class Point:
+    x: int = 0
+
+    def __post_init__(self):
+        while True:
+            pass
+
+Point()
@@ -0,0 +1,7 @@
+# Non-halting: calling the class runs __new__ before any __init__
+class Spinner:
+    def __new__(cls):
+        while True:
+            pass
+
+Spinner()
@@ -0,0 +1,24 @@
+# Non-halting: print, `with`, indexing and calling an instance all run dunders;
+# __str__ never returns, so the others are never reached
+class Resource:
+    def __str__(self):
+        while True:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getitem__(self, key):
+        return key
+
+    def __call__(self):
+        return None
+
+resource = Resource()
+print(resource)
+with resource:
+    resource[0]
+    resource()
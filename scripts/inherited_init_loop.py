@@ -0,0 +1,10 @@
+# Non-halting: the loop is in an __init__ the subclass inherits
+class Base:
+    def __init__(self):
+        while True:
+            pass
+
+class Child(Base):
+    pass
+
+Child()
@@ -0,0 +1,8 @@
+# Non-halting: defining a subclass runs the base's __init_subclass__; nothing is ever called
+class Registry:
+    def __init_subclass__(cls):
+        while True:
+            pass
+
+class Plugin(Registry):
+    pass
@@ -0,0 +1,10 @@
+# Non-halting: calling the class goes through its metaclass's __call__
+class Meta(type):
+    def __call__(cls, *args):
+        while True:
+            pass
+
+class Widget(metaclass=Meta):
+    pass
+
+Widget()
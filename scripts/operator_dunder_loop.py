@@ -0,0 +1,7 @@
+# Non-halting: `+` on instances runs __add__
+class Vector:
+    def __add__(self, other):
+        while True:
+            pass
+
+Vector() + Vector()
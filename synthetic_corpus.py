@@ -0,0 +1,325 @@
+import json
+import base64
+import random
+import argparse
+from pathlib import Path
+
+# Bounded loop shapes used in halting code, and the defects that make a program non-halting.
+LOOP_SHAPES = ("for_range", "for_list", "while_counter", "while_decrement", "while_break")
+RECURSION_PATTERNS = ("none", "bounded", "mutual")
+NON_HALTING_DEFECTS = ("while_true", "unbounded_counter", "missed_zero", "stuck_counter",
+                       "unbounded_recursion", "mutual_recursion")
+MAX_OBFUSCATION = 3
+LABELS_NAME = "generated_labels.json"
+
+class ProgramSpec:
+    """
+    Parameters of one generated program.
+    `target_lines` is approximate: functions are filled with statements until the
+    module reaches it. `defect` is only used for non-halting programs (None picks
+    one from the seed). Obfuscation levels: 0 readable names, 1 opaque names,
+    2 opaque constants and dead branches, 3 the whole module base64-encoded and exec'd.
+    """
+    def __init__(self, halts=True, target_lines=50, function_count=4, nesting_depth=2,
+                 loop_shapes=LOOP_SHAPES, recursion="bounded", obfuscation=0, defect=None, seed=0):
+        self.halts = halts
+        self.target_lines = target_lines
+        self.function_count = max(1, function_count)
+        self.nesting_depth = max(0, nesting_depth)
+        self.loop_shapes = tuple(loop_shapes)
+        self.recursion = recursion
+        self.obfuscation = min(MAX_OBFUSCATION, max(0, obfuscation))
+        self.defect = defect
+        self.seed = seed
+
+    def to_dict(self):
+        return {'halts': self.halts, 'target_lines': self.target_lines, 'function_count': self.function_count,
+                'nesting_depth': self.nesting_depth, 'loop_shapes': list(self.loop_shapes),
+                'recursion': self.recursion, 'obfuscation': self.obfuscation,
+                'defect': self.defect, 'seed': self.seed}
+
+class _Names:
+    """Fresh identifiers: readable at obfuscation level 0, look-alike `_lI1l` names above it."""
+    def __init__(self, rng, opaque):
+        self.rng = rng
+        self.opaque = opaque
+        self.used = set()
+        self.counters = {}
+
+    def fresh(self, hint):
+        while True:
+            if self.opaque:
+                name = "_" + "".join(self.rng.choice("lI1") for _ in range(12))
+            else:
+                self.counters[hint] = self.counters.get(hint, 0) + 1
+                name = f"{hint}_{self.counters[hint]}"
+            if name not in self.used:
+                self.used.add(name)
+                return name
+
+class ProgramGenerator:
+    """Generates a program for a ProgramSpec. Every function body runs exactly once, so runtime grows linearly with size."""
+    def __init__(self, spec: ProgramSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.names = _Names(self.rng, spec.obfuscation >= 1)
+        self.lines = []
+
+    def generate(self):
+        """Returns (source, label) where label records the ground truth and the spec."""
+        spec = self.spec
+        defect = None
+        if not spec.halts:
+            defect = spec.defect or self.rng.choice(NON_HALTING_DEFECTS)
+
+        lines_per_function = max(4, spec.target_lines // spec.function_count)
+        functions = []
+        uncalled = []  # Functions no other function calls yet; each function gets at most one caller
+        for _ in range(spec.function_count):
+            name = self.names.fresh("compute")
+            callee = uncalled.pop(self.rng.randrange(len(uncalled))) if uncalled and self.rng.random() < 0.5 else None
+            self._emit_function(name, lines_per_function, callee)
+            functions.append(name)
+            uncalled.append(name)
+
+        roots = list(uncalled)
+        recursion_calls = self._emit_recursion(spec.recursion)
+        defect_call = self._emit_defect(defect) if defect else None
+
+        main = self.names.fresh("main")
+        result = self.names.fresh("result")
+        self._line(0, f"def {main}():")
+        self._line(1, f"{result} = 0")
+        for name in roots:
+            self._line(1, f"{result} = ({result} + {name}({self._int(self.rng.randint(0, 9))}, {self._int(1)})) % {self._int(1000003)}")
+        for call in recursion_calls:
+            self._line(1, f"{result} = ({result} + {call}) % {self._int(1000003)}")
+        if defect_call:
+            self._line(1, defect_call)
+        self._line(1, f"return {result}")
+        self._line(0, "")
+        self._line(0, f"{main}()")
+
+        source = "\n".join(self.lines) + "\n"
+        if spec.obfuscation >= 3:
+            encoded = base64.b64encode(source.encode('utf-8')).decode('ascii')
+            source = f"import base64\nexec(base64.b64decode('{encoded}').decode('utf-8'))\n"
+        label = {
+            'label': "halts" if spec.halts else "does not halt",
+            'defect': defect,
+            'lines': source.count("\n"),
+            'bytes': len(source.encode('utf-8')),
+            'spec': spec.to_dict(),
+        }
+        return source, label
+
+    # --- Emission helpers ---
+
+    def _line(self, indent, text):
+        self.lines.append("    " * indent + text if text else "")
+
+    def _int(self, value):
+        """An integer literal; an arithmetic expression with the same value from obfuscation level 2."""
+        if self.spec.obfuscation < 2:
+            return str(value)
+        mask = self.rng.randint(1, 255)
+        shape = self.rng.randrange(3)
+        if shape == 0:
+            return f"({value + mask} - {mask})"
+        if shape == 1:
+            return f"({value ^ mask} ^ {mask})"
+        return f"({value * mask} // {mask})"
+
+    def _dead_branch(self, indent, variable):
+        """An `if` whose condition is always false (49 % 4 == 1), from obfuscation level 2."""
+        if self.spec.obfuscation >= 2 and self.rng.random() < 0.2:
+            self._line(indent, f"if ({self._int(7)} * {self._int(7)}) % 4 == 2:")
+            self._line(indent + 1, f"{variable} = {variable} * {self._int(3)}")
+
+    # --- Halting code ---
+
+    def _emit_function(self, name, line_budget, callee):
+        total = self.names.fresh("total")
+        arg = self.names.fresh("value")
+        step = self.names.fresh("step")
+        start = len(self.lines)
+        self._line(0, f"def {name}({arg}, {step}):")
+        self._line(1, f"{total} = {arg}")
+        if callee:
+            self._line(1, f"{total} = ({total} + {callee}({total} % {self._int(7)}, {step})) % {self._int(1000003)}")
+        while len(self.lines) - start < line_budget - 1:
+            self._emit_statement(1, total, [arg, step], depth=0)
+        self._line(1, f"return {total}")
+        self._line(0, "")
+
+    def _emit_statement(self, indent, total, readable, depth):
+        self._dead_branch(indent, total)
+        kind = self.rng.random()
+        operand = self.rng.choice(readable)
+        if depth < self.spec.nesting_depth and self.spec.loop_shapes and kind < 0.35:
+            self._emit_loop(indent, total, readable, depth)
+        elif kind < 0.6:
+            self._line(indent, f"if {total} % {self._int(2)} == 0:")
+            self._line(indent + 1, f"{total} = ({total} + {operand}) % {self._int(1000003)}")
+            self._line(indent, "else:")
+            self._line(indent + 1, f"{total} = ({total} * {self._int(3)} + {self._int(1)}) % {self._int(1000003)}")
+        else:
+            self._line(indent, f"{total} = ({total} * {self._int(self.rng.randint(2, 9))} + {operand}) % {self._int(1000003)}")
+
+    def _emit_loop(self, indent, total, readable, depth):
+        """A loop with 2-3 iterations, so nesting multiplies runtime by at most 3 per level."""
+        shape = self.rng.choice(self.spec.loop_shapes)
+        counter = self.names.fresh("i")
+        trips = self.rng.randint(2, 3)
+        body_statements = self.rng.randint(1, 2)
+        inner = readable + [counter]
+        if shape == "for_range":
+            self._line(indent, f"for {counter} in range({self._int(trips)}):")
+        elif shape == "for_list":
+            self._line(indent, f"for {counter} in [{', '.join(self._int(self.rng.randint(0, 9)) for _ in range(trips))}]:")
+        elif shape == "while_counter":
+            self._line(indent, f"{counter} = 0")
+            self._line(indent, f"while {counter} < {self._int(trips)}:")
+        elif shape == "while_decrement":
+            self._line(indent, f"{counter} = {self._int(trips)}")
+            self._line(indent, f"while {counter} > 0:")
+        else:  # while_break
+            self._line(indent, f"{counter} = 0")
+            self._line(indent, "while True:")
+            self._line(indent + 1, f"if {counter} >= {self._int(trips)}:")
+            self._line(indent + 2, "break")
+        for _ in range(body_statements):
+            self._emit_statement(indent + 1, total, inner, depth + 1)
+        if shape in ("while_counter", "while_break"):
+            self._line(indent + 1, f"{counter} += 1")
+        elif shape == "while_decrement":
+            self._line(indent + 1, f"{counter} -= 1")
+
+    def _emit_recursion(self, pattern):
+        """Bounded recursion; returns the call expressions main should evaluate."""
+        if pattern == "bounded":
+            name = self.names.fresh("depth")
+            n = self.names.fresh("n")
+            self._line(0, f"def {name}({n}):")
+            self._line(1, f"if {n} <= 0:")
+            self._line(2, "return 0")
+            self._line(1, f"return {name}({n} - 1) + 1")
+            self._line(0, "")
+            return [f"{name}({self._int(self.rng.randint(5, 30))})"]
+        if pattern == "mutual":
+            even, odd = self.names.fresh("is_even"), self.names.fresh("is_odd")
+            n = self.names.fresh("n")
+            self._line(0, f"def {even}({n}):")
+            self._line(1, f"return 1 if {n} == 0 else {odd}({n} - 1)")
+            self._line(0, f"def {odd}({n}):")
+            self._line(1, f"return 0 if {n} == 0 else {even}({n} - 1)")
+            self._line(0, "")
+            return [f"{even}({self._int(self.rng.randint(5, 30))})"]
+        return []
+
+    # --- Non-halting defects ---
+
+    def _emit_defect(self, defect):
+        """Emits a function that never returns; returns the statement that calls it."""
+        name = self.names.fresh("run")
+        x = self.names.fresh("x")
+        if defect == "unbounded_recursion":
+            self._line(0, f"def {name}({x}):")
+            self._line(1, f"return {name}({x} + 1)")
+            self._line(0, "")
+            return f"{name}(0)"
+        if defect == "mutual_recursion":
+            other = self.names.fresh("run")
+            self._line(0, f"def {name}({x}):")
+            self._line(1, f"return {other}({x} + 1)")
+            self._line(0, f"def {other}({x}):")
+            self._line(1, f"return {name}({x} - 1)")
+            self._line(0, "")
+            return f"{name}(0)"
+
+        self._line(0, f"def {name}():")
+        if defect == "while_true":
+            self._line(1, f"{x} = 0")
+            self._line(1, "while True:")
+            self._line(2, f"{x} = ({x} + 1) % {self._int(7)}")
+        elif defect == "unbounded_counter":
+            self._line(1, f"{x} = 0")
+            self._line(1, f"while {x} >= 0:")
+            self._line(2, f"{x} += 1")
+        elif defect == "missed_zero":
+            # Steps over zero: 7, 5, 3, 1, -1, ...
+            self._line(1, f"{x} = {self._int(7)}")
+            self._line(1, f"while {x} != 0:")
+            self._line(2, f"{x} -= 2")
+        elif defect == "stuck_counter":
+            # The loop body never updates its own counter.
+            y = self.names.fresh("y")
+            self._line(1, f"{x} = 0")
+            self._line(1, f"while {x} < {self._int(10)}:")
+            self._line(2, f"{y} = {x} + 1")
+        else:
+            raise ValueError(f"Unknown non-halting defect: {defect}")
+        self._line(0, "")
+        return f"{name}()"
+
+def generate_program(spec: ProgramSpec):
+    """Returns (source, label) for one generated program."""
+    return ProgramGenerator(spec).generate()
+
+def generate_corpus(output_dir, count, sizes=(20, 200, 2000), obfuscation_levels=(0, 1, 2, 3),
+                    nesting_depths=(1, 2, 3), seed=0) -> dict:
+    """
+    Writes `count` generated programs, alternating halting and non-halting, into
+    <output_dir>/halting/generated and <output_dir>/non-halting/generated, cycling
+    through the given sizes (target lines), obfuscation levels and nesting depths.
+    Ground-truth labels are written to <output_dir>/generated_labels.json.
+    """
+    output_dir = Path(output_dir)
+    rng = random.Random(seed)
+    labels = {}
+    for index in range(count):
+        halts = index % 2 == 0
+        target_lines = sizes[(index // 2) % len(sizes)]
+        spec = ProgramSpec(
+            halts=halts,
+            target_lines=target_lines,
+            function_count=max(1, target_lines // rng.choice((10, 25, 50))),
+            nesting_depth=nesting_depths[index % len(nesting_depths)],
+            recursion=rng.choice(RECURSION_PATTERNS),
+            obfuscation=obfuscation_levels[index % len(obfuscation_levels)],
+            seed=rng.randrange(2 ** 32),
+        )
+        source, label = generate_program(spec)
+        category = "halting" if halts else "non-halting"
+        path = output_dir / category / "generated" / f"gen_{index:05d}_{target_lines}l_o{spec.obfuscation}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+        labels[path.relative_to(output_dir).as_posix()] = label
+    (output_dir / LABELS_NAME).write_text(json.dumps(labels, indent=1))
+    return labels
+
+def parse_sizes(text):
+    """Parses target sizes in lines, e.g. `20,2k,100k`."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        scale = {'k': 1000, 'm': 1000000}.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate labelled halting and non-halting programs for stress and scaling tests.")
+    parser.add_argument('output', type=Path, help="Directory to write into (e.g. benchmark_suite).")
+    parser.add_argument('--count', type=int, default=100, help="Number of programs, alternating halting and non-halting.")
+    parser.add_argument('--sizes', type=parse_sizes, default=[20, 200, 2000],
+                        help="Comma-separated target sizes in lines, e.g. 20,2k,100k (about 35 bytes per line).")
+    parser.add_argument('--obfuscation', type=lambda text: [int(level) for level in text.split(",")], default=[0, 1, 2, 3],
+                        help=f"Comma-separated obfuscation levels 0-{MAX_OBFUSCATION} to cycle through.")
+    parser.add_argument('--nesting', type=lambda text: [int(depth) for depth in text.split(",")], default=[1, 2, 3],
+                        help="Comma-separated loop nesting depths to cycle through.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    labels = generate_corpus(args.output, args.count, args.sizes, args.obfuscation, args.nesting, args.seed)
+    total_bytes = sum(label['bytes'] for label in labels.values())
+    print(f"Generated {len(labels)} programs ({total_bytes / 1e6:.1f} MB) in {args.output}; labels in {args.output / LABELS_NAME}.")